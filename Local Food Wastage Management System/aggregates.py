@@ -0,0 +1,152 @@
+import threading
+import pandas as pd
+
+# Dimensions of the aggregate cube. Status is the claim status, or
+# 'Unclaimed' for listings without any claim.
+CUBE_DIMENSIONS = ['Food_Type', 'Meal_Type', 'Location', 'Provider_Type', 'Status']
+
+# Listing_Count / Listed_Quantity count each food listing once.
+# Claim_Count / Claimed_Quantity count every claim, with the quantity of the
+# claimed listing (the same numbers the per-chart merges produced).
+CUBE_MEASURES = ['Listing_Count', 'Listed_Quantity', 'Claim_Count', 'Claimed_Quantity']
+
+UNCLAIMED = 'Unclaimed'
+
+
+# Multi-dimensional aggregate of food listings and their claims, built once
+# per data version and shared by the charts. Rollups over any subset of the
+# dimensions are memoized, so repeated renders only touch the rolled-up rows.
+class AggregateCube:
+    def __init__(self, data):
+        self.data = data
+        self._rollups = {}
+        self._lock = threading.Lock()
+
+    @property
+    def empty(self):
+        return self.data.empty
+
+    # Sum the measures over `by`, optionally for the given claim statuses only.
+    # Rows with a missing dimension value are dropped, like a plain groupby.
+    def rollup(self, by, statuses=None):
+        if isinstance(by, str):
+            by = [by]
+        if isinstance(statuses, str):
+            statuses = [statuses]
+        key = (tuple(by), tuple(statuses) if statuses else None)
+        with self._lock:
+            cached = self._rollups.get(key)
+        if cached is None:
+            data = self.data
+            if statuses:
+                data = data[data['Status'].isin(statuses)]
+            cached = data.groupby(by, observed=True)[CUBE_MEASURES].sum().reset_index()
+            with self._lock:
+                self._rollups[key] = cached
+        # Callers may sort or add columns; keep the memoized frame intact
+        return cached.copy()
+
+    # Fold cube rows for newly appended listings or claims into the cube
+    # (see listing_delta / claim_delta). Costs O(cube size), not O(rows).
+    def add_delta(self, delta):
+        if delta.empty:
+            return
+        with self._lock:
+            dtypes = self.data[CUBE_MEASURES].dtypes
+            data = pd.concat([self.data, delta], ignore_index=True)
+            data = data.groupby(CUBE_DIMENSIONS, dropna=False, observed=True)[CUBE_MEASURES].sum().reset_index()
+            for column in CUBE_MEASURES:
+                # Unknown listings add missing quantities; keep integer sums integer
+                if pd.api.types.is_integer_dtype(dtypes[column]):
+                    data[column] = data[column].astype(dtypes[column])
+            self.data = data[(data[CUBE_MEASURES] != 0).any(axis=1)].reset_index(drop=True)
+            self._rollups = {}
+
+
+# Build the cube from the food and claims tables with one outer join.
+def build_cube(food_df, claims_df):
+    food_columns = ['Food_ID', 'Quantity'] + [d for d in CUBE_DIMENSIONS if d != 'Status']
+    if any(c not in food_df.columns for c in food_columns) or any(c not in claims_df.columns for c in ['Food_ID', 'Status']):
+        return AggregateCube(pd.DataFrame(columns=CUBE_DIMENSIONS + CUBE_MEASURES))
+
+    merged = pd.merge(
+        food_df[food_columns],
+        claims_df[['Food_ID', 'Status']],
+        on='Food_ID',
+        how='outer',
+        indicator=True
+    )
+    has_listing = merged['_merge'] != 'right_only'
+    has_claim = merged['_merge'] != 'left_only'
+    # A listing with several claims appears on several rows; count it once
+    first_row = has_listing & ~merged['Food_ID'].duplicated()
+    quantity = merged['Quantity'].fillna(0)
+    if pd.api.types.is_integer_dtype(food_df['Quantity']):
+        quantity = quantity.astype('int64')
+    status = merged['Status']
+    if isinstance(status.dtype, pd.CategoricalDtype) and UNCLAIMED not in status.cat.categories:
+        status = status.cat.add_categories([UNCLAIMED])
+
+    cube = pd.DataFrame({
+        'Food_Type': merged['Food_Type'],
+        'Meal_Type': merged['Meal_Type'],
+        'Location': merged['Location'],
+        'Provider_Type': merged['Provider_Type'],
+        'Status': status.where(has_claim, UNCLAIMED),
+        'Listing_Count': first_row.astype('int64'),
+        'Listed_Quantity': quantity.where(first_row, 0),
+        'Claim_Count': has_claim.astype('int64'),
+        'Claimed_Quantity': quantity.where(has_claim, 0)
+    })
+    cube = cube.groupby(CUBE_DIMENSIONS, dropna=False, observed=True)[CUBE_MEASURES].sum().reset_index()
+    # The cube is small: plain strings, so appended deltas line up with it
+    for column in CUBE_DIMENSIONS:
+        if isinstance(cube[column].dtype, pd.CategoricalDtype):
+            cube[column] = cube[column].astype(cube[column].cat.categories.dtype)
+    return AggregateCube(cube)
+
+
+# Cube rows for new listings. `statuses` gives, per listing, the status of its
+# first claim (UNCLAIMED if it has none), which is where build_cube puts the
+# listed measures.
+def listing_delta(food_rows, statuses):
+    quantity = food_rows['Quantity'].fillna(0)
+    return pd.DataFrame({
+        'Food_Type': food_rows['Food_Type'],
+        'Meal_Type': food_rows['Meal_Type'],
+        'Location': food_rows['Location'],
+        'Provider_Type': food_rows['Provider_Type'],
+        'Status': statuses,
+        'Listing_Count': 1,
+        'Listed_Quantity': quantity,
+        'Claim_Count': 0,
+        'Claimed_Quantity': 0
+    })
+
+
+# Cube rows for new claims. `listings` holds the dimensions and Quantity of
+# each claim's listing (missing when the listing is unknown) and
+# `first_claim` marks claims that are the first for their listing, whose
+# listed measures then move from UNCLAIMED to the claim's status.
+def claim_delta(claim_rows, listings, first_claim):
+    quantity = listings['Quantity'].fillna(0)
+    first_claim = first_claim & listings['Quantity'].notna()
+    claimed = pd.DataFrame({
+        'Food_Type': listings['Food_Type'],
+        'Meal_Type': listings['Meal_Type'],
+        'Location': listings['Location'],
+        'Provider_Type': listings['Provider_Type'],
+        'Status': claim_rows['Status'],
+        'Listing_Count': first_claim.astype('int64'),
+        'Listed_Quantity': quantity.where(first_claim, 0),
+        'Claim_Count': 1,
+        'Claimed_Quantity': quantity
+    })
+    moved = claimed[first_claim].assign(
+        Status=UNCLAIMED,
+        Listing_Count=-1,
+        Listed_Quantity=-quantity[first_claim],
+        Claim_Count=0,
+        Claimed_Quantity=0
+    )
+    return pd.concat([claimed, moved], ignore_index=True)
@@ -1,13 +1,24 @@
+# Only what the first render needs is imported here; Plotly is imported by
+# the charts when one is drawn and the ingestor only when ingestion is on
 import streamlit as st
 import pandas as pd
-import numpy as np
-from pandasql import sqldf
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
+import json
 import os
+import time
+from charts import CHARTS, RANKING_METRICS, VIZ_CATEGORIES, ChartWarmer, FigureCache, chart_payload
+from data_cache import cached_row_counts, load_tables
+from data_loader import DATA_DIR, data_version, memory_report
+from explorer import FILTER_OPERATORS, PAGE_SIZES, count_query, page_query
+from filters import selection_key
+from insights import insights_markdown
+from live_data import LiveDataset
+from profiling import SPANS, SamplingProfiler, span
+from queries import predefined_queries
+from query_jobs import DONE, FAILED, TIMED_OUT, QueryJob
+from result_cache import ResultCache
+from timeseries import GRANULARITIES
+from worker_pool import PoolBusy, WorkerPool
 
 # Set page configuration
 st.set_page_config(
@@ -91,27 +102,22 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Load data function with caching
-@st.cache_data
+# A profile of this rerun was requested from the Admin tab: sample the
+# script's stack until it finishes
+profiler = SamplingProfiler(root_file=__file__).start() if st.session_state.pop('profile_next', False) else None
+
+# Load data function.
+# Not cached itself: st.cache_data would hand every session its own unpickled
+# copy of the tables. get_dataset below holds the one shared copy instead,
+# and the data version in its key means the tables are re-read only when one
+# of the CSVs changes on disk (from the Parquet cache unless the CSV content
+# itself changed). It takes no version: get_dataset's key decides when to
+# call it again.
 def load_data():
     # Load datasets with error handling
-    datasets = {}
-    base_path = "Datasets/Cleaned-datasets/"
-    
     try:
-        datasets['providers'] = pd.read_csv(os.path.join(base_path, "clean_providers_data.csv"))
-        datasets['receivers'] = pd.read_csv(os.path.join(base_path, "clean_receivers_data.csv"))
-        datasets['food'] = pd.read_csv(os.path.join(base_path, "clean_food_listings_data.csv"))
-        datasets['claims'] = pd.read_csv(os.path.join(base_path, "clean_claims_data.csv"))
-        
-        # Convert date columns to datetime
-        if 'Expiry_Date' in datasets['food']:
-            datasets['food']['Expiry_Date'] = pd.to_datetime(datasets['food']['Expiry_Date'], errors='coerce')
-        
-        if 'Date' in datasets['claims']:
-            datasets['claims']['Date'] = pd.to_datetime(datasets['claims']['Date'], errors='coerce')
-        
-        return datasets
+        with span("load_data"):
+            return load_tables(DATA_DIR)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         # Return empty dataframes if files not found
@@ -122,571 +128,375 @@ def load_data():
             'claims': pd.DataFrame()
         }
 
-# Initialize data
-data = load_data()
-providers_df = data['providers']
-receivers_df = data['receivers']
-food_df = data['food']
-claims_df = data['claims']
+# Tables and everything derived from them (SQL engine, aggregate cube,
+# wastage tracker, enriched claims), held once per process and shared by all
+# sessions without copying. Derived structures are built on first use and
+# then updated incrementally as live listings and claims are appended; the
+# whole dataset is rebuilt only for a new data version.
+@st.cache_resource(max_entries=1)
+def get_dataset(version):
+    return LiveDataset(load_data(), version=version)
+
+# Global filters of the sidebar (see render_filters) as chosen in this
+# session: {dimension: values}, the date range as (start, end)
+def current_selection():
+    selection = {
+        'City': st.session_state.get('filter_city'),
+        'Food_Type': st.session_state.get('filter_food_type'),
+        'Provider_Type': st.session_state.get('filter_provider_type'),
+        'Date': picked_dates(st.session_state.get('filter_dates'), st.session_state.get('filter_dates_bounds'))
+    }
+    return {dimension: values for dimension, values in selection.items() if values}
+
+# Date range filter from the dates picked: None for the full range (all
+# rows); until the second date is picked only the start is known
+def picked_dates(picked, bounds):
+    if not picked or bounds is None:
+        return None
+    if len(picked) == 1:
+        return (picked[0], None)
+    if tuple(picked) == tuple(bounds):
+        return None
+    return tuple(picked)
+
+# The data this page shows: the shared dataset, or the rows the sidebar
+# filters select as a dataset of their own (shared by sessions with the
+# same filters)
+def page_dataset():
+    selection = current_selection()
+    dataset = get_dataset(DATA_VERSION)
+    return dataset.filtered(selection) if selection_key(selection) else dataset
+
+# SQL results shared by all sessions. Entries are keyed on the data version
+# and the dataset revision, so appended rows never serve stale results.
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+# Live ingestion of new listings and claims, enabled by environment variables:
+#   FMS_INGEST_TAIL  comma-separated JSONL/CSV files to follow
+#   FMS_INGEST_PORT  port of the local HTTP endpoint (POST /events)
+INGEST_TAIL = [path for path in os.environ.get("FMS_INGEST_TAIL", "").split(",") if path.strip()]
+INGEST_PORT = int(os.environ.get("FMS_INGEST_PORT", "0") or 0)
+METRICS_REFRESH_SECONDS = float(os.environ.get("FMS_METRICS_REFRESH", "2"))
+INGEST_ENABLED = bool(INGEST_TAIL or INGEST_PORT)
+
+# One ingestor per process, started on the first run
+@st.cache_resource
+def get_ingestor():
+    from ingest import EventIngestor
+    ingestor = EventIngestor()
+    for path in INGEST_TAIL:
+        ingestor.tail(path.strip())
+    if INGEST_PORT:
+        ingestor.serve(INGEST_PORT)
+    return ingestor
+
+# Initialize data. The tables are loaded by the first call to
+# get_dataset(DATA_VERSION), which comes after the metrics row is drawn.
+DATA_VERSION = data_version(DATA_DIR)
+
+if INGEST_ENABLED:
+    get_ingestor().attach(get_dataset(DATA_VERSION))
+
+# Worker processes for SQL and chart computations, enabled by setting
+#   FMS_WORKERS  number of worker processes
+#   FMS_MAX_PENDING  jobs allowed to queue before new ones are turned away
+POOL_WORKERS = int(os.environ.get("FMS_WORKERS", "0") or 0)
+POOL_MAX_PENDING = int(os.environ.get("FMS_MAX_PENDING", "0") or 0) or None
+
+def close_worker_pool(pool):
+    if pool is not None:
+        pool.close()
+
+@st.cache_resource(max_entries=1, on_release=close_worker_pool)
+def get_worker_pool(version):
+    if not POOL_WORKERS:
+        return None
+    return WorkerPool(get_dataset(version), workers=POOL_WORKERS, max_pending=POOL_MAX_PENDING)
+
+# The worker pool, if enabled and its snapshot still matches `dataset`.
+# Once live rows have been appended, and for filtered data, jobs run in
+# this process instead.
+def current_pool(dataset=None):
+    pool = get_worker_pool(DATA_VERSION)
+    if pool is not None and pool.is_current(dataset or get_dataset(DATA_VERSION)):
+        return pool
+    return None
+
+# Run SQL on the worker pool, or on the dataset's engine without one
+def sql_query(query, params=None, dataset=None):
+    dataset = dataset or get_dataset(DATA_VERSION)
+    with span("sql"):
+        pool = current_pool(dataset)
+        if pool is not None:
+            return pool.query(query, params)
+        return dataset.engine().query(query, params)
+
+# Function computing chart data from the raw tables (a chart_data function)
+# on the worker pool, or in this process without one. Bound to the pool
+# and dataset of this run, so the chart warm-up thread can use it.
+def chart_runner(dataset=None):
+    dataset = dataset or get_dataset(DATA_VERSION)
+    pool = current_pool(dataset)
+    def run(fn, **kwargs):
+        with span(f"chart data: {fn.__name__}"):
+            if pool is not None:
+                return pool.run(fn, **kwargs)
+            return fn(dataset.tables(), **kwargs)
+    return run
 
 # Helper function to run SQL queries
 def run_query(query):
     try:
-        # Create a dictionary of available DataFrames
-        tables = {
-            'providers': providers_df,
-            'receivers': receivers_df,
-            'food': food_df,
-            'claims': claims_df
-        }
-        # Use pandasql to execute the query
-        result = sqldf(query, tables)
+        # Run against the persistent engine instead of copying every
+        # DataFrame into a new database on each call, and reuse results
+        # other sessions already computed for the same data
+        dataset = page_dataset()
+        with span("run_query"):
+            result = get_result_cache().get_or_compute(
+                query,
+                (dataset.version, dataset.revision),
+                lambda: sql_query(query, dataset=dataset)
+            )
         return result
+    except PoolBusy:
+        st.warning("The server is busy; please try again in a moment.")
+        return pd.DataFrame()
     except Exception as e:
         st.error(f"Query failed: {str(e)}")
         return pd.DataFrame()
 
-# Predefined queries
-predefined_queries = {
-    "Total Providers": "SELECT COUNT(*) AS Total_Providers FROM providers",
-    "Total Receivers": "SELECT COUNT(*) AS Total_Receivers FROM receivers",
-    "Available Food Items": "SELECT COUNT(*) AS Available_Food FROM food",
-    "Total Claims": "SELECT COUNT(*) AS Total_Claims FROM claims",
-    "Top 10 Food Types": "SELECT Food_Type, COUNT(*) AS Count FROM food GROUP BY Food_Type ORDER BY Count DESC LIMIT 10",
-    "Top 10 Providers by Food Listings": """
-        SELECT p.Name, COUNT(f.Food_ID) AS Listings 
-        FROM providers p 
-        JOIN food f ON p.Provider_ID = f.Provider_ID 
-        GROUP BY p.Name 
-        ORDER BY Listings DESC 
-        LIMIT 10
-    """,
-    "Claims by Status": "SELECT Status, COUNT(*) AS Claim_Count FROM claims GROUP BY Status",
-    "Expiring Soon (Next 7 Days)": """
-        SELECT * 
-        FROM food 
-        WHERE Expiry_Date BETWEEN date('now') AND date('now', '+7 days')
-    """,
-    "Top Receivers by Claims": """
-        SELECT r.Name, COUNT(c.Claim_ID) AS Claims 
-        FROM receivers r 
-        JOIN claims c ON r.Receiver_ID = c.Receiver_ID 
-        GROUP BY r.Name 
-        ORDER BY Claims DESC 
-        LIMIT 10
-    """,
-    "Food Wastage (Expired Items)": "SELECT * FROM food WHERE Expiry_Date < date('now')"
+# Start a custom query on a background thread. Results already in the cache
+# are used as is; only complete results are ever cached, so a cached result
+# within the row cap is the full answer.
+def start_custom_query(query, max_rows, timeout):
+    previous = st.session_state.get('query_job')
+    if previous is not None:
+        previous.cancel()
+    dataset = page_dataset()
+    cached = get_result_cache().get(query, (dataset.version, dataset.revision))
+    if cached is not None and len(cached) <= max_rows:
+        st.session_state.query_job = None
+        st.session_state.query_result = cached
+        st.session_state.query_stats = "Served from the result cache"
+        return
+    st.session_state.query_job = QueryJob(dataset.engine(), query, max_rows=max_rows, timeout=timeout)
+    st.session_state.query_revision = (dataset.version, dataset.revision)
+
+# Poll the running custom query until it finishes or the user cancels it,
+# then move its rows into the query result
+def follow_custom_query(job):
+    if job.running:
+        if st.button("Cancel Query"):
+            job.cancel()
+            job.wait(5)
+        progress = st.empty()
+        while job.running:
+            progress.info(f"Running... {job.rows_fetched:,} rows fetched, "
+                          f"{job.vm_steps:,} SQLite steps, {job.elapsed:.1f}s elapsed")
+            time.sleep(0.25)
+        progress.empty()
+
+    st.session_state.query_job = None
+    st.session_state.query_result = job.result()
+    stats = (f"{job.vm_steps:,} SQLite steps (rows scanned), {job.elapsed:.2f}s elapsed")
+    if job.status == FAILED:
+        st.error(f"Query failed: {str(job.error)}")
+    elif job.status != DONE:
+        reason = f"timed out after {job.timeout:.0f}s" if job.status == TIMED_OUT else "was cancelled"
+        st.warning(f"Query {reason}; showing the {job.rows_fetched:,} rows fetched before it stopped.")
+    elif job.truncated:
+        st.warning(f"Result capped at {job.max_rows:,} rows; add a LIMIT or raise the cap to see more.")
+    else:
+        get_result_cache().put(job.query, st.session_state.query_revision, st.session_state.query_result)
+    st.session_state.query_stats = stats
+
+# Run a parameterized query for the Data Explorer through the result cache
+def run_explorer_query(query, params, dataset):
+    return get_result_cache().get_or_compute(
+        query,
+        (dataset.version, dataset.revision, tuple(params)),
+        lambda: sql_query(query, params, dataset)
+    )
+
+# Data Explorer datasets -> table names
+EXPLORER_TABLES = {
+    "Providers": 'providers',
+    "Receivers": 'receivers',
+    "Food Listings": 'food',
+    "Claims": 'claims'
 }
 
-# Create visualizations based on EDA
-def create_visualization(viz_name):
-    # Provider Visualizations
-    if viz_name == "Distribution of Provider Types":
-        if not providers_df.empty and 'Type' in providers_df.columns:
-            provider_counts = providers_df['Type'].value_counts().reset_index()
-            provider_counts.columns = ['Provider_Type', 'Count']
-            
-            fig = px.bar(
-                provider_counts, 
-                x='Provider_Type', 
-                y='Count',
-                title='Distribution of Provider Types',
-                color='Provider_Type',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Provider Type",
-                yaxis_title="Count",
-                plot_bgcolor='rgba(1,1,1,1)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    elif viz_name == "Top 10 Cities by Number of Providers":
-        if not providers_df.empty and 'City' in providers_df.columns:
-            city_counts = providers_df['City'].value_counts().reset_index().head(10)
-            city_counts.columns = ['City', 'Count']
-            
-            fig = px.bar(
-                city_counts, 
-                x='City', 
-                y='Count',
-                title='Top 10 Cities by Number of Providers',
-                color='City',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="City",
-                yaxis_title="Number of Providers",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    # Receiver Visualizations
-    elif viz_name == "Distribution of Receiver Types":
-        if not receivers_df.empty and 'Type' in receivers_df.columns:
-            receiver_counts = receivers_df['Type'].value_counts().reset_index()
-            receiver_counts.columns = ['Receiver_Type', 'Count']
-            
-            fig = px.pie(
-                receiver_counts,
-                names='Receiver_Type',
-                values='Count',
-                title='Distribution of Receiver Types',
-                hole=0.4,
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            return fig
-    
-    # Food Visualizations
-    elif viz_name == "Counts of Food Types Listed":
-        if not food_df.empty and 'Food_Type' in food_df.columns:
-            food_counts = food_df['Food_Type'].value_counts().reset_index()
-            food_counts.columns = ['Food_Type', 'Count']
-            
-            fig = px.bar(
-                food_counts, 
-                x='Food_Type', 
-                y='Count',
-                title='Counts of Food Types Listed',
-                color='Food_Type',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Food Type",
-                yaxis_title="Count",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    elif viz_name == "Total Quantity Donated per Food Type":
-        if not food_df.empty and 'Food_Type' in food_df.columns:
-            food_qty = food_df.groupby('Food_Type')['Quantity'].sum().reset_index()
-            
-            fig = px.bar(
-                food_qty, 
-                x='Food_Type', 
-                y='Quantity',
-                title='Total Quantity Donated per Food Type',
-                color='Food_Type',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Food Type",
-                yaxis_title="Total Quantity",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    # Claims Visualizations
-    elif viz_name == "Claim Status Distribution":
-        if not claims_df.empty and 'Status' in claims_df.columns:
-            status_counts = claims_df['Status'].value_counts().reset_index()
-            status_counts.columns = ['Status', 'Count']
-            
-            fig = px.bar(
-                status_counts, 
-                x='Status', 
-                y='Count',
-                title='Claim Status Distribution',
-                color='Status',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Status",
-                yaxis_title="Count",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    elif viz_name == "Claims Over Time":
-        if not claims_df.empty and 'Timestamp' in claims_df.columns:
-            try:
-                claims_over_time = claims_df.copy()
-                # Convert Timestamp to datetime and extract date
-                claims_over_time['Date'] = pd.to_datetime(claims_over_time['Timestamp']).dt.date
-                claims_over_time['Date'] = pd.to_datetime(claims_over_time['Date'])
-                
-                # Drop rows with invalid dates
-                claims_over_time = claims_over_time.dropna(subset=['Date'])
-                
-                if claims_over_time.empty:
-                    st.warning("No valid timestamp data available for Claims Over Time visualization.")
-                    return None
-                    
-                # Resample by week and count claims
-                claims_over_time = claims_over_time.set_index('Date').resample('W').size().reset_index()
-                claims_over_time.columns = ['Date', 'Claims']
-                
-                # Create the line chart
-                fig = px.line(
-                    claims_over_time, 
-                    x='Date', 
-                    y='Claims',
-                    title='Claims Over Time',
-                    markers=True
-                )
-                fig.update_layout(
-                    xaxis_title="Date",
-                    yaxis_title="Number of Claims",
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                return fig
-            except Exception as e:
-                st.error(f"Error generating Claims Over Time visualization: {str(e)}")
-                return None
-        else:
-            st.warning("Claims data is empty or Timestamp column is missing.")
-            return None
-    # Food Wastage Visualizations
-    elif viz_name == "Food Wastage by Food Type":
-        # Food wastage = expired food that wasn't claimed
-        if not food_df.empty:
-            # Get expired food
-            expired_food = food_df.copy()
-            expired_food['Expired'] = expired_food['Expiry_Date'] < datetime.now()
-            
-            # Merge with claims to find unclaimed food
-            if not claims_df.empty:
-                claimed_food_ids = claims_df['Food_ID'].unique()
-                expired_food['Unclaimed'] = ~expired_food['Food_ID'].isin(claimed_food_ids)
-                wastage = expired_food[(expired_food['Expired']) & (expired_food['Unclaimed'])]
-                
-                if not wastage.empty and 'Food_Type' in wastage.columns:
-                    wastage_by_type = wastage.groupby('Food_Type')['Quantity'].sum().reset_index()
-                    
-                    fig = px.bar(
-                        wastage_by_type, 
-                        x='Food_Type', 
-                        y='Quantity',
-                        title='Food Wastage by Food Type',
-                        color='Food_Type',
-                        color_discrete_sequence=px.colors.qualitative.Pastel
-                    )
-                    fig.update_layout(
-                        xaxis_title="Food Type",
-                        yaxis_title="Wasted Quantity",
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)'
-                    )
-                    return fig
-    
-    elif viz_name == "Food Wastage by Meal Type":
-        # Similar to above
-        if not food_df.empty:
-            expired_food = food_df.copy()
-            expired_food['Expired'] = expired_food['Expiry_Date'] < datetime.now()
-            
-            if not claims_df.empty:
-                claimed_food_ids = claims_df['Food_ID'].unique()
-                expired_food['Unclaimed'] = ~expired_food['Food_ID'].isin(claimed_food_ids)
-                wastage = expired_food[(expired_food['Expired']) & (expired_food['Unclaimed'])]
-                
-                if not wastage.empty and 'Meal_Type' in wastage.columns:
-                    wastage_by_meal = wastage.groupby('Meal_Type')['Quantity'].sum().reset_index()
-                    
-                    fig = px.pie(
-                        wastage_by_meal,
-                        names='Meal_Type',
-                        values='Quantity',
-                        title='Food Wastage by Meal Type',
-                        hole=0.4,
-                        color_discrete_sequence=px.colors.qualitative.Pastel
-                    )
-                    fig.update_traces(textposition='inside', textinfo='percent+label')
-                    return fig
-    
-    # NEW VISUALIZATIONS FROM FOOD DISTRIBUTION ANALYSIS
-    
-    # Overall Food Claim Rate by Status
-    elif viz_name == "Overall Food Claim Rate by Status":
-        if not food_df.empty and not claims_df.empty:
-            # Calculate the quantities for each status
-            total_listed_quantity = food_df['Quantity'].sum()
-            
-            # Get completed claims
-            completed_claims_df = claims_df[claims_df['Status'] == 'Completed']
-            completed_food_ids = completed_claims_df['Food_ID'].unique()
-            completed_food_df = food_df[food_df['Food_ID'].isin(completed_food_ids)]
-            completed_claims_quantity = completed_food_df['Quantity'].sum()
-            
-            # Get cancelled claims
-            cancelled_claims_df = claims_df[claims_df['Status'] == 'Cancelled']
-            cancelled_food_ids = cancelled_claims_df['Food_ID'].unique()
-            cancelled_food_df = food_df[food_df['Food_ID'].isin(cancelled_food_ids)]
-            cancelled_claims_quantity = cancelled_food_df['Quantity'].sum()
-            
-            # Get pending claims
-            pending_claims_df = claims_df[claims_df['Status'] == 'Pending']
-            pending_food_ids = pending_claims_df['Food_ID'].unique()
-            pending_food_df = food_df[food_df['Food_ID'].isin(pending_food_ids)]
-            pending_claims_quantity = pending_food_df['Quantity'].sum()
-            
-            # Calculate unclaimed quantity
-            unclaimed_quantity = total_listed_quantity - (completed_claims_quantity + cancelled_claims_quantity + pending_claims_quantity)
-            
-            # Calculate percentages
-            percentage_completed = (completed_claims_quantity / total_listed_quantity) * 100 if total_listed_quantity > 0 else 0
-            percentage_cancelled = (cancelled_claims_quantity / total_listed_quantity) * 100 if total_listed_quantity > 0 else 0
-            percentage_pending = (pending_claims_quantity / total_listed_quantity) * 100 if total_listed_quantity > 0 else 0
-            percentage_unclaimed = (unclaimed_quantity / total_listed_quantity) * 100 if total_listed_quantity > 0 else 0
-            
-            # Create a DataFrame for plotting
-            claim_status_data = pd.DataFrame({
-                'Status': ['Completed', 'Cancelled', 'Pending', 'Unclaimed'],
-                'Percentage': [percentage_completed, percentage_cancelled, percentage_pending, percentage_unclaimed]
-            })
-            
-            fig = px.bar(
-                claim_status_data,
-                x='Status',
-                y='Percentage',
-                title='Overall Food Claim Rate by Status',
-                color='Status',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Claim Status",
-                yaxis_title="Percentage of Total Listed Quantity",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    # Listed vs. Claimed Quantity for Top 10 Locations by Claim Rate
-    elif viz_name == "Listed vs. Claimed Quantity for Top 10 Locations by Claim Rate":
-        if not food_df.empty and not claims_df.empty:
-            # Merge the food_df and claims_df DataFrames
-            merged_df = pd.merge(food_df, claims_df, on='Food_ID', how='left')
-            
-            # Calculate listed quantity by location
-            listed_quantity_by_location = food_df.groupby('Location')['Quantity'].sum().reset_index()
-            listed_quantity_by_location.rename(columns={'Quantity': 'Listed_Quantity'}, inplace=True)
-            
-            # Calculate claimed quantity by location
-            completed_claims_df = merged_df[merged_df['Status'] == 'Completed'].copy()
-            claimed_quantity_by_location = completed_claims_df.groupby('Location')['Quantity'].sum().reset_index()
-            claimed_quantity_by_location.rename(columns={'Quantity': 'Claimed_Quantity'}, inplace=True)
-            
-            # Merge the listed and claimed quantities by location
-            location_claim_rates = pd.merge(listed_quantity_by_location, claimed_quantity_by_location, on='Location', how='left')
-            location_claim_rates['Claimed_Quantity'] = location_claim_rates['Claimed_Quantity'].fillna(0)
-            
-            # Calculate the claim rate for each location
-            location_claim_rates['Claim_Rate'] = (location_claim_rates['Claimed_Quantity'] / location_claim_rates['Listed_Quantity']) * 100
-            
-            # Get top 10 locations by claim rate
-            top_10_locations = location_claim_rates.sort_values(by='Claim_Rate', ascending=False).head(10)
-            
-            # Melt the DataFrame for plotting
-            top_10_melted = top_10_locations.melt(
-                id_vars='Location', 
-                value_vars=['Listed_Quantity', 'Claimed_Quantity'],
-                var_name='Quantity_Type', 
-                value_name='Quantity'
-            )
-            
-            fig = px.bar(
-                top_10_melted,
-                x='Location',
-                y='Quantity',
-                color='Quantity_Type',
-                title='Listed vs. Claimed Quantity for Top 10 Locations by Claim Rate',
-                barmode='group',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Location",
-                yaxis_title="Quantity",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    # Listed vs. Claimed Quantity for Bottom 10 Locations by Claim Rate
-    elif viz_name == "Listed vs. Claimed Quantity for Bottom 10 Locations by Claim Rate":
-        if not food_df.empty and not claims_df.empty:
-            # Merge the food_df and claims_df DataFrames
-            merged_df = pd.merge(food_df, claims_df, on='Food_ID', how='left')
-            
-            # Calculate listed quantity by location
-            listed_quantity_by_location = food_df.groupby('Location')['Quantity'].sum().reset_index()
-            listed_quantity_by_location.rename(columns={'Quantity': 'Listed_Quantity'}, inplace=True)
-            
-            # Calculate claimed quantity by location
-            completed_claims_df = merged_df[merged_df['Status'] == 'Completed'].copy()
-            claimed_quantity_by_location = completed_claims_df.groupby('Location')['Quantity'].sum().reset_index()
-            claimed_quantity_by_location.rename(columns={'Quantity': 'Claimed_Quantity'}, inplace=True)
-            
-            # Merge the listed and claimed quantities by location
-            location_claim_rates = pd.merge(listed_quantity_by_location, claimed_quantity_by_location, on='Location', how='left')
-            location_claim_rates['Claimed_Quantity'] = location_claim_rates['Claimed_Quantity'].fillna(0)
-            
-            # Calculate the claim rate for each location
-            location_claim_rates['Claim_Rate'] = (location_claim_rates['Claimed_Quantity'] / location_claim_rates['Listed_Quantity']) * 100
-            
-            # Get bottom 10 locations by claim rate
-            bottom_10_locations = location_claim_rates.sort_values(by='Claim_Rate', ascending=True).head(10)
-            
-            # Melt the DataFrame for plotting
-            bottom_10_melted = bottom_10_locations.melt(
-                id_vars='Location', 
-                value_vars=['Listed_Quantity', 'Claimed_Quantity'],
-                var_name='Quantity_Type', 
-                value_name='Quantity'
-            )
-            
-            fig = px.bar(
-                bottom_10_melted,
-                x='Location',
-                y='Quantity',
-                color='Quantity_Type',
-                title='Listed vs. Claimed Quantity for Bottom 10 Locations by Claim Rate',
-                barmode='group',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Location",
-                yaxis_title="Quantity",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    # Claimed Quantity by Food Type
-    elif viz_name == "Claimed Quantity by Food Type":
-        if not claims_df.empty and not food_df.empty:
-            # Merge claims and food
-            merged = pd.merge(claims_df, food_df, on='Food_ID', how='left')
-            if 'Food_Type' in merged.columns:
-                food_claims = merged[merged['Status'] == 'Completed'].groupby('Food_Type')['Quantity'].sum().reset_index()
-                
-                fig = px.bar(
-                    food_claims, 
-                    x='Food_Type', 
-                    y='Quantity',
-                    title='Claimed Quantity by Food Type',
-                    color='Food_Type',
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                fig.update_layout(
-                    xaxis_title="Food Type",
-                    yaxis_title="Claimed Quantity",
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                return fig
-    
-    # Claimed Quantity by Meal Type
-    elif viz_name == "Claimed Quantity by Meal Type":
-        if not claims_df.empty and not food_df.empty:
-            # Merge claims and food
-            merged = pd.merge(claims_df, food_df, on='Food_ID', how='left')
-            if 'Meal_Type' in merged.columns:
-                meal_claims = merged[merged['Status'] == 'Completed'].groupby('Meal_Type')['Quantity'].sum().reset_index()
-                
-                fig = px.pie(
-                    meal_claims,
-                    names='Meal_Type',
-                    values='Quantity',
-                    title='Claimed Quantity by Meal Type',
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                return fig
-    
-    # Top 10 Providers by Donated Quantity
-    elif viz_name == "Top 10 Providers by Donated Quantity":
-        if not food_df.empty and not providers_df.empty:
-            # Merge food and providers
-            merged = pd.merge(food_df, providers_df, on='Provider_ID', how='left')
-            provider_qty = merged.groupby('Name')['Quantity'].sum().reset_index()
-            provider_qty = provider_qty.sort_values('Quantity', ascending=False).head(10)
-            
-            fig = px.bar(
-                provider_qty, 
-                x='Name', 
-                y='Quantity',
-                title='Top 10 Providers by Donated Quantity',
-                color='Name',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Provider",
-                yaxis_title="Total Quantity Donated",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    # Top 10 Receivers by Claim Count
-    elif viz_name == "Top 10 Receivers by Claim Count":
-        if not claims_df.empty and not receivers_df.empty:
-            # Merge claims and receivers
-            merged = pd.merge(claims_df, receivers_df, on='Receiver_ID', how='left')
-            receiver_claims = merged[merged['Status'] == 'Completed'].groupby('Name').size().reset_index()
-            receiver_claims.columns = ['Receiver_Name', 'Claim_Count']
-            receiver_claims = receiver_claims.sort_values('Claim_Count', ascending=False).head(10)
-            
-            fig = px.bar(
-                receiver_claims, 
-                x='Receiver_Name', 
-                y='Claim_Count',
-                title='Top 10 Receivers by Claim Count',
-                color='Receiver_Name',
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig.update_layout(
-                xaxis_title="Receiver",
-                yaxis_title="Number of Claims",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            return fig
-    
-    # If visualization not found, return None
-    return None
+# Listings shown in Next to Expire
+NEXT_TO_EXPIRE = 20
 
-# Main App
-def main():
-    # Header
-    st.markdown('<div class="header-text">🍽️ Local Food Wastage Management System Dashboard</div>', unsafe_allow_html=True)
-    
-    # Metrics row
+# Chart payloads shared by all sessions (see charts.py)
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+def stop_chart_warmer(warmer):
+    warmer.stop()
+
+# Background warm-up of every chart for the current data version
+@st.cache_resource(max_entries=1, on_release=stop_chart_warmer)
+def get_chart_warmer(version):
+    return ChartWarmer(get_figure_cache())
+
+# Table row counts for the metrics row. Without live ingestion they are the
+# row counts of the Parquet cache, read from its metadata, so the metrics
+# row is drawn before the tables are loaded on a cold start.
+@st.cache_data
+def file_row_counts(version):
+    return cached_row_counts(DATA_DIR)
+
+# Header metrics. With live ingestion counts come from the shared dataset,
+# so they include listings and claims ingested since the page was loaded.
+# With sidebar filters they are the popcounts of the filters' row bitmaps.
+def render_metrics():
+    selection = current_selection()
+    if selection_key(selection):
+        counts = get_dataset(DATA_VERSION).filter_index().counts(selection)
+    else:
+        counts = None if INGEST_ENABLED else file_row_counts(DATA_VERSION)
+    if counts is None:
+        counts = get_dataset(DATA_VERSION).counts()
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.markdown('<div class="metric-card">'
                     '<h3>Total Providers</h3>'
-                    f'<h1>{len(providers_df) if not providers_df.empty else 0}</h1>'
+                    f'<h1>{counts["providers"]}</h1>'
                     '</div>', unsafe_allow_html=True)
     with col2:
         st.markdown('<div class="metric-card">'
                     '<h3>Total Receivers</h3>'
-                    f'<h1>{len(receivers_df) if not receivers_df.empty else 0}</h1>'
+                    f'<h1>{counts["receivers"]}</h1>'
                     '</div>', unsafe_allow_html=True)
     with col3:
         st.markdown('<div class="metric-card">'
                     '<h3>Food Listings</h3>'
-                    f'<h1>{len(food_df) if not food_df.empty else 0}</h1>'
+                    f'<h1>{counts["food"]}</h1>'
                     '</div>', unsafe_allow_html=True)
     with col4:
         st.markdown('<div class="metric-card">'
                     '<h3>Total Claims</h3>'
-                    f'<h1>{len(claims_df) if not claims_df.empty else 0}</h1>'
+                    f'<h1>{counts["claims"]}</h1>'
                     '</div>', unsafe_allow_html=True)
+
+# With live ingestion the metrics row re-renders on its own every few
+# seconds, without rerunning the rest of the page
+if INGEST_ENABLED:
+    metrics_row = st.fragment(run_every=METRICS_REFRESH_SECONDS)(render_metrics)
+else:
+    metrics_row = render_metrics
+
+# Options offered per filter: the most common values (by rows over all
+# tables); cities can number in the hundreds of thousands
+FILTER_OPTION_LIMIT = 1000
+
+# Global filters in the sidebar. They apply to the metrics row, the SQL
+# tab, every chart and the Data Explorer (not to receiver matching, which
+# works on all unclaimed listings).
+def render_filters():
+    index = get_dataset(DATA_VERSION).filter_index()
+    with st.sidebar:
+        st.markdown("### Filters")
+        for label, dimension, key in [("City", 'City', 'filter_city'),
+                                      ("Food type", 'Food_Type', 'filter_food_type'),
+                                      ("Provider type", 'Provider_Type', 'filter_provider_type')]:
+            # Values chosen earlier stay available after the data changed
+            chosen = [value for value in st.session_state.get(key, []) if value is not None]
+            options = chosen + [value for value in index.options(dimension, FILTER_OPTION_LIMIT) if value not in chosen]
+            st.multiselect(f"{label}:", options, key=key)
+        days = index.date_range()
+        if days is not None:
+            first_day, last_day = (day.date() for day in days)
+            st.session_state.filter_dates_bounds = (first_day, last_day)
+            st.date_input("Expiry / claim date:", value=(first_day, last_day),
+                          min_value=first_day, max_value=last_day, key='filter_dates')
+        selection = current_selection()
+        if selection_key(selection):
+            counts = index.counts(selection)
+            st.caption(f"{counts['food']:,} of {index.rows['food']:,} listings and {counts['claims']:,} of "
+                       f"{index.rows['claims']:,} claims selected")
+
+# The Admin tab is shown only when FMS_ADMIN_TOKEN is set and the page was
+# opened with ?admin=<token>
+ADMIN_TOKEN = os.environ.get("FMS_ADMIN_TOKEN", "")
+
+def is_admin():
+    return bool(ADMIN_TOKEN) and st.query_params.get("admin") == ADMIN_TOKEN
+
+# Latency per operation of this server process (timing spans around data
+# loading, queries, chart data and figures, and rendering) and the
+# sampling profiler
+def render_admin():
+    st.markdown('<div class="section-header">Performance</div>', unsafe_allow_html=True)
+    
+    st.markdown("### Operation Latency")
+    st.dataframe(SPANS.frame().round(1), use_container_width=True)
+    st.caption("Wall-clock time per operation over its last runs in this process, all sessions. "
+               "Self time leaves out the operations nested inside it, e.g. a chart's self time "
+               "is building the figure once its data has been computed.")
+    export_col, reset_col = st.columns(2)
+    export_col.download_button("Export Timings (JSON)", json.dumps(SPANS.export(), indent=2),
+                               file_name="fms-timings.json", mime="application/json")
+    if reset_col.button("Reset Timings"):
+        SPANS.clear()
+    
+    st.markdown("### Table Memory")
+    report = memory_report(get_dataset(DATA_VERSION).tables())
+    totals = report.groupby('Table', sort=False).agg(Rows=('Rows', 'first'), Bytes=('Bytes', 'sum'))
+    st.dataframe(totals.assign(MB=totals['Bytes'] / 1e6).drop(columns='Bytes').round(2), use_container_width=True)
+    with st.expander("Per column"):
+        st.dataframe(report, use_container_width=True)
+    
+    st.markdown("### Profiler")
+    st.caption("Samples the Python stack of one full rerun of this page and shows where its time went.")
+    if st.button("Profile Next Rerun"):
+        st.session_state.profile_next = True
+        st.rerun()
+    profile = st.session_state.get('profile')
+    if profile is not None:
+        samples = sum(profile.stacks.values())
+        st.caption(f"{samples} samples over {profile.seconds:.2f}s, every {profile.interval * 1000:.0f} ms")
+        flame = profile.flame_frame()
+        if not flame.empty:
+            import plotly.graph_objects as go
+            fig = go.Figure(go.Icicle(
+                ids=flame['id'], labels=flame['label'], parents=flame['parent'], values=flame['samples'],
+                branchvalues='total', tiling=dict(orientation='v', flip='y')
+            ))
+            fig.update_layout(margin=dict(t=10, l=0, r=0, b=0), height=600)
+            st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(profile.top_functions(), use_container_width=True)
+        st.download_button("Export Profile (collapsed stacks)", profile.folded(),
+                           file_name="fms-profile.folded", mime="text/plain")
+
+# Main App
+def main():
+    # Header
+    st.markdown('<div class="header-text">🍽️ Local Food Wastage Management System Dashboard</div>', unsafe_allow_html=True)
+    
+    # Metrics row
+    with span("render: metrics"):
+        metrics_row()
+    
+    with span("render: filters"):
+        render_filters()
+    view = page_dataset()
     
     # Create tabs
-    tab1, tab2, tab3 = st.tabs(["SQL Queries", "Data Visualizations", "Data Explorer"])
+    tab_names = ["SQL Queries", "Data Visualizations", "Data Explorer", "Receiver Matching"]
+    admin = is_admin()
+    tabs = st.tabs(tab_names + ["Admin"] if admin else tab_names)
+    tab1, tab2, tab3, tab4 = tabs[:4]
     
     with tab1:
         st.markdown('<div class="section-header">SQL Query Interface</div>', unsafe_allow_html=True)
+        if view is not get_dataset(DATA_VERSION):
+            st.caption("Queries run on the rows selected by the sidebar filters.")
         
         col1, col2 = st.columns([1, 3])
         with col1:
@@ -697,22 +507,52 @@ def main():
                 query = predefined_queries[selected_query]
                 st.session_state.current_query = query
                 st.session_state.query_result = run_query(query)
+                st.session_state.query_stats = None
+                if st.session_state.get('query_job') is not None:
+                    st.session_state.query_job.cancel()
+                    st.session_state.query_job = None
         
         with col2:
             st.markdown("### Custom Query")
             custom_query = st.text_area("Enter your SQL query:", height=200,
                                       value=st.session_state.get('current_query', 'SELECT * FROM food LIMIT 10'))
             
+            # Custom SQL streams in chunks on a background thread, stopping at
+            # the row cap or the timeout, so it cannot exhaust memory or tie
+            # up the app for other sessions
+            limit_col, timeout_col = st.columns(2)
+            max_rows = limit_col.number_input("Max rows", min_value=1, value=10000, step=1000)
+            timeout = timeout_col.number_input("Timeout (seconds)", min_value=1, value=30)
+            
             if st.button("Run Custom Query"):
                 st.session_state.current_query = custom_query
-                st.session_state.query_result = run_query(custom_query)
+                start_custom_query(custom_query, int(max_rows), float(timeout))
+            
+            if st.session_state.get('query_job') is not None:
+                follow_custom_query(st.session_state.query_job)
         
         if 'query_result' in st.session_state and not st.session_state.query_result.empty:
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown("### Query Results")
-            st.dataframe(st.session_state.query_result, use_container_width=True)
+            with span("render: query result"):
+                st.dataframe(st.session_state.query_result, use_container_width=True)
             st.markdown(f"**Rows returned:** {len(st.session_state.query_result)}")
+            if st.session_state.get('query_stats'):
+                st.caption(st.session_state.query_stats)
             st.markdown('</div>', unsafe_allow_html=True)
+        
+        cache_stats = get_result_cache().stats()
+        st.caption(f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                   f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['entries']} entries, "
+                   f"{cache_stats['bytes'] / 1e6:.1f} MB, {cache_stats['evictions']} evictions")
+        pool = get_worker_pool(DATA_VERSION)
+        if pool is not None:
+            pool_stats = pool.stats()
+            latency = " ".join(
+                f"p{q} {pool_stats[f'p{q}'] * 1000:.0f} ms" for q in (50, 95, 99) if pool_stats[f'p{q}'] is not None
+            )
+            st.caption(f"Worker pool: {pool_stats['workers']} processes, {pool_stats['pending']} pending, "
+                       f"{pool_stats['completed']} jobs, {pool_stats['rejected']} rejected; latency {latency or 'n/a'}")
     
     with tab2:
         st.markdown('<div class="section-header">Data Visualizations</div>', unsafe_allow_html=True)
@@ -720,88 +560,179 @@ def main():
         # Add key insights section
         st.markdown('<div class="insights-box">', unsafe_allow_html=True)
         st.markdown("### Key Insights from Food Distribution Analysis")
-        st.markdown("""
-        - **Overall Food Claim Rate**: 28.36% of listed food is successfully claimed, with 7314 units claimed out of 25794 units listed.
-        - **Location Disparities**: Claim rates vary significantly by location, with some locations having claim rates over 100% (potentially indicating data issues) and others having 0% claim rates.
-        - **Food Type Preferences**: 'Non-Vegetarian' food is the most claimed food type (3125 units), while 'Vegan' is the least claimed (2565 units).
-        - **Meal Type Preferences**: 'Breakfast' is the most claimed meal type (2423 units), and 'Snacks' are the least claimed (2043 units).
-        - **Top Provider**: 'Barry Group' is the top provider by donated quantity (179 units).
-        - **Top Receivers**: 'William Frederick', 'Anthony Garcia', and 'Matthew Webb' are the top receivers by claim count (5 claims each).
-        """)
+        with span("insights"):
+            st.markdown(insights_markdown(view.insight_summary()))
         st.markdown('</div>', unsafe_allow_html=True)
         
-        # Group visualizations by category
-        viz_categories = {
-            "Overview": [
-                "Overall Food Claim Rate by Status"
-            ],
-            "Providers": [
-                "Distribution of Provider Types",
-                "Top 10 Cities by Number of Providers",
-                "Top 10 Providers by Donated Quantity"
-            ],
-            "Receivers": [
-                "Distribution of Receiver Types",
-                "Top 10 Receivers by Claim Count"
-            ],
-            "Food": [
-                "Counts of Food Types Listed",
-                "Total Quantity Donated per Food Type",
-                "Claimed Quantity by Food Type",
-                "Claimed Quantity by Meal Type"
-            ],
-            "Location Analysis": [
-                "Listed vs. Claimed Quantity for Top 10 Locations by Claim Rate",
-                "Listed vs. Claimed Quantity for Bottom 10 Locations by Claim Rate"
-            ],
-            "Claims": [
-                "Claim Status Distribution",
-                "Claims Over Time"
-            ],
-            "Food Wastage": [
-                "Food Wastage by Food Type",
-                "Food Wastage by Meal Type"
-            ]
-        }
-        
         # Visualization selector
-        selected_category = st.selectbox("Select Visualization Category:", list(viz_categories.keys()))
-        selected_viz = st.selectbox("Select Visualization:", viz_categories[selected_category])
+        selected_category = st.selectbox("Select Visualization Category:", list(VIZ_CATEGORIES.keys()))
+        selected_viz = st.selectbox("Select Visualization:", VIZ_CATEGORIES[selected_category])
+        
+        # Chart controls
+        viz_options = {}
+        if selected_viz == "Claims Over Time":
+            granularity_col, split_col, range_col = st.columns(3)
+            viz_options['granularity'] = granularity_col.radio("Granularity:", list(GRANULARITIES.keys()), index=1, horizontal=True)
+            split = split_col.selectbox("Split by:", ["None", "Status", "Food_Type", "Location"])
+            viz_options['split'] = None if split == "None" else split
+            claim_dates = view.claim_series().date_range()
+            if claim_dates is not None:
+                first_day, last_day = (day.date() for day in claim_dates)
+                picked = range_col.date_input("Date range:", value=(first_day, last_day), min_value=first_day, max_value=last_day)
+                # Until the second date is picked only the start is known.
+                # The full range is the chart's default (and precomputed).
+                if len(picked) == 2 and tuple(picked) != (first_day, last_day):
+                    viz_options['date_range'] = tuple(picked)
+                elif len(picked) == 1:
+                    viz_options['date_range'] = (picked[0], None)
+        
+        elif selected_viz == "Location Ranking":
+            metric_col, order_col, k_col = st.columns(3)
+            metric_labels = {label: metric for metric, label in RANKING_METRICS.items()}
+            viz_options['metric'] = metric_labels[metric_col.selectbox("Rank by:", list(metric_labels.keys()))]
+            viz_options['bottom'] = order_col.radio("Order:", ["Top", "Bottom"], horizontal=True) == "Bottom"
+            viz_options['k'] = int(k_col.number_input("Locations:", min_value=1, value=10, step=1))
         
         # Create and display visualization
         if st.button("Generate Visualization"):
-            fig = create_visualization(selected_viz)
-            if fig:
+            try:
+                # Served from the figure cache when this chart was already
+                # drawn (or precomputed) for the current data. The span
+                # covers the chart's data and its figure; both have spans
+                # of their own.
+                with span(f"viz: {selected_viz}"):
+                    payload = chart_payload(get_figure_cache(), selected_viz, view, chart_runner(view), viz_options)
+            except PoolBusy:
+                st.warning("The server is busy; please try again in a moment.")
+                payload = None
+            except Exception as e:
+                st.error(f"Error generating {selected_viz} visualization: {str(e)}")
+                payload = None
+            if payload:
                 st.markdown('<div class="card">', unsafe_allow_html=True)
-                st.plotly_chart(fig, use_container_width=True)
+                with span("render: chart"):
+                    st.plotly_chart(json.loads(payload), use_container_width=True)
                 st.markdown('</div>', unsafe_allow_html=True)
             else:
-                st.warning("Could not generate visualization. Check if required data is available.")
+                st.warning(CHARTS[selected_viz].get('empty', "Could not generate visualization. Check if required data is available."))
+        
+        warmer = get_chart_warmer(DATA_VERSION)
+        st.caption(f"{warmer.warmed(get_dataset(DATA_VERSION))} of {len(warmer.names)} charts precomputed for the current data")
     
     with tab3:
         st.markdown('<div class="section-header">Data Explorer</div>', unsafe_allow_html=True)
+        if view is not get_dataset(DATA_VERSION):
+            st.caption("Showing the rows selected by the sidebar filters.")
         
         dataset = st.selectbox("Select Dataset:", ["Providers", "Receivers", "Food Listings", "Claims"])
         
-        if dataset == "Providers" and not providers_df.empty:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.dataframe(providers_df, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        elif dataset == "Receivers" and not receivers_df.empty:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.dataframe(receivers_df, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        elif dataset == "Food Listings" and not food_df.empty:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.dataframe(food_df, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        elif dataset == "Claims" and not claims_df.empty:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.dataframe(claims_df, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+        table = EXPLORER_TABLES[dataset]
+        columns = view.engine().columns(table)
+        
+        if columns:
+            # Sorting, filtering and paging run in SQLite; only the visible
+            # page is sent to the browser
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                selected_columns = st.multiselect("Columns:", columns, default=columns)
+                sort_by = st.selectbox("Sort by:", ["(none)"] + columns)
+                descending = st.checkbox("Descending")
+            with col2:
+                filter_column = st.selectbox("Filter column:", ["(none)"] + columns)
+                filter_operator = st.selectbox("Filter operator:", list(FILTER_OPERATORS.keys()))
+                filter_text = st.text_input("Filter value:")
+            with col3:
+                page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=1)
+            
+            filter_spec = None
+            if filter_column != "(none)" and filter_text:
+                filter_spec = (filter_column, filter_operator, filter_text)
+            
+            try:
+                query, params = count_query(table, columns, filter_spec)
+                total_rows = int(run_explorer_query(query, params, view)['Row_Count'].iloc[0])
+                page_count = max((total_rows + page_size - 1) // page_size, 1)
+                with col3:
+                    page = st.number_input("Page:", min_value=1, max_value=page_count, value=1, step=1)
+                
+                query, params = page_query(
+                    table, columns, selected_columns, filter_spec,
+                    sort_by=None if sort_by == "(none)" else sort_by,
+                    descending=descending, page=page, page_size=page_size
+                )
+                with span("explorer query"):
+                    page_df = run_explorer_query(query, params, view)
+                
+                st.markdown('<div class="card">', unsafe_allow_html=True)
+                with span("render: explorer page"):
+                    st.dataframe(page_df, use_container_width=True)
+                st.markdown('</div>', unsafe_allow_html=True)
+                first_row = (page - 1) * page_size + 1 if len(page_df) else 0
+                last_row = first_row + len(page_df) - 1 if len(page_df) else 0
+                st.caption(f"Rows {first_row}-{last_row} of {total_rows} (page {page} of {page_count})")
+            except Exception as e:
+                st.error(f"Could not load page: {str(e)}")
         else:
             st.warning("Selected dataset is empty or not available.")
+    
+    with tab4:
+        st.markdown('<div class="section-header">Receiver Matching</div>', unsafe_allow_html=True)
+        
+        dataset = get_dataset(DATA_VERSION)
+        receivers = dataset.table('receivers')
+        food = dataset.table('food')
+        if {'Receiver_ID', 'City'} <= set(receivers.columns) and {'Food_ID', 'Location', 'Expiry_Date'} <= set(food.columns):
+            # Unclaimed listings are kept in a priority queue by expiry date
+            # and quantity, so the most urgent ones are read off its top
+            scheduler = dataset.scheduler()
+            scheduler.advance(datetime.now())
+            scheduler_stats = scheduler.stats()
+            
+            st.markdown("### Next to Expire")
+            with span("render: next to expire"):
+                st.dataframe(scheduler.upcoming(NEXT_TO_EXPIRE), use_container_width=True)
+            st.caption(f"{scheduler_stats['queued']} unclaimed listings queued; {scheduler_stats['expired_items']} "
+                       f"expired unclaimed ({scheduler_stats['expired_quantity']:.0f} units) since the app started")
+            
+            # Receivers are placed at their city's coordinates from the
+            # offline geocoding table (stand-ins for unknown cities)
+            st.markdown("### Nearest Receivers")
+            col1, col2, col3, col4 = st.columns(4)
+            k = int(col1.number_input("Receivers per listing:", min_value=1, max_value=50, value=5))
+            days = int(col2.number_input("Expiring within (days):", min_value=0, value=7))
+            limit = int(col3.number_input("Listings:", min_value=1, value=1000, step=100))
+            receiver_types = col4.multiselect("Receiver types:", sorted(receivers['Type'].dropna().unique()) if 'Type' in receivers else [])
+            
+            if st.button("Find Nearest Receivers"):
+                until = pd.Timestamp.now().normalize() + pd.Timedelta(days=days)
+                with span("receiver matching"):
+                    listings = scheduler.upcoming(limit, until=until)
+                    matches = dataset.matcher(receiver_types).match(listings, k=k)
+                st.markdown('<div class="card">', unsafe_allow_html=True)
+                with span("render: matches"):
+                    st.dataframe(matches, use_container_width=True)
+                st.markdown('</div>', unsafe_allow_html=True)
+                st.caption(f"{len(listings)} most urgent unclaimed listings expiring in the next {days} days, "
+                           f"{len(matches)} proposed receivers")
+        else:
+            st.warning("Receiver or food listing data is not available.")
+    
+    if admin:
+        with tabs[4]:
+            render_admin()
+    
+    # Precompute the charts on startup and after the data changed, once the
+    # page is drawn so the warm-up does not slow down the first render
+    get_chart_warmer(DATA_VERSION).request(get_dataset(DATA_VERSION), chart_runner())
 
 # Run the app
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        with span("rerun"):
+            main()
+    finally:
+        if profiler is not None:
+            st.session_state.profile = profiler.stop()
+    # Rerun once more so the Admin tab shows the profile just taken
+    if profiler is not None:
+        st.rerun()
@@ -0,0 +1,116 @@
+# Compare the per-status filters "Overall Food Claim Rate by Status" used to
+# run (three passes, listings with claims in several statuses counted in
+# each) with the single-pass chart_data.claim_rate_by_status, on a large
+# synthetic claims table.
+#
+# With --data-dir the result on the cleaned datasets is also checked against
+# the figures quoted in the dashboard's Key Insights (from the analysis
+# notebook): 7314 of 25794 units claimed, a 28.36% claim rate.
+#
+#   python benchmarks/bench_claim_rate.py --claims 10000000
+#   python benchmarks/bench_claim_rate.py --data-dir Datasets/Cleaned-datasets/
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from chart_data import claim_rate_by_status
+from data_loader import read_tables
+from synthetic_data import STATUSES
+
+# Key Insights figures for the cleaned datasets
+INSIGHT_LISTED = 25794
+INSIGHT_CLAIMED = 7314
+INSIGHT_RATE = 28.36
+
+
+# Previous computation: one filter and isin() pass per status
+def per_status_filters(tables):
+    food_df = tables['food']
+    claims_df = tables['claims']
+    total_listed_quantity = food_df['Quantity'].sum()
+    quantities = {}
+    for status in ['Completed', 'Cancelled', 'Pending']:
+        status_claims_df = claims_df[claims_df['Status'] == status]
+        status_food_ids = status_claims_df['Food_ID'].unique()
+        quantities[status] = food_df[food_df['Food_ID'].isin(status_food_ids)]['Quantity'].sum()
+    quantities['Unclaimed'] = total_listed_quantity - sum(quantities.values())
+    return quantities
+
+
+# Only the columns the claim rate reads
+def make_claims(claims, food, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'food': pd.DataFrame({
+            'Food_ID': np.arange(1, food + 1),
+            'Quantity': rng.integers(1, 51, food)
+        }),
+        'claims': pd.DataFrame({
+            'Food_ID': rng.integers(1, food + 1, claims),
+            'Status': rng.choice(STATUSES, claims)
+        })
+    }
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def validate(data_dir):
+    result = claim_rate_by_status(read_tables(data_dir)).set_index('Status')
+    listed = int(result['Quantity'].sum())
+    claimed = int(result.loc['Completed', 'Quantity'])
+    rate = round(result.loc['Completed', 'Percentage'], 2)
+    print(f"Listed {listed} (expected {INSIGHT_LISTED}), claimed {claimed} (expected {INSIGHT_CLAIMED}), "
+          f"claim rate {rate:.2f}% (expected {INSIGHT_RATE:.2f}%)")
+    print(result.to_string())
+    return listed == INSIGHT_LISTED and claimed == INSIGHT_CLAIMED and rate == INSIGHT_RATE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the claim rate by status computation")
+    parser.add_argument("--claims", type=int, default=10_000_000, help="rows in the synthetic claims table")
+    parser.add_argument("--food", type=int, default=1_000_000, help="rows in the synthetic food table")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per method (best is reported)")
+    parser.add_argument("--data-dir", help="cleaned datasets to validate against the Key Insights figures")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        if not validate(args.data_dir):
+            print("FAIL: does not match the Key Insights figures")
+            sys.exit(1)
+        print("OK: matches the Key Insights figures\n")
+
+    tables = make_claims(args.claims, args.food)
+    print(f"Synthetic data: {args.claims:,} claims over {args.food:,} listings\n")
+
+    old = per_status_filters(tables)
+    new = claim_rate_by_status(tables).set_index('Status')['Quantity']
+    total = tables['food']['Quantity'].sum()
+    print(f"{'Status':<12} {'Per-status filters':>20} {'Single pass':>14}")
+    for status in new.index:
+        print(f"{status:<12} {old[status]:>20,} {new[status]:>14,}")
+    print(f"{'Sum':<12} {sum(old[status] for status in new.index if status != 'Unclaimed'):>20,} "
+          f"{new.drop('Unclaimed').sum():>14,}  (claimed buckets; total listed {total:,})\n")
+    assert old['Completed'] == new['Completed']
+    assert new.sum() == total and (new >= 0).all()
+
+    old_time = best_of(lambda: per_status_filters(tables), args.repeat)
+    new_time = best_of(lambda: claim_rate_by_status(tables), args.repeat)
+    print(f"{'Per-status filters':<20} {old_time:>8.3f}s")
+    print(f"{'Single pass':<20} {new_time:>8.3f}s  {old_time / new_time:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
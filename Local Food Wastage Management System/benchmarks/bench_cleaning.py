@@ -0,0 +1,96 @@
+# Time the cleaning pipeline (cleaning.py) on generated raw exports: the
+# synthetic tables with stray spaces, lower-cased values, repeated IDs and
+# unreadable quantities mixed in, as the raw data has. Each worker count is
+# timed on a fresh output directory, then a second run on the same input
+# (which should find nothing to do). Each run is a separate `python
+# cleaning.py` process, whose peak memory (its own or its largest worker's)
+# is reported, to show it does not grow with the input.
+#
+#   python benchmarks/bench_cleaning.py --rows 1000000 --workers 1 4
+import argparse
+import os
+import multiprocessing
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import numpy as np
+import pandas as pd
+
+from cleaning import RAW_FILES
+from synthetic_data import make_tables
+
+
+# Write the raw exports: every value as text, 10% of them padded with
+# spaces and lower-cased, 5% of the rows repeated
+def write_raw_tables(raw_dir, rows, seed=0):
+    os.makedirs(raw_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    for name, df in make_tables(rows, seed).items():
+        df = df.astype(str)
+        for column in df.columns:
+            messy = rng.random(len(df)) < 0.1
+            df.loc[messy, column] = "  " + df.loc[messy, column].str.lower() + " "
+        if 'Quantity' in df:
+            df.loc[rng.random(len(df)) < 0.01, 'Quantity'] = "n/a"
+        repeats = df.sample(frac=0.05, random_state=seed)
+        df = pd.concat([df, repeats]).sample(frac=1, random_state=seed)
+        df.to_csv(os.path.join(raw_dir, RAW_FILES[name]), index=False)
+
+
+# Run the cleaning CLI; returns its wall time, output and peak memory in MB
+def run_cleaning(raw_dir, out_dir, workers, chunk_rows):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(APP_DIR, "cleaning.py"), raw_dir, "--out", out_dir,
+                             "--workers", str(workers), "--chunk-rows", str(chunk_rows)],
+                            cwd=APP_DIR, stdout=subprocess.PIPE, text=True)
+    output = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    seconds = time.perf_counter() - start
+    proc.stdout.close()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise SystemExit(f"cleaning.py failed with status {proc.returncode}")
+    return seconds, output, usage.ru_maxrss / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chunked cleaning pipeline")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per raw table")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--chunk-rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="fms-clean-")
+    try:
+        raw_dir = os.path.join(root, "raw")
+        start = time.perf_counter()
+        # In its own process, so generating the data does not count
+        writer = multiprocessing.get_context("spawn").Process(target=write_raw_tables, args=(raw_dir, args.rows, args.seed))
+        writer.start()
+        writer.join()
+        size = sum(os.path.getsize(os.path.join(raw_dir, f)) for f in os.listdir(raw_dir))
+        print(f"Raw exports: {size / 1e6:.0f} MB written in {time.perf_counter() - start:.1f}s\n")
+
+        # Each worker count once, each on an output directory of its own,
+        # so a timed pass never finds the previous pass's output current
+        for i, workers in enumerate(sorted(set(args.workers))):
+            out_dir = os.path.join(root, f"out-{i}-{workers}")
+            seconds, output, peak = run_cleaning(raw_dir, out_dir, workers, args.chunk_rows)
+            print(f"{workers} workers: {seconds:.2f}s, peak {peak:.0f} MB")
+            print(output)
+            seconds, output, _ = run_cleaning(raw_dir, out_dir, workers, args.chunk_rows)
+            print(f"{workers} workers, same input again: {seconds:.2f}s")
+            print(output)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
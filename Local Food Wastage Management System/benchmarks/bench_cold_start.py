@@ -0,0 +1,186 @@
+# Time the dashboard's cold start: what its imports cost, and how long a
+# fresh `streamlit run` process takes to draw the metrics row for its
+# first visitor.
+#
+# Imports are timed with `python -X importtime` on the app's own import
+# statements; the heaviest top-level modules are listed. For the cold start
+# each pass starts a new server on a generated dataset (Parquet cache
+# already built, as on a pod with a warm volume), connects to it like a
+# browser and records when the server accepts the connection, when the
+# metrics row arrives and when the first run of the page finishes.
+#
+#   python benchmarks/bench_cold_start.py --rows 1000000 --out cold.json
+#   python benchmarks/bench_cold_start.py --rows 1000000 --compare cold.json
+import argparse
+import ast
+import asyncio
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from data_cache import load_tables
+from data_loader import DATA_DIR
+from run_benchmarks import compare
+from synthetic_data import write_skewed_tables
+
+APP = os.path.join(APP_DIR, "app.py")
+
+# Text of the first metric card, i.e. the metrics row has been drawn
+METRICS_MARKER = "Total Providers"
+
+
+# The import statements at the top level of the app
+def app_imports():
+    with open(APP) as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# Cumulative import time in seconds of each module imported directly by the
+# app's imports (and what they pull in), heaviest first
+def import_times():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", app_imports()],
+                            cwd=APP_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        # Top-level entries only: nested ones are already in their parent
+        seconds = int(cumulative) / 1e6
+        times[name.strip()] = seconds
+        total += seconds
+    return total, sorted(times.items(), key=lambda item: -item[1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+async def first_render(port, started, timeout):
+    deadline = started + timeout
+    while True:
+        try:
+            conn = await websockets.connect(f"ws://localhost:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None)
+            break
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise TimeoutError("the server did not start")
+            await asyncio.sleep(0.02)
+    times = {'server accepts connections': time.perf_counter() - started}
+    async with conn:
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        await conn.send(msg.SerializeToString())
+        while True:
+            fm = ForwardMsg()
+            fm.ParseFromString(await asyncio.wait_for(conn.recv(), deadline - time.perf_counter()))
+            kind = fm.WhichOneof("type")
+            if kind == "delta" and 'first metrics row' not in times and METRICS_MARKER in str(fm.delta):
+                times['first metrics row'] = time.perf_counter() - started
+            elif kind == "script_finished":
+                times['first page run finished'] = time.perf_counter() - started
+                return times
+
+
+# One cold start of a server in `root`; returns the times and the server's
+# peak memory in MB
+def cold_start(root, timeout):
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+        cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        times = asyncio.run(first_render(port, started, timeout))
+    finally:
+        proc.terminate()
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    return times, usage.ru_maxrss / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the dashboard's imports and cold start")
+    parser.add_argument("--rows", type=int, default=100_000, help="food listings and claims to generate")
+    parser.add_argument("--data-dir", help="use these cleaned CSVs instead of generating data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="cold starts (medians are reported)")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per cold start")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    total, modules = import_times()
+    print(f"{'App imports':<40} {total:>8.3f}s")
+    for name, seconds in modules[:10]:
+        print(f"  {name:<38} {seconds:>8.3f}s")
+
+    steps = {'app imports': {'seconds': total, 'samples': [total], 'rss_mb': 0.0, 'peak_mb': 0.0, 'error': None}}
+    root = tempfile.mkdtemp(prefix="fms-cold-")
+    try:
+        data_dir = os.path.join(root, DATA_DIR)
+        if args.data_dir:
+            shutil.copytree(args.data_dir, data_dir, ignore=shutil.ignore_patterns(".cache"))
+        else:
+            write_skewed_tables(data_dir, args.rows, seed=args.seed)
+        # Build the Parquet cache once, as a previous start would have
+        load_tables(data_dir)
+
+        print()
+        for run_number in range(1, args.repeat + 1):
+            times, peak = cold_start(root, args.timeout)
+            print(f"Start {run_number}: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in times.items())
+                  + f", peak {peak:.0f} MB")
+            for name, seconds in times.items():
+                step = steps.setdefault(name, {'seconds': 0.0, 'samples': [], 'rss_mb': 0.0, 'peak_mb': 0.0, 'error': None})
+                step['samples'].append(seconds)
+                step['seconds'] = statistics.median(step['samples'])
+                step['peak_mb'] = step['rss_mb'] = max(step['peak_mb'], peak)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"\n{'Step (median)':<40} {'Time':>9}")
+    for name, step in steps.items():
+        print(f"{name:<40} {step['seconds']:>8.3f}s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+                'rows': args.rows,
+                'modules': dict(modules),
+                'steps': steps
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(steps, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
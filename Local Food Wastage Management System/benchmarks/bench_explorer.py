@@ -0,0 +1,67 @@
+# Time-to-first-page of the Data Explorer on large tables: the paged SQL
+# path against serializing the whole DataFrame, which is what st.dataframe
+# did with the full table.
+#
+#   python benchmarks/bench_explorer.py --rows 2000000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+
+from explorer import count_query, page_query
+from query_engine import QueryEngine
+from synthetic_data import make_tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+# Arrow IPC serialization of the full frame, as sent to the browser
+def serialize(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Data Explorer time-to-first-page")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows per table")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    tables = make_tables(args.rows)
+    start = time.perf_counter()
+    engine = QueryEngine({'food': tables['food']})
+    print(f"Food table: {args.rows:,} rows (engine load, once per data version: {time.perf_counter() - start:.2f}s)\n")
+
+    columns = list(tables['food'].columns)
+    size = [0]
+    full_time = timed(lambda: size.__setitem__(0, serialize(tables['food'])))
+    print(f"{'Full table to st.dataframe (serialize)':<44} {full_time:>8.3f}s  {size[0] / 1e6:,.0f} MB")
+
+    cases = [
+        ("First page", {}),
+        ("First page sorted by Expiry_Date (indexed)", {'sort_by': 'Expiry_Date'}),
+        ("First page sorted by Location", {'sort_by': 'Location', 'descending': True}),
+        ("First page, Food_Type = 'Vegan'", {'filter_spec': ('Food_Type', 'equals', 'Vegan')}),
+        ("Page 1000, 3 columns", {'selected': ['Food_ID', 'Quantity', 'Location'], 'page': 1000}),
+    ]
+    for label, options in cases:
+        selected = options.pop('selected', columns)
+        sql, params = page_query('food', columns, selected, page_size=args.page_size, **options)
+        count_sql, count_params = count_query('food', columns, options.get('filter_spec'))
+        elapsed = timed(lambda: (engine.query(count_sql, count_params), engine.query(sql, params)))
+        print(f"{label:<44} {elapsed:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
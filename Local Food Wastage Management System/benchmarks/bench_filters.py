@@ -0,0 +1,73 @@
+# Global filter latency on large tables: building the per-value row bitmaps
+# (filters.FilterIndex, once per data change), then for a few selections the
+# row counts shown in the sidebar and the filtered tables, against the same
+# selection evaluated with pandas masks over every table.
+#
+#   python benchmarks/bench_filters.py --rows 1000000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from data_loader import compact_table
+from filters import FilterIndex
+from synthetic_data import make_tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+# The selection with boolean masks: each table scanned once per dimension,
+# claims through a merge with their listing
+def pandas_counts(tables, selection):
+    food = tables['food']
+    claims = tables['claims'].merge(food[['Food_ID', 'Location', 'Food_Type', 'Provider_Type']],
+                                    on='Food_ID', how='left')
+    masks = {name: pd.Series(True, index=df.index) for name, df in tables.items()}
+    masks['claims'] = pd.Series(True, index=claims.index)
+    frames = dict(tables, claims=claims)
+    columns = {'City': {'providers': 'City', 'receivers': 'City', 'food': 'Location', 'claims': 'Location'},
+               'Food_Type': {'food': 'Food_Type', 'claims': 'Food_Type'},
+               'Provider_Type': {'providers': 'Type', 'food': 'Provider_Type', 'claims': 'Provider_Type'}}
+    for dimension, values in selection.items():
+        for name, column in columns[dimension].items():
+            masks[name] &= frames[name][column].isin(values)
+    return {name: int(mask.sum()) for name, mask in masks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the global filter bitmaps")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    args = parser.parse_args()
+
+    tables = {name: compact_table(name, df) for name, df in make_tables(args.rows).items()}
+    build, index = timed(lambda: FilterIndex(tables))
+    print(f"Tables: {args.rows:,} rows each; filter index built in {build:.2f}s\n")
+
+    cities = index.options('City', 20)
+    cases = [
+        ("Food type", {'Food_Type': ['Vegan']}),
+        ("Food type + provider type", {'Food_Type': ['Vegan'], 'Provider_Type': ['Restaurant', 'Supermarket']}),
+        ("20 cities", {'City': cities}),
+        ("20 cities + food type + provider type", {'City': cities, 'Food_Type': ['Vegan', 'Vegetarian'],
+                                                   'Provider_Type': ['Restaurant']}),
+    ]
+    print(f"{'Selection':<40} {'Bitmap counts':>14} {'Filtered tables':>16} {'Pandas masks':>13}")
+    for label, selection in cases:
+        counts_time, counts = timed(lambda: index.counts(selection))
+        apply_time, _ = timed(lambda: index.apply(tables, selection))
+        pandas_time, expected = timed(lambda: pandas_counts(tables, selection))
+        if counts != expected:
+            raise SystemExit(f"{label}: bitmap counts {counts} differ from pandas {expected}")
+        print(f"{label:<40} {counts_time:>13.3f}s {apply_time:>15.3f}s {pandas_time:>12.3f}s")
+
+
+if __name__ == "__main__":
+    main()
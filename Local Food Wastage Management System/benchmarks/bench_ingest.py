@@ -0,0 +1,89 @@
+# Measure live ingestion throughput: listings and claims posted to the local
+# HTTP endpoint (or appended to a tailed JSONL file) and applied to a
+# LiveDataset whose SQL engine, aggregate cube and wastage tracker are
+# already built.
+#
+#   python benchmarks/bench_ingest.py --rows 100000 --events 50000 --source http
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import EventIngestor
+from live_data import LiveDataset
+from synthetic_data import STATUSES, make_tables
+
+
+# Alternate new listings with claims on them
+def make_events(tables, count):
+    next_food = int(tables['food']['Food_ID'].max()) + 1
+    next_claim = int(tables['claims']['Claim_ID'].max()) + 1
+    template = tables['food'].iloc[0]
+    events = []
+    for i in range(count // 2):
+        food_id = next_food + i
+        events.append({
+            'table': 'food', 'Food_ID': food_id, 'Food_Name': template['Food_Name'], 'Quantity': 10,
+            'Expiry_Date': "2030-01-01", 'Provider_ID': 1, 'Provider_Type': template['Provider_Type'],
+            'Location': template['Location'], 'Food_Type': template['Food_Type'], 'Meal_Type': template['Meal_Type']
+        })
+        events.append({
+            'table': 'claims', 'Claim_ID': next_claim + i, 'Food_ID': food_id, 'Receiver_ID': 1,
+            'Status': STATUSES[i % len(STATUSES)], 'Timestamp': "2030-01-01 12:00:00"
+        })
+    return events
+
+
+def wait_for(dataset, target, timeout=600):
+    deadline = time.time() + timeout
+    while dataset.counts()['food'] + dataset.counts()['claims'] < target and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark live ingestion throughput")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows per table before ingestion")
+    parser.add_argument("--events", type=int, default=50_000, help="events to ingest")
+    parser.add_argument("--source", choices=["http", "tail"], default="http")
+    parser.add_argument("--post-size", type=int, default=500, help="events per HTTP request / file write")
+    args = parser.parse_args()
+
+    tables = make_tables(args.rows)
+    dataset = LiveDataset(tables)
+    dataset.engine(), dataset.cube(), dataset.wastage()
+    events = make_events(tables, args.events)
+    target = len(tables['food']) + len(tables['claims']) + len(events)
+    ingestor = EventIngestor(dataset)
+
+    start = time.perf_counter()
+    if args.source == "http":
+        server = ingestor.serve(0)
+        url = f"http://127.0.0.1:{server.server_address[1]}/events"
+        for i in range(0, len(events), args.post_size):
+            body = json.dumps(events[i:i + args.post_size]).encode()
+            request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(request).read()
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="fms-ingest-"), "events.jsonl")
+        open(path, "w").close()
+        ingestor.tail(path, poll_interval=0.05)
+        with open(path, "a") as f:
+            for i in range(0, len(events), args.post_size):
+                f.write("".join(json.dumps(event) + "\n" for event in events[i:i + args.post_size]))
+                f.flush()
+    wait_for(dataset, target)
+    elapsed = time.perf_counter() - start
+    ingestor.stop()
+
+    print(f"Base tables: {args.rows:,} rows each; source: {args.source}")
+    print(f"Ingested {len(events):,} events in {elapsed:.2f}s ({len(events) / elapsed:,.0f} events/s), "
+          f"{ingestor.stats['batches']} batches, {ingestor.stats['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Time the computed Key Insights panel: the first summary for a data
+# version, a refresh after an appended batch, and a warm render (cached
+# summary to markdown), which should stay under 50 ms.
+#
+#   python benchmarks/bench_insights.py --rows 1000000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insights import insights_markdown
+from live_data import LiveDataset
+from synthetic_data import make_tables
+
+WARM_BUDGET_SECONDS = 0.05
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Key Insights panel")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--batch", type=int, default=1000, help="rows per appended batch")
+    parser.add_argument("--repeat", type=int, default=20, help="warm renders (worst is reported)")
+    args = parser.parse_args()
+
+    tables = make_tables(args.rows)
+    extra = make_tables(args.batch, seed=1)
+    dataset = LiveDataset(tables, version="bench")
+    print(f"Tables: {args.rows:,} rows each\n")
+
+    cold_time = timed(lambda: insights_markdown(dataset.insight_summary()))
+    warm_time = max(timed(lambda: insights_markdown(dataset.insight_summary())) for _ in range(args.repeat))
+    append_time = timed(lambda: (dataset.append('food', extra['food']), dataset.append('claims', extra['claims'])))
+    refresh_time = timed(lambda: insights_markdown(dataset.insight_summary()))
+
+    print(f"{'First summary (cold)':<32} {cold_time:>8.3f}s")
+    print(f"{'Append {:,} listings + claims'.format(args.batch):<32} {append_time:>8.3f}s")
+    print(f"{'Refresh after append':<32} {refresh_time:>8.3f}s")
+    print(f"{'Warm render (worst)':<32} {warm_time * 1000:>8.3f}ms  "
+          f"{'OK' if warm_time < WARM_BUDGET_SECONDS else 'over'} (budget {WARM_BUDGET_SECONDS * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Time nearest-receiver matching: build the grid index over the receivers
+# and propose the k nearest for every listing, on synthetic tables with
+# stand-in city coordinates. A sample of listings is checked against a
+# brute-force search over all receivers.
+#
+# --unique-points places every listing and receiver at its own random
+# coordinates instead of its city's, the worst case for the index.
+#
+#   python benchmarks/bench_matching.py --listings 100000 --receivers 100000 --k 5
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from geocode import STAND_IN_BOUNDS
+from matching import GridIndex, ReceiverMatcher, to_xyz
+from synthetic_data import make_tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def random_points(n, rng):
+    south, north, west, east = STAND_IN_BOUNDS
+    return to_xyz(rng.uniform(south, north, n), rng.uniform(west, east, n))
+
+
+# k nearest by comparing each query with every point (ties to the lowest id)
+def brute_force(points, ids, queries, k):
+    distances = np.sqrt(((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+    order = np.lexsort((np.broadcast_to(ids, distances.shape), distances), axis=-1)[:, :k]
+    return ids[order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark nearest-receiver matching")
+    parser.add_argument("--listings", type=int, default=100_000, help="food listings to match")
+    parser.add_argument("--receivers", type=int, default=100_000, help="receivers to match against")
+    parser.add_argument("--k", type=int, default=5, help="receivers proposed per listing")
+    parser.add_argument("--check", type=int, default=200, help="listings checked against brute force")
+    parser.add_argument("--unique-points", action="store_true", help="random coordinates per row instead of per city")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    if args.unique_points:
+        receivers = random_points(args.receivers, rng)
+        receiver_ids = np.arange(1, args.receivers + 1)
+        listings = random_points(args.listings, rng)
+        index, build_time = timed(lambda: GridIndex(receivers, ids=receiver_ids))
+        (found, _), match_time = timed(lambda: index.query(listings, args.k))
+        print(f"{args.listings:,} listings x {args.receivers:,} receivers, each at its own point\n")
+    else:
+        receivers_df = make_tables(args.receivers, seed=1)['receivers']
+        food_df = make_tables(args.listings, seed=2)['food']
+        matcher, build_time = timed(lambda: ReceiverMatcher(receivers_df))
+        matches, match_time = timed(lambda: matcher.match(food_df, k=args.k))
+        print(f"{args.listings:,} listings in {food_df['Location'].nunique():,} cities x "
+              f"{args.receivers:,} receivers in {receivers_df['City'].nunique():,} cities\n")
+        index = matcher.index
+        receivers = index.points
+        receiver_ids = index.ids
+        coordinates = matcher._geocode(food_df['Location'])
+        listings = to_xyz(coordinates['Latitude'], coordinates['Longitude'])
+        found = matches.pivot(index='Food_ID', columns='Rank', values='Receiver_ID').loc[food_df['Food_ID']].to_numpy()
+
+    print(f"{'Build index':<24} {build_time:>8.3f}s")
+    print(f"{'Match k={}'.format(args.k):<24} {match_time:>8.3f}s  "
+          f"({args.listings / match_time:,.0f} listings/s)")
+
+    sample = rng.choice(args.listings, min(args.check, args.listings), replace=False)
+    expected = brute_force(receivers, receiver_ids, listings[sample], args.k)
+    mismatches = int((found[sample] != expected).any(axis=1).sum())
+    print(f"{'Brute-force check':<24} {len(sample) - mismatches}/{len(sample)} listings match")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Memory of the loaded tables: each table read with pandas' defaults next to
+# the compact types the dashboard keeps it in (data_loader.compact_table),
+# per table and per column, measured deeply (string contents included).
+#
+#   python benchmarks/bench_memory.py --rows 1000000
+#   python benchmarks/bench_memory.py --data-dir "Datasets/Cleaned-datasets" --columns
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import pandas as pd
+
+from data_loader import TABLE_FILES, compact_table, memory_report
+from synthetic_data import write_skewed_tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory of the tables as read and as kept")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="food listings and claims to generate")
+    parser.add_argument("--data-dir", help="use these cleaned CSVs instead of generating data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--columns", action="store_true", help="also print every column")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="fms-memory-")
+    try:
+        data_dir = args.data_dir
+        if not data_dir:
+            data_dir = os.path.join(root, "data")
+            write_skewed_tables(data_dir, args.rows, seed=args.seed)
+        plain, compact = {}, {}
+        for name, file_name in TABLE_FILES.items():
+            plain[name] = pd.read_csv(os.path.join(data_dir, file_name))
+            compact[name] = compact_table(name, plain[name].copy())
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    before = memory_report(plain)
+    after = memory_report(compact)
+    if args.columns:
+        columns = before.merge(after, on=['Table', 'Column', 'Rows'], suffixes=('_before', '_after'))
+        print(f"{'Column':<28} {'Before':>22} {'After':>26}")
+        for row in columns.itertuples():
+            print(f"{row.Table + '.' + row.Column:<28} {row.Type_before:>10} {row.Bytes_before / 1e6:>9.1f} MB"
+                  f" {row.Type_after:>14} {row.Bytes_after / 1e6:>9.1f} MB")
+        print()
+
+    print(f"{'Table':<12} {'Rows':>12} {'Before':>12} {'After':>12} {'Reduction':>10}")
+    totals = pd.DataFrame({'Before': before.groupby('Table', sort=False)['Bytes'].sum(),
+                           'After': after.groupby('Table', sort=False)['Bytes'].sum(),
+                           'Rows': after.groupby('Table', sort=False)['Rows'].first()})
+    totals.loc['total'] = [totals['Before'].sum(), totals['After'].sum(), totals['Rows'].sum()]
+    for name, row in totals.iterrows():
+        print(f"{name:<12} {int(row['Rows']):>12,} {row['Before'] / 1e6:>9.1f} MB {row['After'] / 1e6:>9.1f} MB"
+              f" {row['Before'] / max(row['After'], 1):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Compare the persistent QueryEngine with the per-call pandasql path that
+# run_query used before, on synthetic tables.
+#
+#   python benchmarks/bench_query_engine.py --rows 1000000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pandasql import sqldf
+
+from queries import predefined_queries
+from query_engine import QueryEngine
+from synthetic_data import make_tables
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark QueryEngine against pandasql")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per query (best is reported)")
+    args = parser.parse_args()
+
+    tables = make_tables(args.rows)
+    print(f"Tables: {args.rows:,} rows each")
+
+    start = time.perf_counter()
+    engine = QueryEngine(tables)
+    print(f"QueryEngine build (one-off): {time.perf_counter() - start:.3f}s\n")
+
+    print(f"{'Query':<40} {'sqldf (s)':>10} {'engine (s)':>11} {'speedup':>9}")
+    for name, query in predefined_queries.items():
+        sqldf_time = best_of(lambda: sqldf(query, tables), args.repeat)
+        engine_time = best_of(lambda: engine.query(query), args.repeat)
+        print(f"{name:<40} {sqldf_time:>10.3f} {engine_time:>11.3f} {sqldf_time / engine_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
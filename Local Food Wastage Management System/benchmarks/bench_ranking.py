@@ -0,0 +1,62 @@
+# Compare the top/bottom 10 location charts' previous computation (merge the
+# listed and claimed rollups, compute every claim rate, sort) with reads
+# from ranking.LocationRanking, and time appending a batch to the ranking.
+#
+#   python benchmarks/bench_ranking.py --rows 1000000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from aggregates import build_cube
+from ranking import LocationRanking
+from synthetic_data import make_tables
+
+
+# Previous computation, once per chart
+def sorted_claim_rates(cube, ascending):
+    listed = cube.rollup('Location')[['Location', 'Listed_Quantity']]
+    claimed = cube.rollup('Location', statuses='Completed')[['Location', 'Claimed_Quantity']]
+    rates = pd.merge(listed, claimed, on='Location', how='left')
+    rates['Claimed_Quantity'] = rates['Claimed_Quantity'].fillna(0)
+    rates['Claim_Rate'] = (rates['Claimed_Quantity'] / rates['Listed_Quantity']) * 100
+    return rates.sort_values(by='Claim_Rate', ascending=ascending).head(10)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the location ranking index")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--batch", type=int, default=1000, help="rows per appended batch")
+    args = parser.parse_args()
+
+    tables = make_tables(args.rows)
+    extra = make_tables(args.batch, seed=1)
+    extra['food']['Food_ID'] += args.rows
+    cube = build_cube(tables['food'], tables['claims'])
+    print(f"Tables: {args.rows:,} rows each\n")
+
+    # The cube memoizes rollups; time the merge and sort on warm rollups
+    sorted_claim_rates(cube, False)
+    _, old_time = timed(lambda: (sorted_claim_rates(cube, False), sorted_claim_rates(cube, True)))
+    ranking, build_time = timed(lambda: LocationRanking(tables['food'], tables['claims']))
+    _, new_time = timed(lambda: (ranking.top('claim_rate', 10), ranking.top('claim_rate', 10, bottom=True)))
+    _, append_time = timed(lambda: (ranking.add_listings(extra['food']), ranking.add_claims(extra['claims'])))
+
+    print(f"{'Merge and sort (top + bottom)':<34} {old_time:>8.3f}s")
+    print(f"{'Build ranking (once)':<34} {build_time:>8.3f}s")
+    print(f"{'Ranking reads (top + bottom)':<34} {new_time:>8.3f}s")
+    print(f"{'Append {:,} listings + claims'.format(args.batch):<34} {append_time:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
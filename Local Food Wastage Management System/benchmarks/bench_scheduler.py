@@ -0,0 +1,53 @@
+# Time the expiry scheduler under a stream of events: build the queue, then
+# apply batches of new listings and claims, reading the most urgent
+# listings after each batch as the dashboard does.
+#
+#   python benchmarks/bench_scheduler.py --rows 1000000 --events 200000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from scheduler import ExpiryScheduler
+from synthetic_data import make_tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the expiry scheduler")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--events", type=int, default=200_000, help="listings plus claims to apply")
+    parser.add_argument("--batch", type=int, default=1000, help="listings (and claims) per batch")
+    args = parser.parse_args()
+
+    tables = make_tables(args.rows)
+    new = args.events // 2
+    events = make_tables(new, seed=1)
+    events['food']['Food_ID'] += args.rows
+    events['claims']['Food_ID'] = np.random.default_rng(1).integers(1, args.rows + new + 1, new)
+    print(f"Tables: {args.rows:,} rows each; {args.events:,} events in batches of {args.batch:,}\n")
+
+    start = time.perf_counter()
+    scheduler = ExpiryScheduler(tables['food'], tables['claims'])
+    build_time = time.perf_counter() - start
+
+    read_times = []
+    start = time.perf_counter()
+    for i in range(0, new, args.batch):
+        scheduler.add_listings(events['food'].iloc[i:i + args.batch])
+        scheduler.add_claims(events['claims'].iloc[i:i + args.batch])
+        read_start = time.perf_counter()
+        scheduler.upcoming(20)
+        read_times.append(time.perf_counter() - read_start)
+    event_time = time.perf_counter() - start
+
+    print(f"{'Build queue':<24} {build_time:>8.3f}s  ({scheduler.stats()['queued']:,} queued)")
+    print(f"{'Apply events':<24} {event_time:>8.3f}s  ({args.events / event_time:,.0f} events/s)")
+    print(f"{'Next 20 (worst read)':<24} {max(read_times) * 1000:>8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
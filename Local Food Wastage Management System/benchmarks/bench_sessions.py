@@ -0,0 +1,133 @@
+# Load test for the shared dataset store: run the dashboard for 1, 10 and
+# 100 simulated sessions in one process and report the process RSS after
+# each step. Every session keeps its state alive, like a browser tab left
+# open. With st.cache_data each session held its own copy of the tables;
+# with the shared store RSS should grow by far less than the table size per
+# session.
+#
+# Each AppTest session also holds the rendered page, its widget state and
+# the harness's own bookkeeping, whatever the size of the tables. To
+# separate that from the data, the same sessions are run again (in a fresh
+# process) on a --baseline-rows dataset, and its per-session growth is
+# subtracted. The first session waits for the chart warm-up, whose shared
+# figures would otherwise land in the next step.
+#
+#   python benchmarks/bench_sessions.py --rows 200000 --sessions 1 10 100
+import argparse
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from data_loader import DATA_DIR, TABLE_FILES
+from synthetic_data import make_tables
+
+
+# Current resident set size in bytes (peak RSS where /proc is unavailable)
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Rerun a session until the background chart warm-up reports every chart
+# precomputed, so its figures are not counted as per-session growth
+def wait_for_warmup(session, timeout=600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for caption in session.caption:
+            match = re.match(r"(\d+) of (\d+) charts precomputed", caption.value)
+            if match and match.group(1) == match.group(2):
+                return
+        time.sleep(0.5)
+        session.run()
+    raise RuntimeError("chart warm-up did not finish")
+
+
+# Run the dashboard on `rows` rows per table for each session count (run in
+# a process of its own). Returns the table size in bytes, the RSS before
+# the first session and (sessions, RSS, seconds) per step.
+def measure(rows, session_counts):
+    from streamlit.testing.v1 import AppTest
+
+    base_path = tempfile.mkdtemp(prefix="fms-bench-")
+    try:
+        tables = make_tables(rows)
+        data_dir = os.path.join(base_path, DATA_DIR)
+        os.makedirs(data_dir)
+        for name, df in tables.items():
+            df.to_csv(os.path.join(data_dir, TABLE_FILES[name]), index=False)
+        table_bytes = sum(int(df.memory_usage(deep=True).sum()) for df in tables.values())
+        del tables
+        # The app reads DATA_DIR relative to the working directory
+        os.chdir(base_path)
+
+        baseline = rss_bytes()
+        steps = []
+        sessions = []
+        for target in session_counts:
+            start = time.perf_counter()
+            while len(sessions) < target:
+                session = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=600).run()
+                if session.exception:
+                    raise RuntimeError(session.exception[0].message)
+                if not sessions:
+                    wait_for_warmup(session)
+                sessions.append(session)
+            steps.append((target, rss_bytes(), time.perf_counter() - start))
+        return table_bytes, baseline, steps
+    finally:
+        shutil.rmtree(base_path)
+
+
+# RSS added per session since the previous step
+def per_session(steps, i):
+    if i == 0:
+        return 0
+    (previous, previous_rss, _), (target, rss, _) = steps[i - 1], steps[i]
+    return (rss - previous_rss) / (target - previous)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure RSS with many concurrent dashboard sessions")
+    parser.add_argument("--rows", type=int, default=200_000, help="rows per table")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100], help="session counts to measure")
+    parser.add_argument("--baseline-rows", type=int, default=100,
+                        help="rows per table of the run whose per-session growth is subtracted")
+    args = parser.parse_args()
+    session_counts = sorted(set(args.sessions))
+
+    context = multiprocessing.get_context("spawn")
+    runs = {}
+    for rows in (args.baseline_rows, args.rows):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            runs[rows] = pool.submit(measure, rows, session_counts).result()
+
+    table_bytes, baseline, steps = runs[args.rows]
+    empty_steps = runs[args.baseline_rows][2]
+    print(f"Tables: {args.rows:,} rows each, {table_bytes / 1e6:.1f} MB in memory")
+    print(f"Per-session overhead measured on {args.baseline_rows:,} rows per table\n")
+    print(f"{'Sessions':>8} {'RSS (MB)':>10} {'Growth (MB)':>12} {'Per added session (MB)':>23}"
+          f" {'Overhead (MB)':>14} {'Net of overhead (MB)':>21} {'Run time':>9}")
+    for i, (target, rss, elapsed) in enumerate(steps):
+        growth = per_session(steps, i)
+        overhead = per_session(empty_steps, i)
+        print(f"{target:>8} {rss / 1e6:>10.1f} {(rss - baseline) / 1e6:>12.1f} {growth / 1e6:>23.2f}"
+              f" {overhead / 1e6:>14.2f} {(growth - overhead) / 1e6:>21.2f} {elapsed:>8.1f}s")
+    print(f"\nA private copy of the tables per session would add {table_bytes / 1e6:.1f} MB per session.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Time loading the four tables at startup: parsing the CSVs (the old
+# load_data path), building the Parquet cache, and loading from a warm cache.
+#
+#   python benchmarks/bench_startup.py --rows 1000000
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_cache import cache_dir, load_tables
+from data_loader import TABLE_FILES, read_tables
+from synthetic_data import make_tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark table loading at startup")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--repeat", type=int, default=3, help="warm runs (best is reported)")
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp(prefix="fms-bench-")
+    try:
+        for name, df in make_tables(args.rows).items():
+            df.to_csv(os.path.join(base_path, TABLE_FILES[name]), index=False)
+        csv_size = sum(os.path.getsize(os.path.join(base_path, f)) for f in TABLE_FILES.values())
+        print(f"Tables: {args.rows:,} rows each, {csv_size / 1e6:.1f} MB of CSV\n")
+
+        csv_time = min(timed(lambda: read_tables(base_path)) for _ in range(args.repeat))
+        build_time = timed(lambda: load_tables(base_path))
+        warm_time = min(timed(lambda: load_tables(base_path)) for _ in range(args.repeat))
+        parquet_size = sum(
+            os.path.getsize(os.path.join(cache_dir(base_path), f))
+            for f in os.listdir(cache_dir(base_path)) if f.endswith(".parquet")
+        )
+
+        print(f"{'CSV parse (read_tables)':<32} {csv_time:>8.3f}s")
+        print(f"{'Cache build (first start)':<32} {build_time:>8.3f}s")
+        print(f"{'Cache load (warm start)':<32} {warm_time:>8.3f}s  {csv_time / warm_time:.1f}x faster")
+        print(f"{'Parquet size':<32} {parquet_size / 1e6:>8.1f} MB")
+    finally:
+        shutil.rmtree(base_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Compare the per-click "Claims Over Time" computation the dashboard used to
+# run (copy the claims, parse Timestamp twice, resample by week) with reads
+# from timeseries.ClaimTimeSeries, on claims spread over several years.
+#
+#   python benchmarks/bench_timeseries.py --claims 2000000 --years 5
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from synthetic_data import make_tables
+from timeseries import ClaimTimeSeries
+
+
+# Previous computation
+def weekly_resample(claims_df):
+    claims_time_df = claims_df.copy()
+    claims_time_df['Date'] = pd.to_datetime(claims_time_df['Timestamp']).dt.date
+    claims_time_df['Date'] = pd.to_datetime(claims_time_df['Date'])
+    return claims_time_df.set_index('Date').resample('W').size().reset_index(name='Claims')
+
+
+# Synthetic tables with claim timestamps spread over `years`
+def make_claims(claims, food, years, seed=0):
+    tables = make_tables(food, seed=seed)
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now().normalize()
+    times = end - pd.to_timedelta(rng.integers(0, years * 365 * 24 * 60, claims), unit='min')
+    tables['claims'] = pd.DataFrame({
+        'Claim_ID': np.arange(1, claims + 1),
+        'Food_ID': rng.integers(1, food + 1, claims),
+        'Receiver_ID': rng.integers(1, food + 1, claims),
+        'Status': rng.choice(tables['claims']['Status'].unique(), claims),
+        'Timestamp': times.strftime("%Y-%m-%d %H:%M:%S")
+    })
+    return tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Claims Over Time rollups")
+    parser.add_argument("--claims", type=int, default=2_000_000, help="rows in the synthetic claims table")
+    parser.add_argument("--food", type=int, default=100_000, help="rows in the synthetic food table")
+    parser.add_argument("--years", type=int, default=5, help="years the claim timestamps span")
+    parser.add_argument("--batch", type=int, default=1000, help="claims per appended batch")
+    args = parser.parse_args()
+
+    tables = make_claims(args.claims, args.food, args.years)
+    print(f"Synthetic data: {args.claims:,} claims over {args.years} years, {args.food:,} listings\n")
+
+    old, old_time = timed(lambda: weekly_resample(tables['claims']))
+    store, build_time = timed(lambda: ClaimTimeSeries(tables['claims'], tables['food']))
+    new, _ = timed(lambda: store.series('W'))
+    assert old['Claims'].tolist() == new['Claims'].tolist(), "weekly totals differ from resample('W')"
+
+    extra = make_claims(args.batch, args.food, 1, seed=1)['claims']
+    _, append_time = timed(lambda: store.add_claims(extra))
+
+    print(f"{'Resample per click (weekly)':<34} {old_time:>8.3f}s")
+    print(f"{'Build rollups (once)':<34} {build_time:>8.3f}s")
+    print(f"{'Append {:,} claims'.format(args.batch):<34} {append_time:>8.3f}s")
+    for granularity in ['D', 'W', 'M']:
+        for split in [None, 'Status', 'Food_Type', 'Location']:
+            store.series(granularity, split, top=10)
+            _, read_time = timed(lambda: store.series(granularity, split, top=10))
+            print(f"{'Read {} by {}'.format(granularity, split or 'total'):<34} {read_time:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# Run the dashboard end to end on a synthetic dataset and time every step a
+# user can trigger: loading the tables, starting the app, each predefined
+# query and each visualization. Memory (resident and peak) is recorded
+# after every step.
+#
+# The app runs in-process through Streamlit's AppTest, so each timing is a
+# full script rerun with the button pressed; the plain "rerun" step is the
+# baseline every other step includes. Each of the --repeat passes starts
+# with Streamlit's caches cleared, so every query and chart runs cold, and
+# the median over the passes is reported.
+#
+# Results are written as JSON; --compare prints them next to an earlier run
+# and exits with status 1 when a step got slower by more than --threshold
+# (and every pass of this run was slower than every pass of the other).
+#
+#   python benchmarks/run_benchmarks.py --rows 1000000 --out base.json
+#   python benchmarks/run_benchmarks.py --rows 1000000 --out new.json --compare base.json
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import pandas as pd
+
+from data_cache import load_tables
+from data_loader import DATA_DIR, TABLE_FILES
+from synthetic_data import write_skewed_tables
+
+APP = os.path.join(APP_DIR, "app.py")
+
+# Steps faster than this are not reported as regressions, however large the
+# relative change
+MIN_DELTA_SECONDS = 0.05
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+# Problems the app reported on the page after a step, if any
+def page_problems(at):
+    if at.exception:
+        return str(at.exception[0].message)
+    problems = [e.value for e in at.error] + [w.value for w in at.warning if w.value.startswith("Could not")]
+    return "; ".join(problems) or None
+
+
+# Timings of each step over the passes; a step's result is its median
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+
+    def time(self, name, fn, check=None):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        error = check(result) if check else None
+        step = self.samples.setdefault(name, {'seconds': [], 'rss_mb': 0.0, 'peak_mb': 0.0, 'error': None})
+        step['seconds'].append(seconds)
+        step['rss_mb'] = max(step['rss_mb'], rss_mb())
+        step['peak_mb'] = peak_mb()
+        step['error'] = step['error'] or error
+        status = f"  ERROR: {error[:80]}" if error else ""
+        print(f"{name[:60]:<62} {seconds:>8.3f}s {rss_mb():>8.0f} MB{status}", flush=True)
+        return result
+
+    def steps(self):
+        return {
+            name: dict(step, seconds=statistics.median(step['seconds']), samples=step['seconds'])
+            for name, step in self.samples.items()
+        }
+
+
+def run(args, recorder):
+    import streamlit as st
+    from streamlit.logger import get_logger
+    from streamlit.testing.v1 import AppTest
+
+    # Keep Streamlit's per-run deprecation notices out of the report
+    get_logger("streamlit.deprecation_util").disabled = True
+
+    root = tempfile.mkdtemp(prefix="fms-run-")
+    try:
+        data_dir = os.path.join(root, DATA_DIR)
+        if args.data_dir:
+            shutil.copytree(args.data_dir, data_dir, ignore=shutil.ignore_patterns(".cache"))
+        else:
+            recorder.time("generate data", lambda: write_skewed_tables(data_dir, args.rows, seed=args.seed))
+        os.chdir(root)
+
+        recorder.time("load_data (first start, builds the cache)", lambda: load_tables(DATA_DIR))
+
+        for run_number in range(1, args.repeat + 1):
+            print(f"\nPass {run_number} of {args.repeat}")
+            # Every pass starts cold: no shared dataset, result cache or pool
+            st.cache_resource.clear()
+            st.cache_data.clear()
+            recorder.time("load_data (warm cache)", lambda: load_tables(DATA_DIR))
+
+            at = AppTest.from_file(APP, default_timeout=args.timeout)
+            recorder.time("app startup", at.run, page_problems)
+            recorder.time("rerun", at.run, page_problems)
+
+            queries = widget(at.selectbox, "Select a query:").options
+            for query in queries:
+                widget(at.selectbox, "Select a query:").select(query).run()
+                recorder.time(f"query: {query}", widget(at.button, "Run Selected Query").click().run, page_problems)
+
+            categories = widget(at.selectbox, "Select Visualization Category:").options
+            for category in categories:
+                widget(at.selectbox, "Select Visualization Category:").select(category).run()
+                for viz in widget(at.selectbox, "Select Visualization:").options:
+                    widget(at.selectbox, "Select Visualization:").select(viz).run()
+                    recorder.time(f"viz: {viz}", widget(at.button, "Generate Visualization").click().run, page_problems)
+    finally:
+        os.chdir(APP_DIR)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+# Print this run next to `baseline`; returns the names of regressed steps
+def compare(steps, baseline, threshold):
+    regressions = []
+    print(f"\n{'Step':<62} {'Before':>9} {'After':>9} {'Change':>8}")
+    for name, step in steps.items():
+        before = baseline['steps'].get(name)
+        if before is None:
+            print(f"{name[:60]:<62} {'-':>9} {step['seconds']:>8.3f}s {'new':>8}")
+            continue
+        change = step['seconds'] / before['seconds'] - 1 if before['seconds'] > 0 else 0.0
+        # Slower by the threshold and beyond the spread of both runs' passes
+        regressed = (change > threshold and step['seconds'] - before['seconds'] > MIN_DELTA_SECONDS
+                     and min(step['samples']) > max(before.get('samples', [before['seconds']])))
+        if regressed:
+            regressions.append(name)
+        print(f"{name[:60]:<62} {before['seconds']:>8.3f}s {step['seconds']:>8.3f}s {change:>+8.0%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    for name in baseline['steps']:
+        if name not in steps:
+            print(f"{name[:60]:<62} {baseline['steps'][name]['seconds']:>8.3f}s {'-':>9} {'gone':>8}")
+    before_peak = max((s['peak_mb'] for s in baseline['steps'].values()), default=0)
+    after_peak = max((s['peak_mb'] for s in steps.values()), default=0)
+    print(f"\nPeak memory: {before_peak:.0f} MB before, {after_peak:.0f} MB after")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every query and visualization of the dashboard")
+    parser.add_argument("--rows", type=int, default=100_000, help="food listings and claims to generate (10k to 50M)")
+    parser.add_argument("--data-dir", help="use these cleaned CSVs instead of generating data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="cold passes over the app (medians are reported)")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per app run")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    rows = None
+    if args.data_dir:
+        rows = {name: sum(1 for _ in open(os.path.join(args.data_dir, file_name))) - 1 for name, file_name in TABLE_FILES.items()}
+    print(f"Dataset: {rows if rows else f'{args.rows:,} synthetic listings and claims'}\n")
+
+    recorder = Recorder()
+    run(args, recorder)
+    steps = recorder.steps()
+    print(f"\n{'Step (median)':<62} {'Time':>9} {'RSS':>11}")
+    for name, step in steps.items():
+        print(f"{name[:60]:<62} {step['seconds']:>8.3f}s {step['rss_mb']:>8.0f} MB")
+    results = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'rows': rows or args.rows,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'steps': steps
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    errors = [name for name, step in steps.items() if step['error']]
+    if errors:
+        print(f"\n{len(errors)} steps reported errors: {', '.join(errors)}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(steps, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# Synthetic providers/receivers/food/claims tables with the same columns and
+# dtypes as the cleaned datasets, used by the benchmark scripts.
+#
+# Run as a script to write skewed datasets at any scale as cleaned CSVs:
+#
+#   python benchmarks/synthetic_data.py /tmp/fms-10m --rows 10000000
+import argparse
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from data_loader import TABLE_FILES
+
+PROVIDER_TYPES = ["Supermarket", "Grocery Store", "Restaurant", "Catering Service"]
+RECEIVER_TYPES = ["Ngo", "Charity", "Shelter", "Individual"]
+FOOD_NAMES = ["Bread", "Soup", "Fruits", "Vegetables", "Rice", "Pasta", "Dairy", "Fish", "Chicken", "Salad"]
+FOOD_TYPES = ["Vegetarian", "Vegan", "Non-Vegetarian"]
+MEAL_TYPES = ["Breakfast", "Lunch", "Dinner", "Snacks"]
+STATUSES = ["Completed", "Cancelled", "Pending"]
+
+
+# Build the four tables with `rows` rows each (as in the sample data, where
+# every table has the same length). Dates are centred on today so the
+# expiry-relative queries return rows.
+def make_tables(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = np.array([f"City {i}" for i in range(max(rows // 2, 1))])
+    today = pd.Timestamp.now().normalize()
+
+    providers = pd.DataFrame({
+        'Provider_ID': np.arange(1, rows + 1),
+        'Name': [f"Provider {i}" for i in rng.integers(0, max(rows * 97 // 100, 1), rows)],
+        'Type': rng.choice(PROVIDER_TYPES, rows),
+        'Address': [f"{i} Main Street" for i in range(rows)],
+        'City': rng.choice(cities, rows),
+        'Contact': [f"555-{i:07d}" for i in range(rows)]
+    })
+    receivers = pd.DataFrame({
+        'Receiver_ID': np.arange(1, rows + 1),
+        'Name': [f"Receiver {i}" for i in rng.integers(0, max(rows * 99 // 100, 1), rows)],
+        'Type': rng.choice(RECEIVER_TYPES, rows),
+        'City': rng.choice(cities, rows),
+        'Contact': [f"556-{i:07d}" for i in range(rows)]
+    })
+    food = pd.DataFrame({
+        'Food_ID': np.arange(1, rows + 1),
+        'Food_Name': rng.choice(FOOD_NAMES, rows),
+        'Quantity': rng.integers(1, 51, rows),
+        'Expiry_Date': today + pd.to_timedelta(rng.integers(-14, 15, rows), unit='D'),
+        'Provider_ID': rng.integers(1, rows + 1, rows),
+        'Provider_Type': rng.choice(PROVIDER_TYPES, rows),
+        'Location': rng.choice(cities, rows),
+        'Food_Type': rng.choice(FOOD_TYPES, rows),
+        'Meal_Type': rng.choice(MEAL_TYPES, rows)
+    })
+    claim_times = today - pd.to_timedelta(rng.integers(0, 30 * 24 * 60, rows), unit='min')
+    claims = pd.DataFrame({
+        'Claim_ID': np.arange(1, rows + 1),
+        'Food_ID': rng.integers(1, rows + 1, rows),
+        'Receiver_ID': rng.integers(1, rows + 1, rows),
+        'Status': rng.choice(STATUSES, rows),
+        'Timestamp': claim_times.strftime("%Y-%m-%d %H:%M:%S")
+    })
+    return {
+        'providers': providers,
+        'receivers': receivers,
+        'food': food,
+        'claims': claims
+    }
+
+
+# Zipf-like sampler over ids 1..n: id popularity falls off as about
+# 1 / rank**s. Ranks are drawn from the inverse CDF of the continuous power
+# law and scattered over the id range by a multiplicative hash, so the
+# sampler takes constant memory even for tens of millions of ids.
+class SkewedIds:
+    def __init__(self, n, s, rng):
+        self.n = n
+        self.s = s
+        self.multiplier = 2654435761 % n or 1
+        while math.gcd(self.multiplier, n) != 1:
+            self.multiplier += 1
+        self.offset = int(rng.integers(0, n))
+
+    def sample(self, rng, size):
+        u = rng.random(size)
+        if self.s == 1:
+            ranks = self.n ** u
+        else:
+            ranks = ((self.n ** (1 - self.s) - 1) * u + 1) ** (1 / (1 - self.s))
+        ranks = np.clip(ranks.astype(np.int64), 1, self.n) - 1
+        return (ranks * self.multiplier + self.offset) % self.n + 1
+
+
+# Status mix of the claims (completed claims dominate, as in the sample)
+STATUS_WEIGHTS = [0.5, 0.2, 0.3]
+
+
+# Write providers/receivers/food/claims CSVs with skewed, more realistic
+# distributions than make_tables, in chunks of `chunk_rows` so scales of
+# tens of millions of rows never need the tables in memory:
+#   - cities follow a Zipf law (a few large cities, a long tail)
+#   - a few providers list most of the food and a few receivers make most
+#     of the claims; popular listings draw several claims
+#   - quantities are log-normal (mostly small, capped at 50), claim statuses
+#     are mostly Completed
+# `rows` is the number of food listings and of claims; providers and
+# receivers default to a tenth of that.
+def write_skewed_tables(base_path, rows, providers=None, receivers=None, skew=1.1, seed=0, chunk_rows=1_000_000):
+    rng = np.random.default_rng(seed)
+    providers = providers or max(rows // 10, 1)
+    receivers = receivers or max(rows // 10, 1)
+    city_count = max(rows // 50, 10)
+    cities = np.array([f"City {i}" for i in range(city_count)])
+    city_ids = SkewedIds(city_count, skew, rng)
+    provider_ids = SkewedIds(providers, skew, rng)
+    receiver_ids = SkewedIds(receivers, skew, rng)
+    food_ids = SkewedIds(rows, 0.6, rng)
+    today = pd.Timestamp.now().normalize()
+    os.makedirs(base_path, exist_ok=True)
+
+    def write(name, chunks):
+        path = os.path.join(base_path, TABLE_FILES[name])
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+    def ranges(total):
+        for start in range(0, total, chunk_rows):
+            yield start, min(chunk_rows, total - start)
+
+    def provider_chunks():
+        for start, n in ranges(providers):
+            ids = np.arange(start + 1, start + n + 1)
+            yield pd.DataFrame({
+                'Provider_ID': ids,
+                'Name': [f"Provider {i}" for i in ids],
+                'Type': rng.choice(PROVIDER_TYPES, n, p=[0.35, 0.3, 0.25, 0.1]),
+                'Address': [f"{i} Main Street" for i in ids],
+                'City': cities[city_ids.sample(rng, n) - 1],
+                'Contact': [f"555-{i:07d}" for i in ids]
+            })
+
+    def receiver_chunks():
+        for start, n in ranges(receivers):
+            ids = np.arange(start + 1, start + n + 1)
+            yield pd.DataFrame({
+                'Receiver_ID': ids,
+                'Name': [f"Receiver {i}" for i in ids],
+                'Type': rng.choice(RECEIVER_TYPES, n, p=[0.3, 0.3, 0.15, 0.25]),
+                'City': cities[city_ids.sample(rng, n) - 1],
+                'Contact': [f"556-{i:07d}" for i in ids]
+            })
+
+    def food_chunks():
+        for start, n in ranges(rows):
+            yield pd.DataFrame({
+                'Food_ID': np.arange(start + 1, start + n + 1),
+                'Food_Name': rng.choice(FOOD_NAMES, n),
+                'Quantity': np.clip(np.round(rng.lognormal(2.3, 0.8, n)), 1, 50).astype(np.int64),
+                'Expiry_Date': (today + pd.to_timedelta(rng.integers(-14, 15, n), unit='D')).strftime("%Y-%m-%d"),
+                'Provider_ID': provider_ids.sample(rng, n),
+                'Provider_Type': rng.choice(PROVIDER_TYPES, n),
+                'Location': cities[city_ids.sample(rng, n) - 1],
+                'Food_Type': rng.choice(FOOD_TYPES, n, p=[0.45, 0.2, 0.35]),
+                'Meal_Type': rng.choice(MEAL_TYPES, n, p=[0.2, 0.35, 0.3, 0.15])
+            })
+
+    def claim_chunks():
+        for start, n in ranges(rows):
+            times = today - pd.to_timedelta(rng.integers(0, 30 * 24 * 60, n), unit='min')
+            yield pd.DataFrame({
+                'Claim_ID': np.arange(start + 1, start + n + 1),
+                'Food_ID': food_ids.sample(rng, n),
+                'Receiver_ID': receiver_ids.sample(rng, n),
+                'Status': rng.choice(STATUSES, n, p=STATUS_WEIGHTS),
+                'Timestamp': times.strftime("%Y-%m-%d %H:%M:%S")
+            })
+
+    write('providers', provider_chunks())
+    write('receivers', receiver_chunks())
+    write('food', food_chunks())
+    write('claims', claim_chunks())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write skewed synthetic datasets as cleaned CSVs")
+    parser.add_argument("out", help="directory for the CSVs (e.g. Datasets/Cleaned-datasets/)")
+    parser.add_argument("--rows", type=int, default=100_000, help="food listings and claims (10k to 50M)")
+    parser.add_argument("--providers", type=int, help="providers (default rows / 10)")
+    parser.add_argument("--receivers", type=int, help="receivers (default rows / 10)")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of city, provider and receiver popularity")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_skewed_tables(args.out, args.rows, args.providers, args.receivers, args.skew, args.seed)
+
+
+if __name__ == "__main__":
+    main()
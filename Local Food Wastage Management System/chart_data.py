@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Chart data computed from the raw tables. Each function takes the dict of
+# tables and returns a small DataFrame, so it can run in the Streamlit
+# process or be sent to a worker process (see worker_pool.py).
+
+
+# Value counts, most common first, ties in order of first appearance, also
+# for categoricals (whose value_counts would order ties by category and list
+# unused categories)
+def _value_counts(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+    return series.value_counts()
+
+
+def provider_type_counts(tables):
+    counts = _value_counts(tables['providers']['Type']).reset_index()
+    counts.columns = ['Provider_Type', 'Count']
+    return counts
+
+
+def top_cities(tables, n=10):
+    counts = _value_counts(tables['providers']['City']).reset_index().head(n)
+    counts.columns = ['City', 'Count']
+    return counts
+
+
+def receiver_type_counts(tables):
+    counts = _value_counts(tables['receivers']['Type']).reset_index()
+    counts.columns = ['Receiver_Type', 'Count']
+    return counts
+
+
+# A listing with claims in several statuses counts once, under the first of
+# these: a completed claim means the food was collected, a pending one that
+# it is still spoken for; only listings whose claims were all cancelled are
+# counted as cancelled
+STATUS_PRECEDENCE = ['Completed', 'Pending', 'Cancelled']
+
+# Order of the bars in the claim rate chart
+CLAIM_RATE_STATUSES = ['Completed', 'Cancelled', 'Pending', 'Unclaimed']
+
+
+# Position of each claim status in STATUS_PRECEDENCE (-1 for other statuses)
+def status_ranks(statuses):
+    codes, uniques = pd.factorize(statuses)
+    if not len(uniques):
+        return codes
+    return pd.Index(STATUS_PRECEDENCE).get_indexer(uniques)[codes]
+
+
+# Food_IDs of claims and listings as indexes into one array: the IDs
+# themselves when they are small non-negative integers (the usual case),
+# otherwise codes from factorizing them (-1 for IDs without claims)
+def _dense_ids(claim_ids, food_ids):
+    if claim_ids.dtype.kind in 'iu' and food_ids.dtype.kind in 'iu' and len(claim_ids) and len(food_ids):
+        # Python ints: narrow ID types would overflow on high + 1
+        low = int(min(claim_ids.min(), food_ids.min()))
+        high = int(max(claim_ids.max(), food_ids.max()))
+        if low >= 0 and high < 4 * (len(claim_ids) + len(food_ids)):
+            return claim_ids, food_ids, high + 1
+    codes, uniques = pd.factorize(claim_ids)
+    return codes, pd.Index(uniques).get_indexer(food_ids), len(uniques)
+
+
+# Listed quantity per claim status and its share of the total listed
+# quantity. Each listing is resolved to a single status (STATUS_PRECEDENCE,
+# or Unclaimed without claims in those statuses), so the four buckets add up
+# to the total.
+def claim_rate_by_status(tables):
+    food_df = tables['food']
+    claims_df = tables['claims']
+    unclaimed = len(STATUS_PRECEDENCE)
+
+    rank = status_ranks(claims_df['Status'])
+
+    # Best rank per listing: write the ranks from last to first precedence,
+    # so each Food_ID ends up with the best rank among its claims. The extra
+    # last slot stays Unclaimed for listings whose ID no claim uses.
+    claim_ids, food_ids, size = _dense_ids(claims_df['Food_ID'].to_numpy(), food_df['Food_ID'].to_numpy())
+    best_rank = np.full(size + 1, unclaimed, dtype=np.int8)
+    valid = claim_ids >= 0
+    for status_rank in range(unclaimed - 1, -1, -1):
+        best_rank[claim_ids[valid & (rank == status_rank)]] = status_rank
+
+    # All four buckets in one group-by over the listings
+    statuses = STATUS_PRECEDENCE + ['Unclaimed']
+    quantities = food_df['Quantity'].groupby(best_rank[food_ids]).sum()
+    quantities = quantities.reindex(range(len(statuses)), fill_value=0)
+    quantities.index = statuses
+
+    total_listed_quantity = quantities.sum()
+    result = pd.DataFrame({'Status': CLAIM_RATE_STATUSES, 'Quantity': quantities[CLAIM_RATE_STATUSES].to_numpy()})
+    result['Percentage'] = (result['Quantity'] / total_listed_quantity) * 100 if total_listed_quantity > 0 else 0.0
+    return result
+
+
+def top_providers(tables, n=10):
+    # Merge food and providers
+    merged = pd.merge(tables['food'], tables['providers'], on='Provider_ID', how='left')
+    provider_qty = merged.groupby('Name')['Quantity'].sum().reset_index()
+    return provider_qty.sort_values('Quantity', ascending=False).head(n)
+
+
+# Columns of each table the functions above read: a worker process loads
+# only these from the pool's snapshot for each job (see worker_pool.py)
+TABLE_COLUMNS = {
+    'provider_type_counts': {'providers': ['Type']},
+    'top_cities': {'providers': ['City']},
+    'receiver_type_counts': {'receivers': ['Type']},
+    'claim_rate_by_status': {'food': ['Food_ID', 'Quantity'], 'claims': ['Food_ID', 'Status']},
+    'top_providers': {'food': ['Provider_ID', 'Quantity'], 'providers': ['Provider_ID', 'Name']}
+}
@@ -0,0 +1,438 @@
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+import pandas as pd
+import chart_data
+from aggregates import UNCLAIMED
+from profiling import span
+from timeseries import GRANULARITIES
+
+# Claims Over Time shows at most this many statuses, food types or locations
+SERIES_TOP = 10
+
+# Location Ranking metrics -> labels
+RANKING_METRICS = {
+    'claim_rate': "Claim Rate",
+    'wastage': "Wasted Quantity",
+    'volume': "Listed Quantity"
+}
+
+# Figures kept by FigureCache
+FIGURE_CACHE_ENTRIES = 256
+
+TRANSPARENT = 'rgba(0,0,0,0)'
+
+
+# Chart data. Each function takes the shared dataset (live_data.py), a
+# `run(fn, **kwargs)` that computes a chart_data function on the raw tables
+# (on the worker pool when there is one) and the chart's options, and
+# returns the DataFrame to plot; an empty frame means nothing to draw.
+
+def _cube_rollup(dataset, dimension, value, name, statuses=None):
+    cube = dataset.cube()
+    if cube.empty:
+        return pd.DataFrame(columns=[dimension, name])
+    rows = cube.rollup(dimension, statuses=statuses)[[dimension, value]]
+    rows.columns = [dimension, name]
+    return rows
+
+
+def food_type_counts(dataset, run):
+    return _cube_rollup(dataset, 'Food_Type', 'Listing_Count', 'Count').sort_values('Count', ascending=False)
+
+
+def food_type_quantity(dataset, run):
+    return _cube_rollup(dataset, 'Food_Type', 'Listed_Quantity', 'Quantity')
+
+
+def claimed_by(dimension):
+    def claimed(dataset, run):
+        return _cube_rollup(dataset, dimension, 'Claimed_Quantity', 'Quantity', statuses='Completed')
+    return claimed
+
+
+def claim_status_counts(dataset, run):
+    counts = _cube_rollup(dataset, 'Status', 'Claim_Count', 'Count')
+    if counts.empty:
+        return counts
+    counts = counts[counts['Status'] != UNCLAIMED]
+    return counts.sort_values('Count', ascending=False)
+
+
+def top_receivers(dataset, run, n=10):
+    enriched = dataset.enriched_claims()
+    if 'Receiver_Name' not in enriched.columns:
+        return enriched.iloc[0:0]
+    completed = enriched[enriched['Status'] == 'Completed']
+    counts = completed.groupby('Receiver_Name', observed=True).size().reset_index()
+    counts.columns = ['Receiver_Name', 'Claim_Count']
+    return counts.sort_values('Claim_Count', ascending=False).head(n)
+
+
+# Claims per period from the precomputed rollups
+def claims_over_time(dataset, run, granularity, split, date_range):
+    start, end = date_range
+    return dataset.claim_series().series(GRANULARITIES[granularity], split, start, end, top=SERIES_TOP)
+
+
+# Wasted quantity per value of `dimension`; whatever passed its expiry date
+# since the last refresh is expired first
+def wasted_by(dimension):
+    def wasted(dataset, run):
+        tracker = dataset.wastage()
+        tracker.advance(datetime.now())
+        return tracker.wastage_by(dimension).sort_values(dimension)
+    return wasted
+
+
+# Listed against claimed (or, ranked by wastage, wasted) quantity of the
+# top or bottom k locations, one row per location and quantity
+def ranked_locations(dataset, run, metric, bottom, k):
+    if metric == 'wastage':
+        dataset.wastage().advance(datetime.now())
+    ranked = dataset.ranking().top(metric, k, bottom=bottom)
+    value_vars = ['Listed_Quantity', 'Wasted_Quantity'] if metric == 'wastage' else ['Listed_Quantity', 'Claimed_Quantity']
+    return ranked.melt(id_vars='Location', value_vars=value_vars, var_name='Quantity_Type', value_name='Quantity')
+
+
+def from_table(fn):
+    def compute(dataset, run):
+        return run(fn)
+    return compute
+
+
+def ranking_title(metric, bottom, k):
+    return f"{'Bottom' if bottom else 'Top'} {k} Locations by {RANKING_METRICS[metric]}"
+
+
+# Chart registry: one entry per visualization.
+#   requires  {table: [columns]} the chart needs; without them (or with the
+#             table empty) there is nothing to draw
+#   data      chart data function (see above)
+#   figure    'bar', 'pie' or 'line' and the Plotly Express arguments;
+#             bars and pies are colored with the Pastel palette
+#   layout    figure layout (axis titles); bars and lines get a transparent
+#             background unless the layout sets one
+#   options   the chart's controls and their defaults, which are what the
+#             warm-up computes
+#   daily     the chart changes with the date (listings expire), not only
+#             with the data; a function of the options where it depends on them
+#   empty     message shown when there is nothing to draw
+# A title or figure argument may be a function of the options.
+CHARTS = {
+    "Overall Food Claim Rate by Status": {
+        'requires': {'food': [], 'claims': []},
+        # Percentage of the total listed quantity per claim status
+        'data': from_table(chart_data.claim_rate_by_status),
+        'figure': {'kind': 'bar', 'x': 'Status', 'y': 'Percentage', 'color': 'Status'},
+        'layout': {'xaxis_title': "Claim Status", 'yaxis_title': "Percentage of Total Listed Quantity"}
+    },
+    "Distribution of Provider Types": {
+        'requires': {'providers': ['Type']},
+        'data': from_table(chart_data.provider_type_counts),
+        'figure': {'kind': 'bar', 'x': 'Provider_Type', 'y': 'Count', 'color': 'Provider_Type'},
+        'layout': {'xaxis_title': "Provider Type", 'yaxis_title': "Count", 'plot_bgcolor': 'rgba(1,1,1,1)'}
+    },
+    "Top 10 Cities by Number of Providers": {
+        'requires': {'providers': ['City']},
+        'data': from_table(chart_data.top_cities),
+        'figure': {'kind': 'bar', 'x': 'City', 'y': 'Count', 'color': 'City'},
+        'layout': {'xaxis_title': "City", 'yaxis_title': "Number of Providers"}
+    },
+    "Top 10 Providers by Donated Quantity": {
+        'requires': {'food': [], 'providers': []},
+        'data': from_table(chart_data.top_providers),
+        'figure': {'kind': 'bar', 'x': 'Name', 'y': 'Quantity', 'color': 'Name'},
+        'layout': {'xaxis_title': "Provider", 'yaxis_title': "Total Quantity Donated"}
+    },
+    "Distribution of Receiver Types": {
+        'requires': {'receivers': ['Type']},
+        'data': from_table(chart_data.receiver_type_counts),
+        'figure': {'kind': 'pie', 'names': 'Receiver_Type', 'values': 'Count'}
+    },
+    "Top 10 Receivers by Claim Count": {
+        'requires': {'claims': [], 'receivers': []},
+        'data': top_receivers,
+        'figure': {'kind': 'bar', 'x': 'Receiver_Name', 'y': 'Claim_Count', 'color': 'Receiver_Name'},
+        'layout': {'xaxis_title': "Receiver", 'yaxis_title': "Number of Claims"}
+    },
+    "Counts of Food Types Listed": {
+        'data': food_type_counts,
+        'figure': {'kind': 'bar', 'x': 'Food_Type', 'y': 'Count', 'color': 'Food_Type'},
+        'layout': {'xaxis_title': "Food Type", 'yaxis_title': "Count"}
+    },
+    "Total Quantity Donated per Food Type": {
+        'data': food_type_quantity,
+        'figure': {'kind': 'bar', 'x': 'Food_Type', 'y': 'Quantity', 'color': 'Food_Type'},
+        'layout': {'xaxis_title': "Food Type", 'yaxis_title': "Total Quantity"}
+    },
+    "Claimed Quantity by Food Type": {
+        'requires': {'food': [], 'claims': []},
+        'data': claimed_by('Food_Type'),
+        'figure': {'kind': 'bar', 'x': 'Food_Type', 'y': 'Quantity', 'color': 'Food_Type'},
+        'layout': {'xaxis_title': "Food Type", 'yaxis_title': "Claimed Quantity"}
+    },
+    "Claimed Quantity by Meal Type": {
+        'requires': {'food': [], 'claims': []},
+        'data': claimed_by('Meal_Type'),
+        'figure': {'kind': 'pie', 'names': 'Meal_Type', 'values': 'Quantity'}
+    },
+    "Listed vs. Claimed Quantity for Top 10 Locations by Claim Rate": {
+        'requires': {'food': []},
+        'data': ranked_locations,
+        'options': {'metric': 'claim_rate', 'bottom': False, 'k': 10},
+        'figure': {'kind': 'bar', 'x': 'Location', 'y': 'Quantity', 'color': 'Quantity_Type', 'barmode': 'group'},
+        'layout': {'xaxis_title': "Location", 'yaxis_title': "Quantity"}
+    },
+    "Listed vs. Claimed Quantity for Bottom 10 Locations by Claim Rate": {
+        'requires': {'food': []},
+        'data': ranked_locations,
+        'options': {'metric': 'claim_rate', 'bottom': True, 'k': 10},
+        'figure': {'kind': 'bar', 'x': 'Location', 'y': 'Quantity', 'color': 'Quantity_Type', 'barmode': 'group'},
+        'layout': {'xaxis_title': "Location", 'yaxis_title': "Quantity"}
+    },
+    "Location Ranking": {
+        'requires': {'food': []},
+        'data': ranked_locations,
+        'options': {'metric': 'claim_rate', 'bottom': False, 'k': 10},
+        'daily': lambda metric, **options: metric == 'wastage',
+        'title': ranking_title,
+        'figure': {'kind': 'bar', 'x': 'Location', 'y': 'Quantity', 'color': 'Quantity_Type', 'barmode': 'group'},
+        'layout': {'xaxis_title': "Location", 'yaxis_title': "Quantity"}
+    },
+    "Claim Status Distribution": {
+        'data': claim_status_counts,
+        'figure': {'kind': 'bar', 'x': 'Status', 'y': 'Count', 'color': 'Status'},
+        'layout': {'xaxis_title': "Status", 'yaxis_title': "Count"}
+    },
+    "Claims Over Time": {
+        'requires': {'claims': ['Timestamp']},
+        'data': claims_over_time,
+        'options': {'granularity': 'Weekly', 'split': None, 'date_range': (None, None)},
+        'title': lambda granularity, **options: f"Claims Over Time ({granularity})",
+        'figure': {'kind': 'line', 'x': 'Date', 'y': 'Claims', 'color': lambda split, **options: split},
+        'layout': {'xaxis_title': "Date", 'yaxis_title': "Number of Claims"},
+        'empty': "No valid timestamp data available for Claims Over Time visualization."
+    },
+    "Food Wastage by Food Type": {
+        # Food wastage = expired food that wasn't claimed
+        'requires': {'food': [], 'claims': []},
+        'data': wasted_by('Food_Type'),
+        'daily': True,
+        'figure': {'kind': 'bar', 'x': 'Food_Type', 'y': 'Quantity', 'color': 'Food_Type'},
+        'layout': {'xaxis_title': "Food Type", 'yaxis_title': "Wasted Quantity"}
+    },
+    "Food Wastage by Meal Type": {
+        'requires': {'food': [], 'claims': []},
+        'data': wasted_by('Meal_Type'),
+        'daily': True,
+        'figure': {'kind': 'pie', 'names': 'Meal_Type', 'values': 'Quantity'}
+    }
+}
+
+# Visualization selector: categories and their charts, in menu order
+VIZ_CATEGORIES = {
+    "Overview": [
+        "Overall Food Claim Rate by Status"
+    ],
+    "Providers": [
+        "Distribution of Provider Types",
+        "Top 10 Cities by Number of Providers",
+        "Top 10 Providers by Donated Quantity"
+    ],
+    "Receivers": [
+        "Distribution of Receiver Types",
+        "Top 10 Receivers by Claim Count"
+    ],
+    "Food": [
+        "Counts of Food Types Listed",
+        "Total Quantity Donated per Food Type",
+        "Claimed Quantity by Food Type",
+        "Claimed Quantity by Meal Type"
+    ],
+    "Location Analysis": [
+        "Listed vs. Claimed Quantity for Top 10 Locations by Claim Rate",
+        "Listed vs. Claimed Quantity for Bottom 10 Locations by Claim Rate",
+        "Location Ranking"
+    ],
+    "Claims": [
+        "Claim Status Distribution",
+        "Claims Over Time"
+    ],
+    "Food Wastage": [
+        "Food Wastage by Food Type",
+        "Food Wastage by Meal Type"
+    ]
+}
+
+
+def _resolve(value, options):
+    return value(**options) if callable(value) else value
+
+
+def chart_options(name, options=None):
+    return {**CHARTS[name].get('options', {}), **(options or {})}
+
+
+def has_inputs(spec, dataset):
+    for table, columns in spec.get('requires', {}).items():
+        df = dataset.table(table)
+        if df.empty or any(column not in df.columns for column in columns):
+            return False
+    return True
+
+
+# Plotly Express is imported on the first figure, not with the app
+def build_figure(name, spec, frame, options):
+    import plotly.express as px
+    palette = px.colors.qualitative.Pastel
+    kwargs = {key: _resolve(value, options) for key, value in spec['figure'].items() if key != 'kind'}
+    title = _resolve(spec.get('title', name), options)
+    kind = spec['figure']['kind']
+    if kind == 'bar':
+        fig = px.bar(frame, title=title, color_discrete_sequence=palette, **kwargs)
+    elif kind == 'pie':
+        fig = px.pie(frame, title=title, hole=0.4, color_discrete_sequence=palette, **kwargs)
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+    else:
+        fig = px.line(frame, title=title, markers=True, **kwargs)
+    if 'layout' in spec:
+        fig.update_layout(**{'plot_bgcolor': TRANSPARENT, 'paper_bgcolor': TRANSPARENT, **spec['layout']})
+    return fig
+
+
+# The chart as a Plotly JSON payload, or None when there is nothing to draw
+def render_chart(name, dataset, run, options):
+    spec = CHARTS[name]
+    if not has_inputs(spec, dataset):
+        return None
+    frame = spec['data'](dataset, run, **options)
+    if frame.empty:
+        return None
+    with span(f"figure: {name}"):
+        fig = build_figure(name, spec, frame, options)
+        return fig.to_json(validate=False)
+
+
+# Cache key of a chart: its name and options, the data version and
+# revision, and the date for charts that change with it
+def chart_key(name, dataset, options):
+    daily = _resolve(CHARTS[name].get('daily', False), options)
+    return (name, tuple(sorted(options.items())), dataset.version, dataset.revision, date.today() if daily else None)
+
+
+# Process-wide cache of chart payloads (Plotly figures serialized to JSON,
+# shared by all sessions), least recently used first out. A chart being
+# computed is computed once: other callers wait for it.
+class FigureCache:
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> lock held while the chart is computed
+        self._computing = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def put(self, key, payload):
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        found, payload = self.get(key)
+        if not found:
+            with self._lock:
+                computing = self._computing.setdefault(key, threading.Lock())
+            with computing:
+                found, payload = self.get(key)
+                if not found:
+                    try:
+                        payload = compute()
+                        self.put(key, payload)
+                    finally:
+                        with self._lock:
+                            self._computing.pop(key, None)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return payload
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Payload of chart `name` with `options` (the chart's defaults for missing
+# ones), from the cache or computed and cached
+def chart_payload(cache, name, dataset, run, options=None):
+    options = chart_options(name, options)
+    return cache.get_or_compute(chart_key(name, dataset, options), lambda: render_chart(name, dataset, run, options))
+
+
+# Background warm-up: computes every chart in VIZ_CATEGORIES with its
+# default options into the cache, so the first click on each is served from
+# it. request() is called on startup and whenever the data changed; requests
+# made while a warm-up runs are merged into one more pass.
+class ChartWarmer:
+    def __init__(self, cache, names=None):
+        self.cache = cache
+        self.names = names or [name for names in VIZ_CATEGORIES.values() for name in names]
+        self.warmed_revision = None
+        self.failed = {}
+        self._request = None
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="chart-warmup", daemon=True)
+        self._thread.start()
+
+    # Warm the charts for `dataset` at its current revision; `run` computes
+    # chart_data functions as for a session
+    def request(self, dataset, run):
+        if self.warmed_revision == dataset.revision and self._request is None:
+            return
+        self._request = (dataset, run)
+        self._wake.set()
+
+    # Charts of the current data already in the cache
+    def warmed(self, dataset):
+        return sum(chart_key(name, dataset, chart_options(name)) in self.cache for name in self.names)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopped:
+                return
+            dataset, run = self._request
+            self._request = None
+            revision = dataset.revision
+            for name in self.names:
+                if self._stopped:
+                    return
+                try:
+                    with span("chart warm-up"):
+                        chart_payload(self.cache, name, dataset, run)
+                    self.failed.pop(name, None)
+                except Exception as e:
+                    self.failed[name] = str(e)
+            self.warmed_revision = revision
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
@@ -0,0 +1,336 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from data_cache import cache_dir, cache_entry, file_hash, parquet_name, register_tables
+from data_loader import DATA_DIR, TABLE_FILES, key_columns
+from schema import DATE_FORMATS, SCHEMA
+
+# Raw exports the analysis notebook starts from, per table
+RAW_FILES = {
+    'providers': "providers_data.csv",
+    'receivers': "receivers_data.csv",
+    'food': "food_listings_data.csv",
+    'claims': "claims_data.csv"
+}
+
+# The notebook's cleaning cells, per table:
+#   title      stripped and title-cased
+#   strip      stripped
+#   quantity   whole numbers, missing or unreadable ones 0; rows without a
+#              positive quantity are dropped
+# Key columns (see data_loader.key_columns) are stripped whole numbers and
+# rows repeating a primary key are dropped, keeping the first. DATE and
+# TIMESTAMP columns are parsed as dates.
+CLEANING = {
+    'providers': {'title': ['Name', 'Type', 'City'], 'strip': ['Address', 'Contact']},
+    'receivers': {'title': ['Name', 'Type', 'City'], 'strip': ['Contact']},
+    'food': {'title': ['Food_Name', 'Provider_Type', 'Location', 'Food_Type', 'Meal_Type'], 'quantity': ['Quantity']},
+    'claims': {'title': ['Status']}
+}
+
+# Bump when the cleaning or the output layout changes, so the next run
+# rewrites outputs made by the old rules
+CLEANING_FORMAT = 2
+
+# Raw rows read and cleaned at a time
+CHUNK_ROWS = 200_000
+
+# What the last run read and wrote, per table
+MANIFEST_FILE = ".cleaning.json"
+
+# Primary keys below this are remembered in a bitmap (one byte per key);
+# larger or negative ones in a set
+BITMAP_LIMIT = 1 << 28
+
+
+# Primary keys written so far, to drop repeats across chunks
+class SeenKeys:
+    def __init__(self):
+        self.bitmap = np.zeros(0, dtype=bool)
+        self.others = set()
+
+    # Mask of the keys not seen before, marking them as seen. The keys must
+    # not repeat within the array.
+    def first_seen(self, keys):
+        keys = np.asarray(keys, dtype=np.int64)
+        new = np.ones(len(keys), dtype=bool)
+        small = (keys >= 0) & (keys < BITMAP_LIMIT)
+        ids = keys[small]
+        if len(ids):
+            high = int(ids.max()) + 1
+            if high > len(self.bitmap):
+                grown = np.zeros(max(high, 2 * len(self.bitmap)), dtype=bool)
+                grown[:len(self.bitmap)] = self.bitmap
+                self.bitmap = grown
+            new[small] = ~self.bitmap[ids]
+            self.bitmap[ids] = True
+        for position in np.flatnonzero(~small):
+            key = int(keys[position])
+            new[position] = key not in self.others
+            self.others.add(key)
+        return new
+
+
+def _whole_numbers(series):
+    return pd.to_numeric(series.str.strip(), errors='coerce').round().astype('Int64')
+
+
+# Row filters of a raw chunk (read as text), run before it is cleaned:
+# keys and quantities parsed, rows without a positive quantity or a primary
+# key dropped, then repeats of a primary key within the chunk or seen in an
+# earlier chunk. Returns the kept rows and the dropped row counts.
+def filter_chunk(name, chunk, seen):
+    spec = CLEANING.get(name, {})
+    primary_key = SCHEMA.get(name, {}).get('primary_key')
+    dropped = {'no quantity': 0, 'no key': 0, 'duplicate': 0}
+    for column in key_columns(name):
+        if column in chunk:
+            chunk[column] = _whole_numbers(chunk[column])
+    for column in spec.get('quantity', []):
+        if column in chunk:
+            quantity = pd.to_numeric(chunk[column].str.strip(), errors='coerce').fillna(0).astype('int64')
+            chunk[column] = quantity
+            keep = (quantity > 0).to_numpy()
+            dropped['no quantity'] += int((~keep).sum())
+            chunk = chunk[keep]
+    if primary_key in chunk:
+        keep = chunk[primary_key].notna().to_numpy()
+        dropped['no key'] = int((~keep).sum())
+        chunk = chunk[keep]
+        unique = chunk.drop_duplicates(subset=[primary_key])
+        keep = seen.first_seen(unique[primary_key].to_numpy(dtype=np.int64))
+        dropped['duplicate'] = len(chunk) - int(keep.sum())
+        chunk = unique[keep]
+    return chunk, dropped
+
+
+# Types of the Parquet output: whole numbers for keys and quantities,
+# timestamps for dates, text for the rest
+def arrow_schema(name, columns):
+    column_types = SCHEMA.get(name, {'columns': {}})['columns']
+    numbers = set(key_columns(name)) | set(CLEANING.get(name, {}).get('quantity', []))
+    fields = []
+    for column in columns:
+        if column in numbers:
+            fields.append((column, pa.int64()))
+        elif column_types.get(column) in DATE_FORMATS:
+            fields.append((column, pa.timestamp('us')))
+        else:
+            fields.append((column, pa.string()))
+    return pa.schema(fields)
+
+
+# Text cleaning and date parsing of a filtered chunk (runs in a worker
+# process). Returns the chunk as CSV lines and as an Arrow table.
+def clean_chunk(name, chunk):
+    spec = CLEANING.get(name, {})
+    column_types = SCHEMA.get(name, {'columns': {}})['columns']
+    for column in spec.get('title', []):
+        if column in chunk:
+            chunk[column] = chunk[column].str.strip().str.title()
+    for column in spec.get('strip', []):
+        if column in chunk:
+            chunk[column] = chunk[column].str.strip()
+    text = chunk.copy()
+    for column in chunk.columns:
+        date_format = DATE_FORMATS.get(column_types.get(column))
+        if date_format:
+            chunk[column] = pd.to_datetime(chunk[column].str.strip(), errors='coerce')
+            text[column] = chunk[column].dt.strftime(date_format)
+    table = pa.Table.from_pandas(chunk, schema=arrow_schema(name, chunk.columns), preserve_index=False)
+    return text.to_csv(index=False, header=False), table
+
+
+# The cleaned CSV and its Parquet copy, which is written straight into the
+# dashboard's cache (data_cache) so loading it never parses the CSV
+def output_paths(name, out_dir):
+    return {
+        'csv': os.path.join(out_dir, TABLE_FILES[name]),
+        'parquet': os.path.join(cache_dir(out_dir), parquet_name(name))
+    }
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('format') != CLEANING_FORMAT:
+        return {}
+    return manifest.get('tables', {})
+
+
+def write_manifest(entries, out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'format': CLEANING_FORMAT, 'tables': entries}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+# Whether the outputs recorded in `entry` are still those of the raw file:
+# the raw file has the same size and content (its hash is only computed
+# when the mtime moved; the entry is then refreshed in place) and the
+# cleaned CSV is as the last run left it. The Parquet copy is the cache's
+# to check against the CSV; if it is gone or stale the dashboard rebuilds it.
+def is_current(entry, raw_path, paths):
+    if not entry:
+        return False
+    try:
+        stat = os.stat(raw_path)
+        if stat.st_size != entry['size']:
+            return False
+        if any(file_stamp(paths[kind]) != stamp for kind, stamp in entry['outputs'].items()):
+            return False
+    except OSError:
+        return False
+    if stat.st_mtime_ns != entry['mtime_ns']:
+        if file_hash(raw_path) != entry['sha256']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+# Clean one raw export into its cleaned CSV and Parquet file.
+#
+# The raw file is read as text `chunk_rows` rows at a time. This thread
+# filters each chunk (see filter_chunk; repeats of a key are found across
+# the whole file) and hands it to `executor` for the text cleaning, keeping
+# at most `window` chunks in flight, and appends the cleaned chunks to the
+# outputs in file order. Memory stays bounded by the window and the seen
+# keys, whatever the file's size. The outputs are written to temporary
+# files and moved into place at the end, so an interrupted run leaves the
+# previous outputs intact.
+def clean_table(name, raw_path, out_dir=DATA_DIR, executor=None, chunk_rows=CHUNK_ROWS, window=4):
+    started = time.perf_counter()
+    paths = output_paths(name, out_dir)
+    tmp_paths = {kind: path + ".tmp" for kind, path in paths.items()}
+    columns = list(pd.read_csv(raw_path, nrows=0).columns)
+    writer = pq.ParquetWriter(tmp_paths['parquet'], arrow_schema(name, columns))
+    seen = SeenKeys()
+    stats = {'rows_in': 0, 'rows_out': 0, 'dropped': {}}
+    pending = deque()
+
+    def write_next(csv_file):
+        future = pending.popleft()
+        text, table = future.result() if executor is not None else future
+        csv_file.write(text)
+        writer.write_table(table)
+        stats['rows_out'] += table.num_rows
+
+    try:
+        with open(tmp_paths['csv'], 'w', newline='') as csv_file:
+            csv_file.write(pd.DataFrame(columns=columns).to_csv(index=False))
+            for chunk in pd.read_csv(raw_path, dtype=str, chunksize=chunk_rows):
+                stats['rows_in'] += len(chunk)
+                chunk, dropped = filter_chunk(name, chunk, seen)
+                for reason, count in dropped.items():
+                    stats['dropped'][reason] = stats['dropped'].get(reason, 0) + count
+                if executor is None:
+                    pending.append(clean_chunk(name, chunk))
+                else:
+                    pending.append(executor.submit(clean_chunk, name, chunk))
+                while len(pending) >= window:
+                    write_next(csv_file)
+            while pending:
+                write_next(csv_file)
+        writer.close()
+    except BaseException:
+        writer.close()
+        for path in tmp_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    for kind, path in paths.items():
+        os.replace(tmp_paths[kind], path)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+# Clean the raw exports in `raw_dir` (see RAW_FILES; missing ones are
+# skipped) into `out_dir`: the cleaned CSVs the dashboard reads and a
+# Parquet copy of each, registered in the dashboard's Parquet cache.
+#
+# Files are cleaned side by side, each by its own thread, sharing one pool
+# of `workers` processes for the chunks. A table whose raw file and outputs
+# are unchanged since the last run is left alone, so a second run on the
+# same input writes nothing; `force` cleans every table again.
+# Returns per table its status ('cleaned', 'unchanged' or 'missing') and,
+# when cleaned, the row counts.
+def clean_tables(raw_dir, out_dir=DATA_DIR, workers=None, chunk_rows=CHUNK_ROWS, force=False, tables=None):
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(cache_dir(out_dir), exist_ok=True)
+    manifest = read_manifest(out_dir)
+    before = json.dumps(manifest, sort_keys=True)
+    results = {}
+    todo = []
+    for name in tables or RAW_FILES:
+        raw_path = os.path.join(raw_dir, RAW_FILES[name])
+        if not os.path.exists(raw_path):
+            results[name] = {'status': 'missing'}
+        elif not force and is_current(manifest.get(name), raw_path, output_paths(name, out_dir)):
+            results[name] = {'status': 'unchanged'}
+        else:
+            todo.append((name, raw_path))
+
+    if todo:
+        # Spawned workers: forking a process with running threads is not safe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor, \
+                ThreadPoolExecutor(max_workers=len(todo)) as files:
+            # Stamp the raw files before reading them, so a file changed
+            # while it is cleaned is cleaned again next time
+            stamps = {name: dict(file_stamp(raw_path), sha256=file_hash(raw_path)) for name, raw_path in todo}
+            futures = {
+                name: files.submit(clean_table, name, raw_path, out_dir, executor, chunk_rows, workers + 1)
+                for name, raw_path in todo
+            }
+            cached = {}
+            for name, future in futures.items():
+                results[name] = dict(future.result(), status='cleaned')
+                manifest[name] = dict(stamps[name], source=RAW_FILES[name], outputs={
+                    'csv': file_stamp(output_paths(name, out_dir)['csv'])
+                })
+                cached[name] = cache_entry(name, out_dir)
+        register_tables(cached, out_dir)
+
+    if json.dumps(manifest, sort_keys=True) != before:
+        write_manifest(manifest, out_dir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the raw exports into the datasets the dashboard reads")
+    parser.add_argument("raw_dir", help="directory with the raw exports (providers_data.csv, ...)")
+    parser.add_argument("--out", default=DATA_DIR, help="directory for the cleaned CSVs (and their cached Parquet copies)")
+    parser.add_argument("--workers", type=int, help="cleaning processes (default: one per CPU)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="raw rows cleaned at a time")
+    parser.add_argument("--table", action="append", choices=list(RAW_FILES), help="only clean this table (repeatable)")
+    parser.add_argument("--force", action="store_true", help="clean tables whose input is unchanged too")
+    args = parser.parse_args()
+
+    results = clean_tables(args.raw_dir, args.out, args.workers, args.chunk_rows, args.force, args.table)
+    for name, result in results.items():
+        if result['status'] != 'cleaned':
+            print(f"{name:<10} {result['status']}")
+            continue
+        dropped = ", ".join(f"{count:,} {reason}" for reason, count in result['dropped'].items() if count)
+        print(f"{name:<10} {result['rows_in']:>12,} rows in {result['rows_out']:>12,} out"
+              f"{f' (dropped: {dropped})' if dropped else ''} in {result['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from data_loader import DATA_DIR, TABLE_FILES, compact_table, read_table, read_tables
+from profiling import span
+
+# Typed columnar copies of the cleaned CSVs live next to them, written
+# either here or by the cleaning pipeline (cleaning.py) along with the CSVs
+CACHE_DIR_NAME = ".cache"
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the cached layout or the parsing in read_table changes
+CACHE_FORMAT = 2
+
+
+def cache_dir(base_path=DATA_DIR):
+    return os.path.join(base_path, CACHE_DIR_NAME)
+
+
+def parquet_name(name):
+    return f"{name}.parquet"
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(base_path=DATA_DIR):
+    try:
+        with open(os.path.join(cache_dir(base_path), MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('format') != CACHE_FORMAT:
+        return {}
+    return manifest.get('tables', {})
+
+
+def write_manifest(entries, base_path=DATA_DIR):
+    path = os.path.join(cache_dir(base_path), MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'format': CACHE_FORMAT, 'tables': entries}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Check a manifest entry against the source CSV.
+# Size and mtime are compared first; when only the mtime moved (e.g. the file
+# was copied or touched) the content hash decides, and the entry is refreshed
+# in place instead of rebuilding the Parquet file.
+def is_fresh(entry, source_path):
+    if not entry:
+        return False
+    if not os.path.exists(os.path.join(os.path.dirname(source_path), CACHE_DIR_NAME, entry['parquet'])):
+        return False
+    stat = os.stat(source_path)
+    if stat.st_size != entry['size']:
+        return False
+    if stat.st_mtime_ns == entry['mtime_ns']:
+        return True
+    if file_hash(source_path) == entry['sha256']:
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+    return False
+
+
+# Manifest entry for the cached Parquet file of a table, recording its CSV
+# as it is now. Taken before the CSV is read, so a CSV changed meanwhile is
+# read again next time.
+def cache_entry(name, base_path=DATA_DIR):
+    source_path = os.path.join(base_path, TABLE_FILES[name])
+    stat = os.stat(source_path)
+    return {
+        'source': TABLE_FILES[name],
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_hash(source_path),
+        'parquet': parquet_name(name)
+    }
+
+
+# Parse the CSV and write it as Parquet. String columns are
+# dictionary-encoded, which keeps repeated values (types, cities, statuses)
+# compact on disk and fast to decode.
+def build_table(name, base_path=DATA_DIR):
+    entry = cache_entry(name, base_path)
+    with span(f"parse csv: {name}"):
+        df = read_table(name, base_path)
+
+    path = os.path.join(cache_dir(base_path), entry['parquet'])
+    tmp_path = path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, use_dictionary=True)
+    os.replace(tmp_path, path)
+    return df, entry
+
+
+def read_cached_table(name, entry, base_path=DATA_DIR):
+    path = os.path.join(cache_dir(base_path), entry['parquet'])
+    with span(f"read parquet: {name}"):
+        df = pq.read_table(path, memory_map=True).to_pandas()
+    # Files from the cleaning pipeline hold plain int64 and string columns
+    return compact_table(name, df)
+
+
+# Record Parquet files written by the cleaning pipeline (table -> entry
+# from cache_entry) in the manifest
+def register_tables(entries, base_path=DATA_DIR):
+    manifest = read_manifest(base_path)
+    manifest.update(entries)
+    write_manifest(manifest, base_path)
+
+
+# Row counts of the four tables from the Parquet cache's metadata, without
+# reading the tables; None unless every table's cache is up to date
+def cached_row_counts(base_path=DATA_DIR):
+    manifest = read_manifest(base_path)
+    counts = {}
+    for name, file_name in TABLE_FILES.items():
+        entry = manifest.get(name)
+        try:
+            if not is_fresh(entry, os.path.join(base_path, file_name)):
+                return None
+            counts[name] = pq.read_metadata(os.path.join(cache_dir(base_path), entry['parquet'])).num_rows
+        except OSError:
+            return None
+    return counts
+
+
+# Load the four tables, from the Parquet cache where it is up to date and
+# from the CSVs (refreshing the cache) where it is not.
+# Raises on missing CSVs, like read_tables.
+def load_tables(base_path=DATA_DIR):
+    try:
+        os.makedirs(cache_dir(base_path), exist_ok=True)
+    except OSError:
+        # Read-only data directory: no cache, parse the CSVs directly
+        return read_tables(base_path)
+
+    manifest = read_manifest(base_path)
+    before = json.dumps(manifest, sort_keys=True)
+    datasets = {}
+    for name, file_name in TABLE_FILES.items():
+        entry = manifest.get(name)
+        if is_fresh(entry, os.path.join(base_path, file_name)):
+            datasets[name] = read_cached_table(name, entry, base_path)
+        else:
+            datasets[name], manifest[name] = build_table(name, base_path)
+    if json.dumps(manifest, sort_keys=True) != before:
+        write_manifest(manifest, base_path)
+    return datasets
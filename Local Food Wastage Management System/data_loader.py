@@ -0,0 +1,111 @@
+import os
+import numpy as np
+import pandas as pd
+from schema import SCHEMA
+
+# Location of the cleaned datasets produced by the analysis notebook
+DATA_DIR = "Datasets/Cleaned-datasets/"
+
+# Table name -> cleaned CSV file
+TABLE_FILES = {
+    'providers': "clean_providers_data.csv",
+    'receivers': "clean_receivers_data.csv",
+    'food': "clean_food_listings_data.csv",
+    'claims': "clean_claims_data.csv"
+}
+
+# Arrow-backed strings that use NaN for missing values, like the default
+# string type of pandas 3 (pandas 2 calls it pyarrow_numpy)
+try:
+    ARROW_STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+except TypeError:
+    ARROW_STRING = pd.StringDtype("pyarrow_numpy")
+
+
+# Fingerprint of the cleaned CSVs (name, size and modification time).
+# Anything cached per dataset is keyed on this string, so it is rebuilt
+# only when one of the source files changes.
+def data_version(base_path=DATA_DIR):
+    parts = []
+    for name, file_name in TABLE_FILES.items():
+        path = os.path.join(base_path, file_name)
+        try:
+            stat = os.stat(path)
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{name}:missing")
+    return "|".join(parts)
+
+
+# Key columns of a table: its primary key and foreign keys
+def key_columns(name):
+    spec = SCHEMA.get(name, {})
+    return [c for c in [spec.get('primary_key')] + list(spec.get('foreign_keys', {})) if c]
+
+
+# Give a table its compact in-memory types, following SCHEMA:
+#   key columns         narrowest integer type that holds them (left as they
+#                       are when a value is missing or not a whole number)
+#   DATE / TIMESTAMP    datetime64
+#   categorical columns categoricals (integer codes into one copy of each value)
+#   other TEXT          Arrow-backed strings
+# Values are unchanged; only their storage is.
+def compact_table(name, df):
+    spec = SCHEMA.get(name, {'columns': {}})
+    keys = key_columns(name)
+    categorical = spec.get('categorical', [])
+    for column, column_type in spec['columns'].items():
+        if column not in df:
+            continue
+        series = df[column]
+        if column in keys:
+            if pd.api.types.is_integer_dtype(series):
+                df[column] = pd.to_numeric(series, downcast='integer')
+        elif column_type in ('DATE', 'TIMESTAMP'):
+            df[column] = pd.to_datetime(series, errors='coerce')
+        elif column in categorical:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = series.astype(ARROW_STRING).astype('category')
+        elif column_type == 'TEXT' and series.dtype != ARROW_STRING:
+            df[column] = series.astype(ARROW_STRING)
+    return df
+
+
+# Concatenate the parts of a table (as loaded plus appended batches)
+# keeping categorical columns categorical, with the union of the parts'
+# values as categories; a plain concat would turn them back into strings
+def concat_parts(parts):
+    parts = list(parts)
+    for column in parts[0].columns:
+        if isinstance(parts[0][column].dtype, pd.CategoricalDtype):
+            values = [part[column].cat.categories if isinstance(part[column].dtype, pd.CategoricalDtype)
+                      else pd.Index(part[column].dropna().unique()) for part in parts if column in part]
+            # Appended parts may hold plain objects: compare values as strings
+            categories = pd.Index(np.concatenate([v.astype(object) for v in values]), dtype=ARROW_STRING).unique()
+            dtype = pd.CategoricalDtype(categories)
+            parts = [part.assign(**{column: part[column].astype(dtype)}) if column in part else part for part in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+# Deep memory use of each table, per column and in total (bytes), with the
+# column types
+def memory_report(tables):
+    rows = []
+    for name, df in tables.items():
+        usage = df.memory_usage(deep=True, index=False)
+        for column in df.columns:
+            rows.append({'Table': name, 'Column': column, 'Type': str(df[column].dtype),
+                         'Rows': len(df), 'Bytes': int(usage[column])})
+    return pd.DataFrame(rows, columns=['Table', 'Column', 'Type', 'Rows', 'Bytes'])
+
+
+# Read one cleaned CSV and give it its compact types
+def read_table(name, base_path=DATA_DIR):
+    df = pd.read_csv(os.path.join(base_path, TABLE_FILES[name]))
+    return compact_table(name, df)
+
+
+# Read the four cleaned CSVs.
+# Raises on missing files; callers decide how to report the error.
+def read_tables(base_path=DATA_DIR):
+    return {name: read_table(name, base_path) for name in TABLE_FILES}
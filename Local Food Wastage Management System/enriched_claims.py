@@ -0,0 +1,50 @@
+import pandas as pd
+
+# Columns taken from each table for the enriched claims table. Only what the
+# charts and queries use is kept; provider and receiver columns are prefixed
+# because both tables have Name, Type and City.
+CLAIM_COLUMNS = ['Claim_ID', 'Food_ID', 'Receiver_ID', 'Status', 'Timestamp']
+FOOD_COLUMNS = ['Food_Name', 'Quantity', 'Expiry_Date', 'Provider_ID', 'Provider_Type', 'Location', 'Food_Type', 'Meal_Type']
+PROVIDER_COLUMNS = {'Name': 'Provider_Name', 'City': 'Provider_City'}
+RECEIVER_COLUMNS = {'Name': 'Receiver_Name', 'Type': 'Receiver_Type', 'City': 'Receiver_City'}
+
+
+def to_categories(df):
+    for column in df.columns:
+        if pd.api.types.is_string_dtype(df[column]) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    return df
+
+
+# Look up `columns` of `table` for each key, like a left join on a unique key
+# but without copying the rest of either table. Duplicate keys keep the
+# first row, as the cleaning step does. Strings are made categorical before
+# the lookup, so only integer codes are gathered per claim.
+def lookup(table, key, keys, columns):
+    present = [c for c in columns if c in table.columns]
+    if key not in table.columns or not present:
+        return pd.DataFrame(index=keys.index)
+    indexed = to_categories(table.drop_duplicates(subset=[key]).set_index(key)[present])
+    return indexed.reindex(keys.to_numpy()).set_index(keys.index)
+
+
+# Claims joined with their food listing, provider and receiver.
+# String columns are stored as categoricals (group by them with
+# observed=True) and Timestamp is parsed once here.
+def build_enriched_claims(food_df, claims_df, providers_df, receivers_df):
+    if any(c not in claims_df.columns for c in ['Food_ID', 'Receiver_ID', 'Status']):
+        return pd.DataFrame()
+
+    enriched = claims_df[[c for c in CLAIM_COLUMNS if c in claims_df.columns]].copy()
+    if 'Timestamp' in enriched:
+        enriched['Timestamp'] = pd.to_datetime(enriched['Timestamp'], errors='coerce')
+
+    food = lookup(food_df, 'Food_ID', enriched['Food_ID'], FOOD_COLUMNS)
+    enriched = enriched.join(food)
+    if 'Provider_ID' in enriched:
+        providers = lookup(providers_df, 'Provider_ID', enriched['Provider_ID'], list(PROVIDER_COLUMNS))
+        enriched = enriched.join(providers.rename(columns=PROVIDER_COLUMNS))
+    receivers = lookup(receivers_df, 'Receiver_ID', enriched['Receiver_ID'], list(RECEIVER_COLUMNS))
+    enriched = enriched.join(receivers.rename(columns=RECEIVER_COLUMNS))
+
+    return to_categories(enriched).reset_index(drop=True)
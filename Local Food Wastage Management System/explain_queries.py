@@ -0,0 +1,46 @@
+# Print SQLite's query plan for every predefined query, to check which
+# ones use the schema's indexes.
+#
+#   python explain_queries.py                 # cleaned CSVs in Datasets/
+#   python explain_queries.py --rows 100000   # synthetic tables
+import argparse
+import os
+import sys
+
+from data_loader import DATA_DIR, read_tables
+from queries import predefined_queries
+from query_engine import QueryEngine
+
+
+def load_tables(args):
+    if args.rows:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+        from synthetic_data import make_tables
+        return make_tables(args.rows)
+    return read_tables(args.data_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the query plan of each predefined query")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory with the cleaned CSVs")
+    parser.add_argument("--rows", type=int, default=0, help="use synthetic tables of this size instead")
+    parser.add_argument("--query", help="only explain this predefined query")
+    args = parser.parse_args()
+
+    engine = QueryEngine(load_tables(args))
+    for name, query in predefined_queries.items():
+        if args.query and name != args.query:
+            continue
+        print(f"== {name}")
+        plan = engine.explain(query)
+        # Indent each step under its parent, like the sqlite3 shell
+        depth = {0: 0}
+        for _, step in plan.iterrows():
+            level = depth.get(step['parent'], 0) + 1
+            depth[step['id']] = level
+            print("  " * level + step['detail'])
+        print()
+
+
+if __name__ == "__main__":
+    main()
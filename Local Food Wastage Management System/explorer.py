@@ -0,0 +1,59 @@
+from schema import SCHEMA
+
+# Filter operators offered in the Data Explorer -> SQL
+FILTER_OPERATORS = {
+    "contains": "LIKE",
+    "equals": "=",
+    "at least": ">=",
+    "at most": "<="
+}
+
+PAGE_SIZES = [50, 100, 500, 1000]
+
+
+def quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+# Turn the filter value typed in the UI into a query parameter matching the
+# column's type (numbers for INTEGER columns, ISO text for dates)
+def filter_value(table, column, operator, value):
+    if operator == "contains":
+        return f"%{value}%"
+    if SCHEMA.get(table, {'columns': {}})['columns'].get(column) == 'INTEGER':
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+# WHERE clause and parameters for an optional (column, operator, value)
+# filter. Column names are checked against the table's columns and values are
+# always passed as parameters.
+def where_clause(table, columns, filter_spec):
+    if not filter_spec:
+        return "", []
+    column, operator, value = filter_spec
+    if column not in columns or operator not in FILTER_OPERATORS or value in (None, ""):
+        return "", []
+    return f" WHERE {quote(column)} {FILTER_OPERATORS[operator]} ?", [filter_value(table, column, operator, value)]
+
+
+# SQL for one page of a table: only the selected columns and the rows of the
+# requested window are read, with sorting and filtering done by SQLite.
+def page_query(table, columns, selected, filter_spec=None, sort_by=None, descending=False, page=1, page_size=100):
+    selected = [c for c in selected if c in columns] or list(columns)
+    sql = f"SELECT {', '.join(quote(c) for c in selected)} FROM {table}"
+    where, params = where_clause(table, columns, filter_spec)
+    sql += where
+    if sort_by in columns:
+        sql += f" ORDER BY {quote(sort_by)} {'DESC' if descending else 'ASC'}"
+    sql += " LIMIT ? OFFSET ?"
+    return sql, params + [int(page_size), (max(int(page), 1) - 1) * int(page_size)]
+
+
+# SQL counting the rows that match the filter (for the page count)
+def count_query(table, columns, filter_spec=None):
+    where, params = where_clause(table, columns, filter_spec)
+    return f"SELECT COUNT(*) AS Row_Count FROM {table}{where}", params
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+# Global filters -> the column each table is filtered on. Claims are
+# filtered on their listing's location, food type and provider type, and
+# the date range applies to listings by expiry date and to claims by claim
+# time.
+FILTER_DIMENSIONS = {
+    'City': {'providers': 'City', 'receivers': 'City', 'food': 'Location', 'claims': 'Location'},
+    'Food_Type': {'food': 'Food_Type', 'claims': 'Food_Type'},
+    'Provider_Type': {'providers': 'Type', 'food': 'Provider_Type', 'claims': 'Provider_Type'},
+    'Date': {'food': 'Expiry_Date', 'claims': 'Timestamp'}
+}
+
+# Listing columns claims are filtered on
+CLAIM_LISTING_COLUMNS = ['Location', 'Food_Type', 'Provider_Type']
+
+# Values with fewer rows than 1/32 of the table are kept as row positions
+# (8 bytes a row) instead of a bitmap (1 bit a row, whatever the count)
+SPARSE_SHARE = 1 / 32
+
+
+# The global filter selection as a hashable key: (dimension, values) pairs
+# of the dimensions in use, values sorted; the date range as (start, end)
+# dates, either of which may be None
+def selection_key(selection):
+    key = []
+    for dimension in FILTER_DIMENSIONS:
+        values = (selection or {}).get(dimension)
+        if not values:
+            continue
+        if dimension == 'Date':
+            start, end = values
+            if start is None and end is None:
+                continue
+            key.append((dimension, (start, end)))
+        else:
+            key.append((dimension, tuple(sorted(values))))
+    return tuple(key)
+
+
+def _pack(positions, rows):
+    mask = np.zeros(rows, dtype=bool)
+    mask[positions] = True
+    return np.packbits(mask)
+
+
+# Rows of one column by value: the row positions sorted by value (and by
+# row within a value), where each value's run starts, and packed bitmaps of
+# the values holding at least SPARSE_SHARE of the rows. Rare values are
+# read straight off their run of positions, as roaring bitmaps keep small
+# containers as sorted arrays.
+class Postings:
+    def __init__(self, values):
+        codes, uniques = pd.factorize(values)
+        self.rows = len(codes)
+        self.values = pd.Index(uniques)
+        self.order = np.argsort(codes, kind='stable')
+        self.starts = np.searchsorted(codes[self.order], np.arange(len(uniques) + 1))
+        self.sizes = np.diff(self.starts)
+        self.dense = {int(code): _pack(self.order[self.starts[code]:self.starts[code + 1]], self.rows)
+                      for code in np.flatnonzero(self.sizes >= max(self.rows * SPARSE_SHARE, 1))}
+
+    # Bitmap of the rows holding any of `values`
+    def bitmap(self, values):
+        bits = np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+        codes = self.values.get_indexer(pd.Index(list(values), dtype=self.values.dtype))
+        sparse = []
+        for code in codes[codes >= 0].tolist():
+            if code in self.dense:
+                bits |= self.dense[code]
+            else:
+                sparse.append(self.order[self.starts[code]:self.starts[code + 1]])
+        if sparse:
+            bits |= _pack(np.concatenate(sparse), self.rows)
+        return bits
+
+    def counts(self):
+        return pd.Series(self.sizes, index=self.values)
+
+
+# Per-value row bitmaps of the four tables, for the global filters.
+#
+# Each table gets the rows of each value of every filter dimension it has
+# (see Postings). A selection is evaluated per table by OR-ing the bitmaps
+# of the selected values of each dimension and AND-ing the dimensions, so
+# combining filters never scans the tables. Dates are indexed by day.
+class FilterIndex:
+    def __init__(self, tables):
+        self.rows = {name: len(df) for name, df in tables.items()}
+        # table -> dimension -> Postings
+        self._postings = {name: {} for name in tables}
+        listing_values = self._listing_values(tables)
+        for dimension, columns in FILTER_DIMENSIONS.items():
+            for name, column in columns.items():
+                df = tables.get(name)
+                if df is None or df.empty:
+                    continue
+                if name == 'claims' and column in CLAIM_LISTING_COLUMNS:
+                    values = listing_values.get(column)
+                elif column in df:
+                    values = df[column]
+                else:
+                    values = None
+                if values is None:
+                    continue
+                if dimension == 'Date':
+                    values = pd.to_datetime(values, errors='coerce').dt.normalize()
+                self._postings[name][dimension] = Postings(values)
+        # dimension -> rows per value over all tables, most first (options)
+        self._counts = {}
+        for dimension in FILTER_DIMENSIONS:
+            parts = [postings[dimension].counts() for postings in self._postings.values() if dimension in postings]
+            counts = pd.concat(parts).groupby(level=0).sum() if parts else pd.Series(dtype='int64')
+            self._counts[dimension] = counts.sort_values(ascending=False, kind='stable')
+
+    # Location, food type and provider type of each claim's listing
+    def _listing_values(self, tables):
+        food = tables.get('food')
+        claims = tables.get('claims')
+        if food is None or claims is None or 'Food_ID' not in food or 'Food_ID' not in claims:
+            return {}
+        listings = food.drop_duplicates(subset=['Food_ID']).set_index('Food_ID')
+        positions = listings.index.get_indexer(claims['Food_ID'])
+        values = {}
+        for column in CLAIM_LISTING_COLUMNS:
+            if column in listings:
+                # Claims of unknown listings (position -1) get no value
+                found = listings[column].take(np.maximum(positions, 0)).where(positions >= 0)
+                values[column] = found.reset_index(drop=True)
+        return values
+
+    # Values of a dimension, most rows first, at most `limit`
+    def options(self, dimension, limit=None):
+        values = self._counts.get(dimension, pd.Series(dtype='int64')).index.tolist()
+        return values[:limit] if limit else values
+
+    # First and last day in the Date dimension, or None
+    def date_range(self):
+        days = self._counts['Date'].index
+        if not len(days):
+            return None
+        return days.min(), days.max()
+
+    # Bitmap of a table's rows matching `selection`, or None when no
+    # selected dimension applies to the table (all rows match)
+    def bitmap(self, name, selection):
+        result = None
+        for dimension, values in selection_key(selection):
+            if name not in FILTER_DIMENSIONS.get(dimension, {}):
+                continue
+            postings = self._postings[name].get(dimension)
+            if postings is None:
+                continue
+            if dimension == 'Date':
+                start, end = values
+                days = postings.values
+                keep = np.ones(len(days), dtype=bool)
+                if start is not None:
+                    keep &= days >= pd.Timestamp(start)
+                if end is not None:
+                    keep &= days <= pd.Timestamp(end)
+                values = days[keep]
+            bits = postings.bitmap(values)
+            result = bits if result is None else result & bits
+        return result
+
+    def positions(self, name, selection):
+        bits = self.bitmap(name, selection)
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.rows.get(name, 0)))
+
+    # Rows of each table matching `selection` (popcounts of the bitmaps)
+    def counts(self, selection):
+        counts = {}
+        for name, rows in self.rows.items():
+            bits = self.bitmap(name, selection)
+            counts[name] = rows if bits is None else int(np.unpackbits(bits, count=rows).sum())
+        return counts
+
+    # The rows of each table matching `selection`
+    def apply(self, tables, selection):
+        filtered = {}
+        for name, df in tables.items():
+            positions = self.positions(name, selection) if name in self.rows else None
+            filtered[name] = df if positions is None else df.take(positions).reset_index(drop=True)
+        return filtered
@@ -0,0 +1,40 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+
+# Offline geocoding table: one row per city name with Latitude and Longitude
+# in degrees. Cities missing from it (or every city, when the file does not
+# exist) get stand-in coordinates.
+GEOCODE_FILE = "Datasets/geocodes.csv"
+
+# Box the stand-in coordinates fall in (south, north, west, east)
+STAND_IN_BOUNDS = (8.0, 37.0, 68.0, 97.0)
+
+
+# Deterministic made-up coordinates for city names: each name is hashed to a
+# point inside STAND_IN_BOUNDS, so the same city always lands on the same
+# spot and matching can be exercised without a real geocoder
+def stand_in_coordinates(names):
+    south, north, west, east = STAND_IN_BOUNDS
+    hashes = np.array([zlib.crc32(str(name).encode()) for name in names], dtype=np.uint64)
+    lat = (hashes & 0xFFFF) / 0xFFFF
+    lon = (hashes >> 16) / 0xFFFF
+    return pd.DataFrame({
+        'Latitude': south + lat * (north - south),
+        'Longitude': west + lon * (east - west)
+    }, index=pd.Index(list(names), name='City'))
+
+
+# Latitude/Longitude per city name for the given names, from the geocoding
+# table where it has them and stand-ins otherwise
+def load_geocodes(names, path=GEOCODE_FILE):
+    names = pd.unique(pd.Series(list(names), dtype=object).dropna())
+    known = pd.DataFrame(columns=['Latitude', 'Longitude'], index=pd.Index([], name='City'))
+    if path and os.path.exists(path):
+        table = pd.read_csv(path).dropna(subset=['City', 'Latitude', 'Longitude'])
+        known = table.drop_duplicates(subset=['City']).set_index('City')[['Latitude', 'Longitude']]
+    missing = [name for name in names if name not in known.index]
+    if not missing:
+        return known.loc[list(names)]
+    return pd.concat([known.loc[[name for name in names if name in known.index]], stand_in_coordinates(missing)])
@@ -0,0 +1,284 @@
+import csv
+import json
+import math
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+from live_data import TABLES
+from schema import SCHEMA
+
+
+# Table a CSV file without a 'table' column feeds, taken from its name
+# (e.g. new_claims.csv -> claims)
+def table_from_path(path):
+    name = os.path.basename(path).lower()
+    for table in TABLES:
+        if table in name:
+            return table
+    return None
+
+
+# Parse JSON text that is either one object, a list of objects or JSON lines
+def parse_json_records(text):
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return parsed if isinstance(parsed, list) else [parsed]
+
+
+# Check one submitted record, with `table` as the table it feeds unless it
+# names one. Returns the record with its 'table' set, or raises ValueError
+# saying what is wrong: not an object, an unknown table, or a value that
+# is not a single number, text or date as its column needs. Missing values
+# (null or empty) are fine; the dataset fills them in.
+def validate_record(record, table=None):
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    record = dict(record, table=record.get('table') or table)
+    if record['table'] not in TABLES:
+        raise ValueError(f"unknown table {record['table']!r}")
+    columns = SCHEMA[record['table']]['columns']
+    for column, value in record.items():
+        if column == 'table' or value is None or value == "" or (isinstance(value, float) and math.isnan(value)):
+            continue
+        if not isinstance(value, (str, int, float)):
+            raise ValueError(f"{column}: not a single value")
+        column_type = columns.get(column)
+        if column_type == 'INTEGER' and pd.isna(pd.to_numeric(value, errors='coerce')):
+            raise ValueError(f"{column}: not a number: {value!r}")
+        if column_type in ('DATE', 'TIMESTAMP') and pd.isna(pd.to_datetime(value, errors='coerce')):
+            raise ValueError(f"{column}: not a date: {value!r}")
+    return record
+
+
+# The `limit` most urgent unclaimed listings (expiring within `days` days
+# when given), each with its `k` nearest receivers, as JSON-ready records
+def next_to_expire(dataset, limit=20, days=None, k=3):
+    scheduler = dataset.scheduler()
+    scheduler.advance()
+    until = None if days is None else pd.Timestamp.now().normalize() + pd.Timedelta(days=days)
+    listings = scheduler.upcoming(limit, until=until)
+    records = json.loads(listings.to_json(orient='records', date_format='iso'))
+    if k > 0 and records:
+        matches = dataset.matcher().match(listings, k=k)
+        receivers = matches[['Food_ID', 'Receiver_ID', 'Receiver_Name', 'Receiver_Type', 'Receiver_City', 'Distance_km']]
+        by_listing = {}
+        for record in json.loads(receivers.to_json(orient='records')):
+            by_listing.setdefault(record.pop('Food_ID'), []).append(record)
+        for record in records:
+            record['Receivers'] = by_listing.get(record['Food_ID'], [])
+    return records
+
+
+# Feeds new listings and claims into a LiveDataset.
+#
+# Sources (tailed JSONL/CSV files and a local HTTP endpoint) put record
+# batches on a bounded queue; a single worker drains the queue and appends
+# up to `batch_size` records at a time, so the dataset sees a few large
+# batches instead of thousands of single-row appends. A full queue blocks
+# the sources, which pushes back on HTTP clients. Records are checked on
+# submission (validate_record), and a batch that still fails is appended
+# again one submission at a time, so one client's bad events never cost
+# another client's.
+class EventIngestor:
+    def __init__(self, dataset=None, batch_size=5000, flush_interval=0.2, max_pending=1000):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._threads = []
+        self._servers = []
+        self.stats = {'received': 0, 'appended': 0, 'batches': 0, 'errors': 0, 'rejected': 0, 'last_batch_seconds': 0.0}
+        self._stats_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="ingest-worker", daemon=True)
+        self._worker.start()
+
+    # Point the ingestor at a new dataset (e.g. after the CSVs were reloaded)
+    def attach(self, dataset):
+        self.dataset = dataset
+
+    # Queue the valid records of one submission. Returns the number
+    # accepted and, for each rejected record, its index and the error.
+    def submit(self, records, table=None):
+        accepted, rejected = [], []
+        for i, record in enumerate(records):
+            try:
+                accepted.append(validate_record(record, table))
+            except ValueError as e:
+                rejected.append({'index': i, 'error': str(e)})
+        if accepted:
+            self._queue.put(accepted)
+            self._count('received', len(accepted))
+        if rejected:
+            self._count('rejected', len(rejected))
+        return len(accepted), rejected
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # Drain whatever else is already waiting, up to batch_size
+            submissions = [batch]
+            while sum(len(records) for records in submissions) < self.batch_size:
+                try:
+                    submissions.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            start = time.perf_counter()
+            if self.dataset is not None:
+                self._append(submissions)
+            with self._stats_lock:
+                self.stats['last_batch_seconds'] = time.perf_counter() - start
+
+    # Append the submissions as one batch or, when that fails, one by one
+    # (rows the failed batch did append are skipped as already present);
+    # `errors` counts the submissions that could not be appended
+    def _append(self, submissions):
+        try:
+            self._count('appended', self.dataset.append_records([r for records in submissions for r in records]))
+            self._count('batches')
+            return
+        except Exception:
+            if len(submissions) == 1:
+                self._count('errors')
+                return
+        for records in submissions:
+            try:
+                self._count('appended', self.dataset.append_records(records))
+                self._count('batches')
+            except Exception:
+                self._count('errors')
+
+    # Follow a JSONL or CSV file and ingest lines as they are appended.
+    # JSON records name their table with a 'table' key; CSV files start with a
+    # header and either have a 'table' column or are named after their table.
+    def tail(self, path, table=None, poll_interval=0.5):
+        thread = threading.Thread(target=self._tail, args=(path, table, poll_interval), name=f"ingest-tail-{path}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    def _tail(self, path, table, poll_interval):
+        is_csv = path.lower().endswith(".csv")
+        table = table or (table_from_path(path) if is_csv else None)
+        offset, header, pending = 0, None, b""
+        while not self._stop.is_set():
+            try:
+                if os.path.getsize(path) < offset:
+                    # Truncated or replaced: start over
+                    offset, header, pending = 0, None, b""
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    chunk = f.read()
+                    offset = f.tell()
+            except OSError:
+                chunk = b""
+            if chunk:
+                lines = (pending + chunk).split(b"\n")
+                # The last piece is an incomplete line until a newline arrives
+                pending = lines.pop()
+                lines = [line.decode().rstrip("\r") for line in lines if line.strip()]
+                if is_csv:
+                    if header is None and lines:
+                        header = next(csv.reader([lines.pop(0)]))
+                    records = [dict(zip(header, row)) for row in csv.reader(lines)]
+                else:
+                    records = []
+                    for line in lines:
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            self._count('errors')
+                self.submit(records, table)
+            else:
+                self._stop.wait(poll_interval)
+
+    # Local HTTP endpoint:
+    #   POST /events[?table=food]  body: JSON object, list or JSON lines
+    #   GET /metrics               current row counts and ingest statistics
+    #   GET /next[?limit=20&days=7&k=3]
+    #                              most urgent unclaimed listings and their
+    #                              nearest receivers (see next_to_expire)
+    def serve(self, port, host="127.0.0.1"):
+        ingestor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if url.path != "/events":
+                    self._reply(404, {'error': "not found"})
+                    return
+                table = parse_qs(url.query).get('table', [None])[0]
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    records = parse_json_records(self.rfile.read(length).decode())
+                except ValueError as e:
+                    self._reply(400, {'error': str(e)})
+                    return
+                accepted, rejected = ingestor.submit(records, table)
+                self._reply(202 if accepted or not rejected else 400, {'accepted': accepted, 'rejected': rejected})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/next":
+                    if ingestor.dataset is None:
+                        self._reply(503, {'error': "no dataset"})
+                        return
+                    query = parse_qs(url.query)
+                    try:
+                        limit = int(query.get('limit', [20])[0])
+                        days = int(query['days'][0]) if 'days' in query else None
+                        k = int(query.get('k', [3])[0])
+                    except ValueError as e:
+                        self._reply(400, {'error': str(e)})
+                        return
+                    self._reply(200, {'listings': next_to_expire(ingestor.dataset, limit, days, k)})
+                    return
+                if url.path != "/metrics":
+                    self._reply(404, {'error': "not found"})
+                    return
+                counts = ingestor.dataset.counts() if ingestor.dataset is not None else {}
+                with ingestor._stats_lock:
+                    stats = dict(ingestor.stats)
+                if ingestor.dataset is not None:
+                    stats['held_claims'] = ingestor.dataset.held_claims()
+                self._reply(200, {'counts': counts, 'ingest': stats})
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, name=f"ingest-http-{port}", daemon=True)
+        thread.start()
+        self._servers.append(server)
+        self._threads.append(thread)
+        return server
+
+    def stop(self):
+        self._stop.set()
+        for server in self._servers:
+            server.shutdown()
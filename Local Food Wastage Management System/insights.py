@@ -0,0 +1,207 @@
+import heapq
+import math
+import pandas as pd
+from chart_data import STATUS_PRECEDENCE, claim_rate_by_status, status_ranks
+
+UNCLAIMED_RANK = len(STATUS_PRECEDENCE)
+
+# Receivers named in the Key Insights panel
+TOP_RECEIVERS = 3
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+# Name lookup from a providers/receivers table (first row per ID wins)
+def _names(table, key):
+    if key not in table or 'Name' not in table:
+        return {}
+    first = table.drop_duplicates(subset=[key])
+    return dict(zip(first[key].tolist(), first['Name'].tolist()))
+
+
+# The figures behind the Key Insights panel, kept up to date as listings and
+# claims are appended:
+#   - listed quantity per claim status, each listing resolved to one status
+#     as in chart_data.claim_rate_by_status
+#   - donated quantity per provider name and number of completed claims
+#     per receiver name, grouped as the Top 10 Providers and Top 10
+#     Receivers charts group them (chart_data.top_providers,
+#     charts.top_receivers)
+# Food type, meal type and location figures come from the aggregate cube,
+# which LiveDataset maintains the same way.
+class InsightsTracker:
+    def __init__(self, food_df, claims_df, providers_df, receivers_df):
+        self.provider_names = _names(providers_df, 'Provider_ID')
+        self.receiver_names = _names(receivers_df, 'Receiver_ID')
+        self.status_quantity = [0] * (UNCLAIMED_RANK + 1)
+        self._listing_quantity = {}
+        self._best_rank = {}
+        # Per ID, so rows that arrive before their provider or receiver are
+        # counted under its name once it is added
+        self.provider_quantity = {}
+        self.receiver_claims = {}
+        self.name_quantity = {}
+        self.name_claims = {}
+        if {'Food_ID', 'Quantity'} <= set(food_df.columns) and {'Food_ID', 'Status'} <= set(claims_df.columns):
+            buckets = claim_rate_by_status({'food': food_df, 'claims': claims_df}).set_index('Status')['Quantity']
+            self.status_quantity = [buckets[status] for status in STATUS_PRECEDENCE + ['Unclaimed']]
+            self._listing_quantity = food_df.groupby('Food_ID')['Quantity'].sum().to_dict()
+            ranked = pd.DataFrame({'Food_ID': claims_df['Food_ID'].to_numpy(), 'Rank': status_ranks(claims_df['Status'])})
+            ranked = ranked[ranked['Rank'] >= 0]
+            self._best_rank = ranked.groupby('Food_ID')['Rank'].min().to_dict()
+        if {'Provider_ID', 'Quantity'} <= set(food_df.columns):
+            self.provider_quantity = food_df.groupby('Provider_ID')['Quantity'].sum().to_dict()
+        if {'Receiver_ID', 'Status'} <= set(claims_df.columns):
+            completed = claims_df[claims_df['Status'] == 'Completed']
+            self.receiver_claims = completed.groupby('Receiver_ID').size().to_dict()
+        for totals, by_id, names in [(self.name_quantity, self.provider_quantity, self.provider_names),
+                                     (self.name_claims, self.receiver_claims, self.receiver_names)]:
+            for key, value in by_id.items():
+                name = names.get(key)
+                if not _is_missing(name):
+                    totals[name] = totals.get(name, 0) + value
+        # Quantities and claim counts only grow, so the leaders are updated
+        # from the names that changed instead of rescanning every name.
+        # Ties go to the first name in sort order.
+        self._top_provider = min(self.name_quantity, key=self._provider_rank, default=None)
+        self._top_receivers = heapq.nsmallest(TOP_RECEIVERS, self.name_claims, key=self._receiver_rank)
+
+    def _provider_rank(self, name):
+        return -self.name_quantity[name], name
+
+    def _receiver_rank(self, name):
+        return -self.name_claims[name], name
+
+    def _add_name_quantity(self, name, quantity):
+        if _is_missing(name):
+            return
+        self.name_quantity[name] = self.name_quantity.get(name, 0) + quantity
+        if self._top_provider is None or self._provider_rank(name) < self._provider_rank(self._top_provider):
+            self._top_provider = name
+
+    def _add_name_claims(self, name, count):
+        if _is_missing(name):
+            return
+        self.name_claims[name] = self.name_claims.get(name, 0) + count
+        candidates = [r for r in self._top_receivers if r != name] + [name]
+        self._top_receivers = heapq.nsmallest(TOP_RECEIVERS, candidates, key=self._receiver_rank)
+
+    def add_listings(self, rows):
+        for food_id, quantity, provider_id in zip(rows['Food_ID'].tolist(), rows['Quantity'].tolist(), rows['Provider_ID'].tolist()):
+            quantity = 0 if _is_missing(quantity) else quantity
+            self.status_quantity[self._best_rank.get(food_id, UNCLAIMED_RANK)] += quantity
+            if not _is_missing(food_id):
+                self._listing_quantity[food_id] = self._listing_quantity.get(food_id, 0) + quantity
+            if not _is_missing(provider_id):
+                self.provider_quantity[provider_id] = self.provider_quantity.get(provider_id, 0) + quantity
+                self._add_name_quantity(self.provider_names.get(provider_id), quantity)
+
+    def add_claims(self, rows):
+        ranks = status_ranks(rows['Status'])
+        completed = (rows['Status'] == 'Completed').tolist()
+        for food_id, receiver_id, rank, is_completed in zip(rows['Food_ID'].tolist(), rows['Receiver_ID'].tolist(),
+                                                            ranks.tolist(), completed):
+            if is_completed and not _is_missing(receiver_id):
+                self.receiver_claims[receiver_id] = self.receiver_claims.get(receiver_id, 0) + 1
+                self._add_name_claims(self.receiver_names.get(receiver_id), 1)
+            if rank < 0 or _is_missing(food_id):
+                continue
+            current = self._best_rank.get(food_id, UNCLAIMED_RANK)
+            if rank < current:
+                # The listing moves to a status with higher precedence
+                quantity = self._listing_quantity.get(food_id, 0)
+                self.status_quantity[current] -= quantity
+                self.status_quantity[rank] += quantity
+                self._best_rank[food_id] = rank
+
+    def add_providers(self, rows):
+        for provider_id, name in zip(rows['Provider_ID'].tolist(), rows['Name'].tolist()):
+            if provider_id not in self.provider_names:
+                self.provider_names[provider_id] = name
+                self._add_name_quantity(name, self.provider_quantity.get(provider_id, 0))
+
+    def add_receivers(self, rows):
+        for receiver_id, name in zip(rows['Receiver_ID'].tolist(), rows['Name'].tolist()):
+            if receiver_id not in self.receiver_names:
+                self.receiver_names[receiver_id] = name
+                self._add_name_claims(name, self.receiver_claims.get(receiver_id, 0))
+
+    # Key figures as a dict; the cube supplies the per food type, meal type
+    # and location figures. Values that cannot be computed are None.
+    def summary(self, cube):
+        listed = sum(self.status_quantity)
+        claimed = self.status_quantity[STATUS_PRECEDENCE.index('Completed')]
+        result = {
+            'listed_quantity': listed,
+            'claimed_quantity': claimed,
+            'claim_rate': claimed / listed * 100 if listed > 0 else None,
+            'top_provider': None,
+            'top_receivers': None
+        }
+
+        if self._top_provider is not None:
+            result['top_provider'] = (self._top_provider, self.name_quantity[self._top_provider])
+        if self._top_receivers:
+            result['top_receivers'] = [(name, self.name_claims[name]) for name in self._top_receivers]
+
+        for dimension, key in [('Food_Type', 'food_type'), ('Meal_Type', 'meal_type')]:
+            claimed_by = None if cube.empty else cube.rollup(dimension, statuses=['Completed'])
+            if claimed_by is None or claimed_by.empty:
+                result[f'most_claimed_{key}'] = result[f'least_claimed_{key}'] = None
+                continue
+            claimed_by = claimed_by.sort_values('Claimed_Quantity', ascending=False)
+            result[f'most_claimed_{key}'] = tuple(claimed_by.iloc[0][[dimension, 'Claimed_Quantity']])
+            result[f'least_claimed_{key}'] = tuple(claimed_by.iloc[-1][[dimension, 'Claimed_Quantity']])
+
+        result['locations'] = result['locations_over_100'] = result['locations_zero'] = None
+        if not cube.empty:
+            listed_by = cube.rollup('Location')[['Location', 'Listed_Quantity']]
+            claimed_by = cube.rollup('Location', statuses=['Completed'])[['Location', 'Claimed_Quantity']]
+            locations = listed_by.merge(claimed_by, on='Location', how='left').fillna({'Claimed_Quantity': 0})
+            locations = locations[locations['Listed_Quantity'] > 0]
+            rate = locations['Claimed_Quantity'] / locations['Listed_Quantity']
+            result['locations'] = len(locations)
+            result['locations_over_100'] = int((rate > 1).sum())
+            result['locations_zero'] = int((rate == 0).sum())
+        return result
+
+
+# Join names as 'A', 'B', and 'C'
+def quoted_list(names):
+    quoted = [f"'{name}'" for name in names]
+    if len(quoted) <= 2:
+        return " and ".join(quoted)
+    return ", ".join(quoted[:-1]) + ", and " + quoted[-1]
+
+
+# Key Insights bullets from InsightsTracker.summary(); a bullet
+# is left out when the data it needs is missing
+def insights_markdown(summary):
+    lines = []
+    if summary['claim_rate'] is not None:
+        lines.append(f"- **Overall Food Claim Rate**: {summary['claim_rate']:.2f}% of listed food is successfully claimed, "
+                     f"with {summary['claimed_quantity']:.0f} units claimed out of {summary['listed_quantity']:.0f} units listed.")
+    if summary['locations']:
+        lines.append(f"- **Location Disparities**: Claim rates vary significantly by location: {summary['locations_over_100']} of "
+                     f"{summary['locations']} locations have claim rates over 100% (potentially indicating data issues) and "
+                     f"{summary['locations_zero']} have a 0% claim rate.")
+    if summary['most_claimed_food_type'] is not None:
+        (most, most_qty), (least, least_qty) = summary['most_claimed_food_type'], summary['least_claimed_food_type']
+        lines.append(f"- **Food Type Preferences**: '{most}' food is the most claimed food type ({most_qty:.0f} units), "
+                     f"while '{least}' is the least claimed ({least_qty:.0f} units).")
+    if summary['most_claimed_meal_type'] is not None:
+        (most, most_qty), (least, least_qty) = summary['most_claimed_meal_type'], summary['least_claimed_meal_type']
+        lines.append(f"- **Meal Type Preferences**: '{most}' is the most claimed meal type ({most_qty:.0f} units), "
+                     f"and '{least}' is the least claimed ({least_qty:.0f} units).")
+    if summary['top_provider'] is not None:
+        name, quantity = summary['top_provider']
+        lines.append(f"- **Top Provider**: '{name}' is the top provider by donated quantity ({quantity:.0f} units).")
+    if summary['top_receivers']:
+        names = [name for name, _ in summary['top_receivers']]
+        counts = [count for _, count in summary['top_receivers']]
+        claims = f"{counts[0]} each" if len(set(counts)) == 1 else ", ".join(str(count) for count in counts)
+        verb = "is the top receiver" if len(names) == 1 else "are the top receivers"
+        lines.append(f"- **Top Receivers**: {quoted_list(names)} {verb} by completed claims ({claims}).")
+    return "\n".join(lines) if lines else "No data available for insights."
@@ -0,0 +1,400 @@
+import threading
+import pandas as pd
+from aggregates import UNCLAIMED, build_cube, claim_delta, listing_delta
+from data_loader import compact_table, concat_parts
+from enriched_claims import build_enriched_claims
+from filters import FilterIndex, selection_key
+from insights import InsightsTracker
+from matching import ReceiverMatcher
+from profiling import span
+from query_engine import QueryEngine
+from ranking import LocationRanking
+from scheduler import ExpiryScheduler
+from schema import SCHEMA
+from timeseries import ClaimTimeSeries
+from wastage import WastageTracker
+
+TABLES = ['providers', 'receivers', 'food', 'claims']
+
+# Sessions get shallow views of the shared tables; with copy-on-write a view
+# copies a column only when a session writes to it, never the shared frame.
+# pandas 3 always works this way, pandas 2 needs the option.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Listing columns a claim needs for its cube delta
+LISTING_COLUMNS = ['Quantity', 'Food_Type', 'Meal_Type', 'Location', 'Provider_Type']
+
+# Filtered views kept per dataset (most recently used)
+FILTERED_VIEWS = 8
+
+# Claims held back until their listing arrives; further ones are dropped
+HELD_CLAIMS = 100_000
+
+
+# Coerce appended records to the types load_data produces: numeric IDs and
+# quantities, datetime Expiry_Date and Timestamp. Unknown columns are
+# dropped and missing ones filled with NaN, so appended rows line up with
+# the loaded table (categorical columns are merged in on concatenation).
+def coerce_rows(name, rows, columns):
+    rows = rows.reindex(columns=columns)
+    for column, column_type in SCHEMA[name]['columns'].items():
+        if column not in rows:
+            continue
+        if column_type == 'INTEGER':
+            rows[column] = pd.to_numeric(rows[column], errors='coerce')
+        elif column_type in ('DATE', 'TIMESTAMP'):
+            rows[column] = pd.to_datetime(rows[column], errors='coerce')
+    return rows
+
+
+# The four tables plus everything derived from them, shared by all sessions.
+#
+# New listings and claims are appended in batches. Each batch is added to the
+# SQL engine (whose indexes SQLite maintains), folded into the aggregate cube
+# as a delta and applied to the wastage tracker item by item, so nothing is
+# reloaded through load_data. Derived structures are built lazily on first
+# use from whatever has been appended by then.
+#
+# One instance is held per process and read by every session. Readers get
+# views that share the underlying arrays, so memory does not grow with the
+# number of sessions. Appends never modify a frame a reader may hold: a
+# refreshed table is a new frame built from the old one plus the new rows.
+class LiveDataset:
+    def __init__(self, tables, version=None):
+        self.version = version
+        # Bumped after every appended batch
+        self.revision = 0
+        self._lock = threading.RLock()
+        # Appended batches are kept as separate parts and concatenated on read
+        self._parts = {name: [tables.get(name, pd.DataFrame())] for name in TABLES}
+        self._engine = None
+        self._cube = None
+        self._wastage = None
+        self._enriched = None
+        self._enriched_revision = None
+        self._insights = None
+        self._claim_series = None
+        self._ranking = None
+        self._scheduler = None
+        # Receiver index per receiver types filter, with the receiver count
+        # it was built from
+        self._matchers = {}
+        self._insight_summary = None
+        self._insight_revision = None
+        # Food_ID -> status of its first claim, and Food_ID -> listing
+        # columns; both kept for cube deltas once the cube exists
+        self._first_status = None
+        self._listings = None
+        # Table -> primary keys of its rows, built on the first append
+        self._keys = {}
+        # Appended claims whose listing is not known yet, and how many were
+        # dropped because too many were held
+        self._held_claims = []
+        self.dropped_claims = 0
+        self._filter_index = None
+        self._filter_revision = None
+        # Selection key -> LiveDataset of the selected rows, at filter_revision
+        self._views = {}
+
+    def table(self, name):
+        with self._lock:
+            parts = self._parts[name]
+            if len(parts) > 1:
+                # Appended rows arrive with wide types; narrow the merged table again
+                parts[:] = [compact_table(name, concat_parts(parts))]
+            return parts[0].copy(deep=False)
+
+    def tables(self):
+        return {name: self.table(name) for name in TABLES}
+
+    def counts(self):
+        with self._lock:
+            return {name: sum(len(part) for part in self._parts[name]) for name in TABLES}
+
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                # Copies every table into SQLite
+                with span("build sql engine"):
+                    self._engine = QueryEngine(self.tables(), version=self.version)
+            return self._engine
+
+    def cube(self):
+        with self._lock:
+            if self._cube is None:
+                with span("build cube"):
+                    self._cube = build_cube(self.table('food'), self.table('claims'))
+            return self._cube
+
+    def wastage(self):
+        with self._lock:
+            if self._wastage is None:
+                with span("build wastage tracker"):
+                    self._wastage = WastageTracker(self.table('food'), self.table('claims'))
+            return self._wastage
+
+    # The enriched claims frame is a full join, so it is rebuilt on read
+    # when rows were appended since it was last built
+    def enriched_claims(self):
+        with self._lock:
+            if self._enriched is None or self._enriched_revision != self.revision:
+                data = self.tables()
+                with span("join enriched claims"):
+                    self._enriched = build_enriched_claims(data['food'], data['claims'], data['providers'], data['receivers'])
+                self._enriched_revision = self.revision
+            return self._enriched.copy(deep=False)
+
+    def claim_series(self):
+        with self._lock:
+            if self._claim_series is None:
+                with span("build claim series"):
+                    self._claim_series = ClaimTimeSeries(self.table('claims'), self.table('food'))
+            return self._claim_series
+
+    # Location rankings; wasted quantities come from the wastage tracker,
+    # which updates them as listings expire or are claimed
+    def ranking(self):
+        with self._lock:
+            if self._ranking is None:
+                with span("build location ranking"):
+                    self._ranking = LocationRanking(self.table('food'), self.table('claims'))
+                self.wastage().watch('Location', self._ranking.set_wasted)
+            return self._ranking
+
+    def scheduler(self):
+        with self._lock:
+            if self._scheduler is None:
+                with span("build expiry queue"):
+                    self._scheduler = ExpiryScheduler(self.table('food'), self.table('claims'))
+            return self._scheduler
+
+    # Spatial index over the receivers of the given types (all when None).
+    # Rebuilding it is cheap next to matching, so it is rebuilt on read
+    # when receivers were appended since it was built.
+    def matcher(self, receiver_types=None):
+        key = tuple(sorted(receiver_types)) if receiver_types else None
+        with self._lock:
+            receiver_count = self.counts()['receivers']
+            cached = self._matchers.get(key)
+            if cached is None or cached[1] != receiver_count:
+                cached = (ReceiverMatcher(self.table('receivers'), receiver_types=receiver_types), receiver_count)
+                self._matchers[key] = cached
+            return cached[0]
+
+    def insights(self):
+        with self._lock:
+            if self._insights is None:
+                data = self.tables()
+                with span("build insights"):
+                    self._insights = InsightsTracker(data['food'], data['claims'], data['providers'], data['receivers'])
+            return self._insights
+
+    # Row bitmaps for the global filters. Built from all rows, so it is
+    # rebuilt on read when rows were appended since it was built (along
+    # with the filtered views).
+    def filter_index(self):
+        with self._lock:
+            if self._filter_index is None or self._filter_revision != self.revision:
+                data = self.tables()
+                with span("build filter index"):
+                    self._filter_index = FilterIndex(data)
+                self._filter_revision = self.revision
+                self._views = {}
+            return self._filter_index
+
+    # The rows matching the global filter `selection` as a dataset of their
+    # own, whose derived structures (cube, wastage, series, SQL engine) are
+    # built from those rows only. Its version names the data, revision and
+    # selection, so caches keyed on it never mix selections.
+    def filtered(self, selection):
+        key = selection_key(selection)
+        if not key:
+            return self
+        with self._lock:
+            index = self.filter_index()
+            view = self._views.pop(key, None)
+            if view is None:
+                with span("apply filters"):
+                    view = LiveDataset(index.apply(self.tables(), selection), version=(self.version, self.revision, key))
+                if len(self._views) >= FILTERED_VIEWS:
+                    self._views.pop(next(iter(self._views)))
+            self._views[key] = view
+            return view
+
+    # Key Insights figures; the tracker and cube are kept up to date on
+    # append, so a new summary only reads their totals
+    def insight_summary(self):
+        with self._lock:
+            if self._insight_summary is None or self._insight_revision != self.revision:
+                self._insight_summary = self.insights().summary(self.cube())
+                self._insight_revision = self.revision
+            return self._insight_summary
+
+    def _first_claim_status(self):
+        if self._first_status is None:
+            claims = self.table('claims')
+            if 'Food_ID' in claims and 'Status' in claims:
+                first = claims.drop_duplicates(subset=['Food_ID'])
+                self._first_status = dict(zip(first['Food_ID'].tolist(), first['Status'].tolist()))
+            else:
+                self._first_status = {}
+        return self._first_status
+
+    def _listing_index(self):
+        if self._listings is None:
+            food = self.table('food').drop_duplicates(subset=['Food_ID'])
+            self._listings = dict(zip(food['Food_ID'].tolist(), zip(*(food[c].tolist() for c in LISTING_COLUMNS))))
+        return self._listings
+
+    # Primary keys taken in a table, built on first use
+    def _taken_keys(self, name):
+        keys = self._keys.get(name)
+        if keys is None:
+            keys = self._keys[name] = set(self.table(name)[SCHEMA[name]['primary_key']].dropna().tolist())
+        return keys
+
+    # Rows of a batch whose primary key is set and not already taken, by
+    # the table or by an earlier row of the batch. SQLite would skip the
+    # others (INSERT OR IGNORE), so dropping them here keeps the frames and
+    # everything built from them in step with the SQL tables.
+    def _new_keys(self, name, rows):
+        key = SCHEMA[name]['primary_key']
+        if key not in rows:
+            return rows
+        ids = rows[key]
+        return rows[ids.notna() & ~ids.isin(self._taken_keys(name)) & ~ids.duplicated()]
+
+    # Split off claims on listings that are not known yet. Streamed events
+    # may arrive in any order, but the cube, ranking, insights and series
+    # take a claim's dimensions from its listing when it is appended, so
+    # such claims wait (in neither the frames nor SQL) for the listing.
+    def _hold_orphans(self, rows):
+        if 'Food_ID' not in rows or 'Food_ID' not in self._parts['food'][0].columns:
+            return rows
+        orphan = rows['Food_ID'].notna() & ~rows['Food_ID'].isin(self._taken_keys('food'))
+        if orphan.any():
+            room = max(HELD_CLAIMS - self.held_claims(), 0)
+            held = rows[orphan]
+            self._held_claims.append(held.iloc[:room])
+            self.dropped_claims += max(len(held) - room, 0)
+        return rows[~orphan]
+
+    # Append the held claims whose listing is now known; returns how many
+    def _release_claims(self, food_ids):
+        if not self._held_claims:
+            return 0
+        held = pd.concat(self._held_claims)
+        ready = held['Food_ID'].isin(food_ids)
+        if not ready.any():
+            return 0
+        self._held_claims = [held[~ready]] if not ready.all() else []
+        return self.append('claims', held[ready])
+
+    def held_claims(self):
+        with self._lock:
+            return sum(len(part) for part in self._held_claims)
+
+    # Append rows to one table. Rows without a primary key or with one
+    # already taken are dropped, and claims on unknown listings are held
+    # until the listing is appended. Returns the number of rows appended
+    # (including held claims appended along with their listings).
+    def append(self, name, rows):
+        if rows.empty:
+            return 0
+        with self._lock:
+            current = self._parts[name][0]
+            if len(current.columns) == 0:
+                # The table failed to load; nothing to line the rows up with
+                return 0
+            rows = coerce_rows(name, rows, current.columns)
+            if name == 'claims':
+                rows = self._hold_orphans(rows)
+            rows = self._new_keys(name, rows)
+            if rows.empty:
+                return 0
+            if self._engine is not None:
+                self._engine.insert(name, rows)
+            if name == 'food':
+                self._append_food(rows)
+            elif name == 'claims':
+                self._append_claims(rows)
+            elif name == 'providers' and self._insights is not None:
+                self._insights.add_providers(rows)
+            elif name == 'receivers' and self._insights is not None:
+                self._insights.add_receivers(rows)
+            self._parts[name].append(rows)
+            # Only now: a batch that failed above can be retried as a whole
+            key = SCHEMA[name]['primary_key']
+            if key in rows:
+                self._taken_keys(name).update(rows[key].tolist())
+            self.revision += 1
+            if name == 'food':
+                return len(rows) + self._release_claims(rows['Food_ID'])
+            return len(rows)
+
+    def _append_food(self, rows):
+        if self._cube is not None:
+            first_status = self._first_claim_status()
+            listings = self._listing_index()
+            statuses = []
+            for food_id, values in zip(rows['Food_ID'].tolist(), zip(*(rows[c].tolist() for c in LISTING_COLUMNS))):
+                statuses.append(first_status.get(food_id, UNCLAIMED))
+                listings.setdefault(food_id, values)
+            self._cube.add_delta(listing_delta(rows, statuses))
+        if self._wastage is not None:
+            dims = {d: rows[d].tolist() for d in self._wastage.dimensions}
+            for i, (food_id, quantity, expiry) in enumerate(zip(rows['Food_ID'].tolist(), rows['Quantity'].fillna(0).tolist(), rows['Expiry_Date'])):
+                self._wastage.add_listing(food_id, quantity, expiry, **{d: values[i] for d, values in dims.items()})
+        if self._insights is not None:
+            self._insights.add_listings(rows)
+        if self._claim_series is not None:
+            self._claim_series.add_listings(rows)
+        if self._ranking is not None:
+            self._ranking.add_listings(rows)
+        if self._scheduler is not None:
+            self._scheduler.add_listings(rows)
+
+    def _append_claims(self, rows):
+        if self._cube is not None:
+            first_status = self._first_claim_status()
+            first_claim = []
+            for food_id, status in zip(rows['Food_ID'].tolist(), rows['Status'].tolist()):
+                first_claim.append(food_id not in first_status)
+                first_status.setdefault(food_id, status)
+            known = self._listing_index()
+            missing = (None,) * len(LISTING_COLUMNS)
+            listings = pd.DataFrame(
+                [known.get(food_id, missing) for food_id in rows['Food_ID'].tolist()],
+                columns=LISTING_COLUMNS,
+                index=rows.index
+            )
+            listings['Quantity'] = pd.to_numeric(listings['Quantity'], errors='coerce')
+            self._cube.add_delta(claim_delta(rows, listings, pd.Series(first_claim, index=rows.index)))
+        if self._wastage is not None:
+            for food_id in rows['Food_ID'].tolist():
+                self._wastage.add_claim(food_id)
+        if self._insights is not None:
+            self._insights.add_claims(rows)
+        if self._claim_series is not None:
+            self._claim_series.add_claims(rows)
+        if self._ranking is not None:
+            self._ranking.add_claims(rows)
+        if self._scheduler is not None:
+            self._scheduler.add_claims(rows)
+
+    # Append a batch of records, each a dict with a 'table' key naming the
+    # table it belongs to. Returns the number of rows appended.
+    def append_records(self, records):
+        by_table = {}
+        for record in records:
+            record = dict(record)
+            name = record.pop('table', None)
+            if name in self._parts:
+                by_table.setdefault(name, []).append(record)
+        appended = 0
+        # Parents first, so claims in the same batch find their listings
+        for name in TABLES:
+            if name in by_table:
+                appended += self.append(name, pd.DataFrame(by_table[name]))
+        return appended
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+from geocode import load_geocodes
+
+EARTH_RADIUS_KM = 6371.0
+
+# Receivers per grid cell the cell size aims for
+CELL_TARGET = 16
+
+# Query x candidate distances computed at a time
+DISTANCE_BUDGET = 2_000_000
+
+# Columns of ReceiverMatcher.match()
+MATCH_COLUMNS = ['Food_ID', 'Food_Name', 'Quantity', 'Expiry_Date', 'Location', 'Rank',
+                 'Receiver_ID', 'Receiver_Name', 'Receiver_Type', 'Receiver_City', 'Distance_km']
+
+
+# Points on the unit sphere, in units of the earth radius. Straight-line
+# (chord) distance between them orders points exactly as great-circle
+# distance does, so the grid can use plain Euclidean distance.
+def to_xyz(latitude, longitude):
+    lat = np.radians(np.asarray(latitude, dtype=float))
+    lon = np.radians(np.asarray(longitude, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+# Uniform grid over 3-D points for k-nearest-neighbour queries.
+#
+# Points are sorted by cell, so the points of a run of cells along the last
+# axis are one slice. A query looks at the block of cells around its own,
+# growing the block until it holds k points; the k-th distance found then
+# bounds how far the block must reach for the answer to be exact, and the
+# block is widened once more if needed. Queries in the same cell share
+# their candidates, so a batch costs one small distance matrix per cell.
+class GridIndex:
+    def __init__(self, points, ids=None, cell_size=None):
+        points = np.asarray(points, dtype=float)
+        self.ids = np.arange(len(points)) if ids is None else np.asarray(ids)
+        self.origin = points.min(axis=0) if len(points) else np.zeros(3)
+        extent = points.max(axis=0) - self.origin if len(points) else np.zeros(3)
+        if cell_size is None:
+            # Points lie on a surface: spread them over the two widest axes
+            area = np.prod(np.sort(extent)[1:])
+            cell_size = np.sqrt(area * CELL_TARGET / max(len(points), 1))
+        self.cell_size = max(float(cell_size), 1e-9)
+        self.shape = np.floor(extent / self.cell_size).astype(np.int64) + 1
+        cells = self._cells(points)
+        keys = self._keys(cells)
+        # Ties in distance go to the point listed first
+        order = np.lexsort((np.arange(len(points)), keys))
+        self.points = points[order]
+        self.ids = self.ids[order]
+        self.keys = keys[order]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cells(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def _keys(self, cells):
+        return (cells[:, 0] * self.shape[1] + cells[:, 1]) * self.shape[2] + cells[:, 2]
+
+    # Slices of the points in the cells within `radius` of `cell` (clipped
+    # to the grid), one per (x, y) column of the block
+    def _block(self, cell, radius):
+        low = np.maximum(cell - radius, 0)
+        high = np.minimum(cell + radius, self.shape - 1)
+        if (low > high).any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        xs, ys = np.meshgrid(np.arange(low[0], high[0] + 1), np.arange(low[1], high[1] + 1), indexing='ij')
+        base = (xs.ravel() * self.shape[1] + ys.ravel()) * self.shape[2]
+        starts = np.searchsorted(self.keys, base + low[2])
+        ends = np.searchsorted(self.keys, base + high[2], side='right')
+        return starts, ends
+
+    def _covers_grid(self, cell, radius):
+        return bool(((cell - radius) <= 0).all() and ((cell + radius) >= self.shape - 1).all())
+
+    def _candidates(self, cell, radius):
+        starts, ends = self._block(cell, radius)
+        sizes = ends - starts
+        if not sizes.sum():
+            return np.empty(0, dtype=np.int64)
+        # Concatenated aranges of the slices
+        offsets = np.repeat(starts - np.cumsum(sizes) + sizes, sizes)
+        return np.arange(sizes.sum()) + offsets
+
+    # Indexes into self.points/ids of the k nearest points to each query
+    # and their chord distances, nearest first; -1 / inf pad the rows when
+    # there are fewer than k points
+    def _nearest_in(self, queries, candidates, k):
+        diff = queries[:, None, :] - self.points[candidates][None, :, :]
+        distances = np.sqrt((diff ** 2).sum(axis=2))
+        # Order by distance, then by position in the index (ties)
+        order = np.lexsort((np.broadcast_to(candidates, distances.shape), distances), axis=-1)[:, :k]
+        found = candidates[order]
+        found_distances = np.take_along_axis(distances, order, axis=1)
+        if found.shape[1] < k:
+            pad = k - found.shape[1]
+            found = np.pad(found, ((0, 0), (0, pad)), constant_values=-1)
+            found_distances = np.pad(found_distances, ((0, 0), (0, pad)), constant_values=np.inf)
+        return found, found_distances
+
+    # The ids of the k nearest points to each query point and their chord
+    # distances, as two (queries x k) arrays, nearest first. Rows are padded
+    # with -1 ids and inf distances when the index holds fewer than k points.
+    def query(self, queries, k):
+        queries = np.asarray(queries, dtype=float)
+        positions = np.full((len(queries), k), -1, dtype=np.int64)
+        distances = np.full((len(queries), k), np.inf)
+        if not len(self) or not len(queries):
+            return positions, distances
+
+        cells = self._cells(queries)
+        groups, group_of = np.unique(cells, axis=0, return_inverse=True)
+        group_of = group_of.ravel()
+        members = np.argsort(group_of, kind='stable')
+        bounds = np.searchsorted(group_of[members], np.arange(len(groups) + 1))
+        for g, cell in enumerate(groups):
+            rows = members[bounds[g]:bounds[g + 1]]
+            radius = 0
+            candidates = self._candidates(cell, radius)
+            while len(candidates) < k and not self._covers_grid(cell, radius):
+                radius = max(1, radius * 2)
+                candidates = self._candidates(cell, radius)
+            step = max(1, DISTANCE_BUDGET // max(len(candidates), 1))
+            for start in range(0, len(rows), step):
+                chunk = rows[start:start + step]
+                found, found_distances = self._nearest_in(queries[chunk], candidates, k)
+                # The block holds every point closer than its edge; widen it
+                # to the k-th distance found if that reaches past the edge
+                reach = found_distances[:, -1].max()
+                needed = int(np.ceil(reach / self.cell_size)) if np.isfinite(reach) else radius
+                if needed > radius and not self._covers_grid(cell, radius):
+                    found, found_distances = self._nearest_in(queries[chunk], self._candidates(cell, needed), k)
+                positions[chunk] = found
+                distances[chunk] = found_distances
+        ids = np.where(positions >= 0, self.ids[np.maximum(positions, 0)], -1)
+        return ids, distances
+
+
+# Spatial index over the receivers for proposing who could collect a
+# listing. Receivers are placed at their city's coordinates (see geocode.py)
+# and only those of `receiver_types` (all, when None) are eligible.
+class ReceiverMatcher:
+    def __init__(self, receivers_df, receiver_types=None, geocode_file=None):
+        receivers = receivers_df
+        if receiver_types:
+            receivers = receivers[receivers['Type'].isin(receiver_types)]
+        receivers = receivers.dropna(subset=['City']).drop_duplicates(subset=['Receiver_ID'])
+        self.geocode_file = geocode_file
+        coordinates = self._geocode(receivers['City'])
+        self.receivers = receivers.set_index('Receiver_ID')
+        self.index = GridIndex(to_xyz(coordinates['Latitude'], coordinates['Longitude']), ids=receivers['Receiver_ID'].to_numpy())
+
+    def _geocode(self, cities):
+        kwargs = {} if self.geocode_file is None else {'path': self.geocode_file}
+        geocodes = load_geocodes(cities, **kwargs)
+        return geocodes.reindex(cities.to_numpy())
+
+    # The k nearest eligible receivers to each listing, one row per listing
+    # and rank (1 = nearest), with the great-circle distance in km. Listings
+    # at the same location are looked up once.
+    def match(self, listings, k=5):
+        listings = listings.dropna(subset=['Location'])
+        locations = pd.unique(listings['Location'])
+        if not len(locations) or not len(self.index):
+            return pd.DataFrame(columns=MATCH_COLUMNS)
+        coordinates = self._geocode(pd.Series(locations, dtype=object))
+        ids, chords = self.index.query(to_xyz(coordinates['Latitude'], coordinates['Longitude']), k)
+
+        location_of = pd.Index(locations).get_indexer(listings['Location'])
+        ids = ids[location_of].ravel()
+        distances = chord_to_km(chords[location_of].ravel())
+        found = ids >= 0
+        receivers = self.receivers.reindex(ids[found])
+        result = pd.DataFrame({
+            'Food_ID': np.repeat(listings['Food_ID'].to_numpy(), k)[found],
+            'Food_Name': np.repeat(listings['Food_Name'].to_numpy(), k)[found],
+            'Quantity': np.repeat(listings['Quantity'].to_numpy(), k)[found],
+            'Expiry_Date': np.repeat(listings['Expiry_Date'].to_numpy(), k)[found],
+            'Location': np.repeat(listings['Location'].to_numpy(), k)[found],
+            'Rank': np.tile(np.arange(1, k + 1), len(listings))[found],
+            'Receiver_ID': ids[found],
+            'Receiver_Name': receivers['Name'].to_numpy(),
+            'Receiver_Type': receivers['Type'].to_numpy(),
+            'Receiver_City': receivers['City'].to_numpy(),
+            'Distance_km': distances[found].round(1)
+        })
+        return result
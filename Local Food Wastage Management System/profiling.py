@@ -0,0 +1,200 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+import pandas as pd
+from stats import percentile
+
+# Durations kept per span name for the percentiles
+SPAN_WINDOW = 1000
+
+# Seconds between two samples of the sampling profiler
+SAMPLE_INTERVAL = 0.005
+
+# Flame graph nodes with fewer samples than this share of the total are
+# left out
+FLAME_MIN_SHARE = 0.002
+
+
+# Wall-clock timings of named spans in this process.
+#
+# Spans nest: a span's self time is its duration minus the spans opened
+# inside it on the same thread, so e.g. the self time of a chart's span is
+# the figure construction once its data computation has its own span.
+class SpanRecorder:
+    def __init__(self, window=SPAN_WINDOW):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.window = window
+        # name -> (durations, self times, count)
+        self._spans = {}
+
+    @contextmanager
+    def span(self, name):
+        stack = self._local.__dict__.setdefault('stack', [])
+        # Time spent in child spans, added to by them as they close
+        frame = [0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += seconds
+            self.record(name, seconds, seconds - frame[0])
+
+    def record(self, name, seconds, self_seconds=None):
+        with self._lock:
+            if name not in self._spans:
+                self._spans[name] = [deque(maxlen=self.window), deque(maxlen=self.window), 0]
+            durations, self_times, _ = self._spans[name]
+            durations.append(seconds)
+            self_times.append(seconds if self_seconds is None else self_seconds)
+            self._spans[name][2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._spans = {}
+
+    # Count, p50 and p95 of the duration and p50 of the self time per span,
+    # over the last `window` runs of each
+    def stats(self):
+        with self._lock:
+            spans = {name: (list(durations), list(self_times), count)
+                     for name, (durations, self_times, count) in self._spans.items()}
+        return {
+            name: {
+                'count': count,
+                'p50': percentile(durations, 50),
+                'p95': percentile(durations, 95),
+                'max': max(durations),
+                'self_p50': percentile(self_times, 50)
+            }
+            for name, (durations, self_times, count) in spans.items()
+        }
+
+    def frame(self):
+        stats = self.stats()
+        rows = [{'Operation': name, 'Count': s['count'], 'p50_ms': s['p50'] * 1000, 'p95_ms': s['p95'] * 1000,
+                 'Max_ms': s['max'] * 1000, 'Self_p50_ms': s['self_p50'] * 1000}
+                for name, s in stats.items()]
+        columns = ['Operation', 'Count', 'p50_ms', 'p95_ms', 'Max_ms', 'Self_p50_ms']
+        return pd.DataFrame(rows, columns=columns).sort_values('p95_ms', ascending=False, ignore_index=True)
+
+    # Stats and the raw durations kept per span, for JSON export
+    def export(self):
+        with self._lock:
+            samples = {name: list(durations) for name, (durations, _, _) in self._spans.items()}
+        return {
+            'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'spans': self.stats(),
+            'samples': samples
+        }
+
+
+# The spans of this process
+SPANS = SpanRecorder()
+
+
+def span(name):
+    return SPANS.span(name)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+# Sampling profiler for the thread that starts it, e.g. one script rerun.
+#
+# A background thread reads the profiled thread's Python stack every
+# `interval` seconds and counts identical stacks, which is the input of a
+# flame graph. Stacks are cut to start at the outermost frame of
+# `root_file` when given (the app script), leaving out Streamlit's runner.
+# Only Python frames are seen: time in C code (pandas, SQLite) shows up
+# under the Python function that called it, and work done in worker
+# processes is not seen at all.
+class SamplingProfiler:
+    def __init__(self, interval=SAMPLE_INTERVAL, root_file=None):
+        self.interval = interval
+        self.root_file = os.path.abspath(root_file) if root_file else None
+        self.stacks = Counter()
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._target)
+        stack = []
+        while frame is not None:
+            stack.append(frame)
+            frame = frame.f_back
+        stack.reverse()
+        if self.root_file is not None:
+            roots = [i for i, f in enumerate(stack) if os.path.abspath(f.f_code.co_filename) == self.root_file]
+            if not roots:
+                return
+            stack = stack[roots[0]:]
+        if stack:
+            self.stacks[";".join(_frame_label(f) for f in stack)] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.seconds = time.perf_counter() - self._started
+        return self
+
+    # Collapsed stacks, one "outer;...;inner count" line per stack (the
+    # format flamegraph.pl and speedscope read)
+    def folded(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    # Functions by samples with them on top of the stack (self) and
+    # anywhere on it (total)
+    def top_functions(self, n=20):
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        samples = max(sum(self.stacks.values()), 1)
+        rows = [{'Function': label, 'Self_Samples': own[label], 'Total_Samples': count,
+                 'Total_Share': count / samples}
+                for label, count in total.most_common(n)]
+        return pd.DataFrame(rows, columns=['Function', 'Self_Samples', 'Total_Samples', 'Total_Share'])
+
+    # Nodes of the flame graph (one per distinct stack prefix) with their
+    # sample counts, for an icicle chart: ids, labels, parents and values
+    def flame_frame(self, min_share=FLAME_MIN_SHARE):
+        values = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            for depth in range(1, len(frames) + 1):
+                values[";".join(frames[:depth])] += count
+        samples = sum(self.stacks.values())
+        nodes = [node for node, count in values.items() if count >= min_share * samples]
+        return pd.DataFrame({
+            'id': nodes,
+            'label': [node.rsplit(";", 1)[-1] for node in nodes],
+            'parent': [node.rsplit(";", 1)[0] if ";" in node else "" for node in nodes],
+            'samples': [values[node] for node in nodes]
+        })
@@ -0,0 +1,31 @@
+# Predefined queries
+predefined_queries = {
+    "Total Providers": "SELECT COUNT(*) AS Total_Providers FROM providers",
+    "Total Receivers": "SELECT COUNT(*) AS Total_Receivers FROM receivers",
+    "Available Food Items": "SELECT COUNT(*) AS Available_Food FROM food",
+    "Total Claims": "SELECT COUNT(*) AS Total_Claims FROM claims",
+    "Top 10 Food Types": "SELECT Food_Type, COUNT(*) AS Count FROM food GROUP BY Food_Type ORDER BY Count DESC LIMIT 10",
+    "Top 10 Providers by Food Listings": """
+        SELECT p.Name, COUNT(f.Food_ID) AS Listings 
+        FROM providers p 
+        JOIN food f ON p.Provider_ID = f.Provider_ID 
+        GROUP BY p.Name 
+        ORDER BY Listings DESC 
+        LIMIT 10
+    """,
+    "Claims by Status": "SELECT Status, COUNT(*) AS Claim_Count FROM claims GROUP BY Status",
+    "Expiring Soon (Next 7 Days)": """
+        SELECT * 
+        FROM food 
+        WHERE Expiry_Date BETWEEN date('now') AND date('now', '+7 days')
+    """,
+    "Top Receivers by Claims": """
+        SELECT r.Name, COUNT(c.Claim_ID) AS Claims 
+        FROM receivers r 
+        JOIN claims c ON r.Receiver_ID = c.Receiver_ID 
+        GROUP BY r.Name 
+        ORDER BY Claims DESC 
+        LIMIT 10
+    """,
+    "Food Wastage (Expired Items)": "SELECT * FROM food WHERE Expiry_Date < date('now')"
+}
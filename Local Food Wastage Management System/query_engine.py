@@ -0,0 +1,156 @@
+import itertools
+import sqlite3
+import threading
+import pandas as pd
+from schema import VIEWS, table_ddl, to_rows
+
+# Each engine gets its own named in-memory database
+_database_ids = itertools.count()
+
+
+# Raised by stream() when a query is stopped by its abort callback
+class QueryInterrupted(Exception):
+    pass
+
+
+# Result column names with repeats suffixed ":1", ":2"... the way SQLite
+# names them in CREATE TABLE AS SELECT, so SELECT * over a join can be shown
+def unique_names(names):
+    seen = {}
+    unique = []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        unique.append(f"{name}:{count}" if count else name)
+    return unique
+
+
+# In-memory SQLite database holding the four tables.
+# pandasql's sqldf creates a fresh database and copies every DataFrame into it
+# on each call; this engine loads the tables once and keeps the database open
+# so it can be shared across Streamlit reruns and sessions.
+#
+# The database uses SQLite's shared cache: one writer connection loads and
+# appends rows, and every thread reads through its own connection, so a long
+# query in one session does not hold up queries from other sessions. Readers
+# use read_uncommitted, so appends never wait for (or fail on) running reads.
+class QueryEngine:
+    def __init__(self, tables, version=None):
+        self.version = version
+        self._uri = f"file:fms-engine-{next(_database_ids)}?mode=memory&cache=shared"
+        self._conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        # Serializes writes on the shared writer connection
+        self._lock = threading.Lock()
+        self._readers = threading.local()
+        for name, df in tables.items():
+            # Tables that failed to load have no columns and cannot be created
+            if len(df.columns) > 0:
+                self._load_table(name, df)
+        for name, statement in VIEWS.items():
+            try:
+                self._conn.execute(statement)
+            except sqlite3.Error:
+                # A table or column the view needs failed to load
+                pass
+
+    # Create the table with its primary key from the schema, bulk insert and
+    # then build the secondary indexes (faster than maintaining them row by
+    # row). Duplicate primary keys keep the first row, like the cleaning
+    # step's drop_duplicates.
+    def _load_table(self, name, df):
+        create_table, *create_indexes = table_ddl(name, list(df.columns))
+        self._conn.execute(create_table)
+        self._insert(name, df)
+        for statement in create_indexes:
+            self._conn.execute(statement)
+        self._conn.execute(f"ANALYZE {name}")
+        self._conn.commit()
+
+    def _insert(self, name, df):
+        columns = ", ".join(f'"{column}"' for column in df.columns)
+        placeholders = ", ".join("?" for _ in df.columns)
+        self._conn.executemany(
+            f"INSERT OR IGNORE INTO {name} ({columns}) VALUES ({placeholders})",
+            to_rows(name, df)
+        )
+
+    # Append rows to an existing table; its indexes are updated by SQLite
+    def insert(self, name, df):
+        with self._lock:
+            self._insert(name, df)
+            self._conn.commit()
+
+    # The calling thread's read connection
+    def _reader(self):
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._uri, uri=True)
+            conn.execute("PRAGMA read_uncommitted = 1")
+            # Tables are shared with every session; SQL typed into the app
+            # must not change them behind the dataset's back
+            conn.execute("PRAGMA query_only = 1")
+            self._readers.conn = conn
+        return conn
+
+    def query(self, query, params=None):
+        return pd.read_sql_query(query, self._reader(), params=params)
+
+    # Run a query and yield its result in DataFrames of up to `chunk_size`
+    # rows. `should_abort` is polled while SQLite works (every
+    # `check_every` VM instructions) and between chunks; returning True
+    # stops the query with QueryInterrupted. `progress` receives the number
+    # of VM instructions run so far.
+    def stream(self, query, params=None, chunk_size=10000, should_abort=None, progress=None, check_every=10000):
+        conn = self._reader()
+        steps = [0]
+
+        def handler():
+            steps[0] += check_every
+            if progress is not None:
+                progress(steps[0])
+            return 1 if should_abort is not None and should_abort() else 0
+
+        conn.set_progress_handler(handler, check_every)
+        cursor = conn.cursor()
+        try:
+            try:
+                cursor.execute(query, params or [])
+                columns = unique_names([column[0] for column in cursor.description or []])
+                rows = cursor.fetchmany(chunk_size)
+                while rows:
+                    yield pd.DataFrame.from_records(rows, columns=columns)
+                    if should_abort is not None and should_abort():
+                        raise QueryInterrupted()
+                    rows = cursor.fetchmany(chunk_size)
+            except sqlite3.OperationalError as e:
+                if "interrupted" in str(e):
+                    raise QueryInterrupted() from e
+                raise
+        finally:
+            # Finalize the statement even when the caller stops early
+            cursor.close()
+            conn.set_progress_handler(None, check_every)
+
+    # SQLite's plan for a query, one row per plan step
+    def explain(self, query):
+        return pd.read_sql_query(f"EXPLAIN QUERY PLAN {query}", self._reader())
+
+    def columns(self, name):
+        return [row[1] for row in self._reader().execute(f'PRAGMA table_info("{name}")').fetchall()]
+
+    def table_names(self):
+        rows = self._reader().execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'").fetchall()
+        return [row[0] for row in rows]
+
+    # Copy the database to a SQLite file, e.g. for worker processes to open
+    def save(self, path):
+        target = sqlite3.connect(path)
+        try:
+            with self._lock:
+                self._conn.backup(target)
+        finally:
+            target.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
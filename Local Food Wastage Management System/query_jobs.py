@@ -0,0 +1,97 @@
+import threading
+import time
+import pandas as pd
+from query_engine import QueryInterrupted
+
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+TIMED_OUT = 'timed out'
+FAILED = 'failed'
+
+
+# A custom SQL query running on a background thread.
+#
+# Rows are fetched in chunks of `chunk_size` and collection stops once
+# `max_rows` rows are held, so an unbounded join cannot fill memory. The
+# query is interrupted when `timeout` seconds have passed or cancel() is
+# called. The Streamlit script polls the job instead of running the query
+# itself, so the page stays responsive and the user can cancel.
+#
+# `vm_steps` counts SQLite virtual machine instructions run so far: it is
+# the closest thing SQLite reports to rows scanned and grows with the work
+# done even while no rows have come back yet.
+class QueryJob:
+    def __init__(self, engine, query, params=None, max_rows=10000, timeout=30.0, chunk_size=1000):
+        self.query = query
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self.status = RUNNING
+        self.error = None
+        self.truncated = False
+        self.rows_fetched = 0
+        self.vm_steps = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self._chunks = []
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(engine, params, chunk_size), daemon=True, name="query-job"
+        )
+        self._thread.start()
+
+    @property
+    def running(self):
+        return self.status == RUNNING
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def _timed_out(self):
+        return self.timeout is not None and time.monotonic() - self.started > self.timeout
+
+    def _should_abort(self):
+        return self._cancel.is_set() or self._timed_out()
+
+    def _progress(self, steps):
+        self.vm_steps = steps
+
+    def _run(self, engine, params, chunk_size):
+        chunks = engine.stream(self.query, params, chunk_size=chunk_size,
+                               should_abort=self._should_abort, progress=self._progress)
+        try:
+            for chunk in chunks:
+                room = self.max_rows - self.rows_fetched
+                if len(chunk) > room:
+                    # Rows beyond the cap are left in SQLite, never fetched
+                    self.truncated = True
+                    chunk = chunk.iloc[:room]
+                if len(chunk) > 0:
+                    self._chunks.append(chunk)
+                    self.rows_fetched += len(chunk)
+                if self.truncated:
+                    break
+            self.status = DONE
+        except QueryInterrupted:
+            self.status = CANCELLED if self._cancel.is_set() else TIMED_OUT
+        except Exception as e:
+            self.error = e
+            self.status = FAILED
+        finally:
+            chunks.close()
+            self.finished = time.monotonic()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self.running
+
+    # The rows fetched so far (all of them once the job is done)
+    def result(self):
+        chunks = list(self._chunks)
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
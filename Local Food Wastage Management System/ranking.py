@@ -0,0 +1,170 @@
+import heapq
+import math
+import threading
+from collections import defaultdict
+import pandas as pd
+
+# Claim status whose claims count as claimed, as in the location charts
+CLAIMED_STATUS = 'Completed'
+
+# Heaps are rebuilt once stale entries outnumber live ones by this factor
+COMPACT_FACTOR = 2
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+# Keys ranked by a score that changes over time.
+#
+# Every update pushes the new score onto a min-heap and a max-heap, in
+# O(log n); entries whose score has since changed are stale and skipped (and
+# dropped) when a ranking is read. Reading the first k keys from either end
+# pops them and pushes them back, in O(k log n). Ties go to the lowest key.
+class RankIndex:
+    def __init__(self, scores=None):
+        self._scores = {}
+        self._low = []
+        self._high = []
+        for key, score in (scores or {}).items():
+            if not _is_missing(score):
+                self._scores[key] = score
+        self._rebuild()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def _rebuild(self):
+        self._low = [(score, key) for key, score in self._scores.items()]
+        self._high = [(-score, key) for key, score in self._scores.items()]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
+
+    # Set the score of `key`; None removes it from the ranking
+    def update(self, key, score):
+        if _is_missing(score):
+            self._scores.pop(key, None)
+            return
+        if self._scores.get(key) == score:
+            return
+        self._scores[key] = score
+        heapq.heappush(self._low, (score, key))
+        heapq.heappush(self._high, (-score, key))
+        if len(self._low) > COMPACT_FACTOR * len(self._scores) + 64:
+            self._rebuild()
+
+    def _first(self, heap, k, sign):
+        found = []
+        seen = set()
+        while heap and len(found) < k:
+            entry = heapq.heappop(heap)
+            score, key = entry
+            # A key pushed twice with the same score has two live entries
+            if key in seen or self._scores.get(key) != sign * score:
+                continue
+            seen.add(key)
+            found.append(entry)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [(key, sign * score) for score, key in found]
+
+    # The k keys with the highest scores, highest first, as (key, score)
+    def largest(self, k):
+        return self._first(self._high, k, -1)
+
+    # The k keys with the lowest scores, lowest first, as (key, score)
+    def smallest(self, k):
+        return self._first(self._low, k, 1)
+
+
+# Listed, claimed and wasted quantity per location, ranked by claim rate,
+# wastage and volume (listed quantity) for the top/bottom location charts.
+#
+# Listed quantity counts each listing once; claimed quantity counts every
+# completed claim with its listing's quantity, like the aggregate cube.
+# Wasted quantity is pushed in by the WastageTracker (see
+# LiveDataset.ranking), which moves it as listings expire. A new listing or
+# claim changes one location, so each update costs O(log locations).
+class LocationRanking:
+    def __init__(self, food_df, claims_df):
+        self._lock = threading.Lock()
+        # Food_ID -> (Location, Quantity), first listing wins
+        self._listings = {}
+        self.listed = defaultdict(int)
+        self.claimed = defaultdict(int)
+        self.wasted = {}
+
+        if {'Food_ID', 'Quantity', 'Location'} <= set(food_df.columns):
+            food = food_df.drop_duplicates(subset=['Food_ID'])
+            quantity = food['Quantity'].fillna(0)
+            self._listings = dict(zip(food['Food_ID'].tolist(), zip(food['Location'].tolist(), quantity.tolist())))
+            self.listed.update(quantity.groupby(food['Location'], observed=True).sum().to_dict())
+            if {'Food_ID', 'Status'} <= set(claims_df.columns):
+                completed = claims_df.loc[claims_df['Status'] == CLAIMED_STATUS, ['Food_ID']]
+                claimed = completed.merge(food[['Food_ID', 'Location', 'Quantity']], on='Food_ID')
+                self.claimed.update(claimed['Quantity'].fillna(0).groupby(claimed['Location'], observed=True).sum().to_dict())
+
+        self._indexes = {
+            'claim_rate': RankIndex({location: self._claim_rate(location) for location in self.listed}),
+            'wastage': RankIndex(),
+            'volume': RankIndex(dict(self.listed))
+        }
+
+    def _claim_rate(self, location):
+        listed = self.listed.get(location, 0)
+        return self.claimed.get(location, 0) / listed * 100 if listed > 0 else None
+
+    def _changed(self, location):
+        self._indexes['claim_rate'].update(location, self._claim_rate(location))
+        self._indexes['volume'].update(location, self.listed.get(location, 0))
+
+    def add_listings(self, rows):
+        with self._lock:
+            for food_id, location, quantity in zip(rows['Food_ID'].tolist(), rows['Location'].tolist(), rows['Quantity'].tolist()):
+                if _is_missing(food_id) or food_id in self._listings:
+                    continue
+                quantity = 0 if _is_missing(quantity) else quantity
+                self._listings[food_id] = (location, quantity)
+                if not _is_missing(location):
+                    self.listed[location] += quantity
+                    self._changed(location)
+
+    # Claims on listings that are not known yet count nothing, as in the cube
+    def add_claims(self, rows):
+        with self._lock:
+            for food_id, status in zip(rows['Food_ID'].tolist(), rows['Status'].tolist()):
+                listing = self._listings.get(food_id)
+                if status != CLAIMED_STATUS or listing is None or _is_missing(listing[0]):
+                    continue
+                location, quantity = listing
+                self.claimed[location] += quantity
+                self._changed(location)
+
+    # Wasted quantity of a location changed (WastageTracker callback)
+    def set_wasted(self, location, quantity):
+        if _is_missing(location):
+            return
+        with self._lock:
+            if quantity:
+                self.wasted[location] = quantity
+            else:
+                self.wasted.pop(location, None)
+            self._indexes['wastage'].update(location, quantity or None)
+
+    # The k locations with the highest (or, with bottom=True, lowest)
+    # `metric`, with their listed, claimed and wasted quantity and claim
+    # rate. Locations without listed quantity have no claim rate, and
+    # locations without waste are not ranked by wastage.
+    def top(self, metric, k=10, bottom=False):
+        with self._lock:
+            index = self._indexes[metric]
+            ranked = index.smallest(k) if bottom else index.largest(k)
+            locations = [location for location, _ in ranked]
+            result = pd.DataFrame({
+                'Location': locations,
+                'Listed_Quantity': [self.listed.get(location, 0) for location in locations],
+                'Claimed_Quantity': [self.claimed.get(location, 0) for location in locations],
+                'Wasted_Quantity': [self.wasted.get(location, 0) for location in locations],
+                'Claim_Rate': [self._claim_rate(location) for location in locations]
+            })
+        return result
@@ -0,0 +1,115 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Queries relative to the current time; their results expire after a TTL
+# even if the data does not change
+TIME_RELATIVE = re.compile(r"'now'|\bcurrent_(date|time|timestamp)\b", re.IGNORECASE)
+
+
+# A quoted string or identifier ('...' or "...", doubled quotes escaped),
+# a -- comment up to the end of its line or a /* */ comment
+SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?(?:\*/|$)", re.DOTALL)
+
+
+# Drop comments, collapse whitespace outside quoted strings and identifiers
+# and drop trailing semicolons, so the same query typed or indented
+# differently shares a cache entry. Comments go first: collapsing the
+# newline that ends a -- comment would comment out the rest of the query.
+# Case is kept: it matters inside literals and for result column names.
+def normalize_sql(query):
+    parts, code, pos = [], [], 0
+    for match in SQL_TOKEN.finditer(query):
+        code.append(query[pos:match.start()])
+        token = match.group()
+        if token.startswith(("--", "/*")):
+            code.append(" ")
+        else:
+            parts.append(re.sub(r"\s+", " ", "".join(code)))
+            parts.append(token)
+            code = []
+        pos = match.end()
+    code.append(query[pos:])
+    parts.append(re.sub(r"\s+", " ", "".join(code)))
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+# Process-wide cache of SQL results, keyed on normalized SQL text and the
+# dataset version the query ran against (callers running parameterized
+# queries include the parameters in the version).
+#
+# Entries are evicted least-recently-used first once the cached DataFrames
+# exceed `max_bytes`. Queries using date('now') and friends get a TTL so
+# "expiring soon" style results roll over with the clock.
+class ResultCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024, time_relative_ttl=60.0):
+        self.max_bytes = max_bytes
+        self.time_relative_ttl = time_relative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, query, version):
+        key = (normalize_sql(query), version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, query, version, result):
+        key = (normalize_sql(query), version)
+        size = int(result.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        expires = None
+        if TIME_RELATIVE.search(query):
+            expires = time.monotonic() + self.time_relative_ttl
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (result, size, expires)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    # Cached result, or run `compute` and cache what it returns.
+    # Results are shared between sessions and must not be modified.
+    def get_or_compute(self, query, version, compute):
+        result = self.get(query, version)
+        if result is None:
+            result = compute()
+            self.put(query, version, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
@@ -0,0 +1,158 @@
+import heapq
+import math
+import threading
+import pandas as pd
+from wastage import claimed_food_ids
+
+# Listing columns kept per queued item
+ITEM_COLUMNS = ['Food_Name', 'Quantity', 'Expiry_Date', 'Location', 'Provider_ID', 'Food_Type', 'Meal_Type']
+
+# The heap is rebuilt once stale entries outnumber queued items by this factor
+COMPACT_FACTOR = 2
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def to_ns(value):
+    return pd.Timestamp(value).as_unit('ns').value
+
+
+# Unclaimed listings ordered by urgency: earliest Expiry_Date first and, on
+# the same day, the largest Quantity first (ties by Food_ID). A listing
+# leaves the queue once it has a claim of any status, so what expires here
+# is what the wastage tracker counts as wasted (see claimed_food_ids).
+#
+# The queue is a heap. A new listing is pushed in O(log n); a claim only
+# marks its listing as taken, and taken or expired entries are dropped when
+# they reach the top, so claims and listings cost O(log n) each however high
+# the event rate, and the table is never rescanned. A listing stays usable
+# through its expiry date and is moved to `expired` once the clock passes
+# the end of that day.
+class ExpiryScheduler:
+    def __init__(self, food_df, claims_df, now=None):
+        self._lock = threading.Lock()
+        # Food_ID -> listing values (ITEM_COLUMNS) for queued listings
+        self._items = {}
+        self._claimed = claimed_food_ids(claims_df)
+        self._heap = []
+        self.now = to_ns(pd.Timestamp(now if now is not None else pd.Timestamp.now()).normalize())
+        self.expired_items = 0
+        self.expired_quantity = 0
+        self.dispatched_items = 0
+        self.columns = ['Food_ID'] + [c for c in ITEM_COLUMNS if c in food_df.columns]
+
+        if food_df.empty or any(c not in food_df.columns for c in ['Food_ID', 'Quantity', 'Expiry_Date']):
+            return
+        food = food_df.drop_duplicates(subset=['Food_ID'])
+        food = food[~food['Food_ID'].isin(self._claimed)]
+        expiry = pd.to_datetime(food['Expiry_Date'], errors='coerce')
+        food = food[expiry.notna() & (expiry >= pd.Timestamp(self.now))]
+        expiry_ns = pd.to_datetime(food['Expiry_Date']).to_numpy(dtype='datetime64[ns]').astype('int64').tolist()
+        quantities = food['Quantity'].fillna(0).tolist()
+        values = zip(*(food[c].tolist() for c in self.columns[1:]))
+        for food_id, expires, quantity, row in zip(food['Food_ID'].tolist(), expiry_ns, quantities, values):
+            self._items[food_id] = row
+            self._heap.append((expires, -quantity, food_id))
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def _live(self, entry):
+        return entry[2] in self._items and entry[2] not in self._claimed
+
+    def _compact(self):
+        if len(self._heap) > COMPACT_FACTOR * len(self._items) + 64:
+            self._heap = [entry for entry in self._heap if self._live(entry)]
+            heapq.heapify(self._heap)
+
+    def _advance(self, now):
+        self.now = max(self.now, now)
+        while self._heap and self._heap[0][0] < self.now:
+            expires, quantity, food_id = heapq.heappop(self._heap)
+            if food_id in self._items:
+                del self._items[food_id]
+                self.expired_items += 1
+                self.expired_quantity -= quantity
+
+    # Move the clock forward to the start of `now`'s day (it never moves
+    # back); listings whose expiry date has passed leave the queue
+    def advance(self, now=None):
+        with self._lock:
+            self._advance(to_ns(pd.Timestamp(now if now is not None else pd.Timestamp.now()).normalize()))
+
+    def add_listings(self, rows):
+        with self._lock:
+            expiry = pd.to_datetime(rows['Expiry_Date'], errors='coerce')
+            values = zip(*(rows[c].tolist() for c in self.columns[1:]))
+            for food_id, expires, quantity, row in zip(rows['Food_ID'].tolist(), expiry.tolist(), rows['Quantity'].tolist(), values):
+                if _is_missing(food_id) or food_id in self._items or food_id in self._claimed or pd.isna(expires):
+                    continue
+                expires = to_ns(expires)
+                if expires < self.now:
+                    continue
+                self._items[food_id] = row
+                heapq.heappush(self._heap, (expires, -(0 if _is_missing(quantity) else quantity), food_id))
+
+    def add_claims(self, rows):
+        with self._lock:
+            for food_id in rows['Food_ID'].tolist():
+                if food_id not in self._claimed:
+                    self._claimed.add(food_id)
+                    self._items.pop(food_id, None)
+            self._compact()
+
+    def _frame(self, entries):
+        food_ids = [entry[2] for entry in entries]
+        rows = [self._items[food_id] for food_id in food_ids]
+        result = pd.DataFrame(rows, columns=self.columns[1:])
+        result.insert(0, 'Food_ID', food_ids)
+        return result
+
+    # Up to `limit` live entries from the top of the heap, in order, and
+    # optionally only those expiring before `until`; stale entries met on
+    # the way are dropped
+    def _top(self, limit, until):
+        found = []
+        while self._heap and len(found) < limit:
+            entry = heapq.heappop(self._heap)
+            if not self._live(entry):
+                continue
+            if until is not None and entry[0] > until:
+                heapq.heappush(self._heap, entry)
+                break
+            found.append(entry)
+        return found
+
+    # The `limit` most urgent queued listings (only those expiring on or
+    # before `until` when given), most urgent first, left in the queue:
+    # what goes to waste next unless someone claims it
+    def upcoming(self, limit=20, until=None):
+        with self._lock:
+            found = self._top(limit, None if until is None else to_ns(until))
+            for entry in found:
+                heapq.heappush(self._heap, entry)
+            return self._frame(found)
+
+    # Take the `limit` most urgent listings out of the queue to route them
+    # to receivers; they are not offered again unless re-listed
+    def dispatch(self, limit=20, until=None):
+        with self._lock:
+            found = self._top(limit, None if until is None else to_ns(until))
+            result = self._frame(found)
+            for entry in found:
+                del self._items[entry[2]]
+            self.dispatched_items += len(found)
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': len(self._items),
+                'expired_items': self.expired_items,
+                'expired_quantity': self.expired_quantity,
+                'dispatched': self.dispatched_items
+            }
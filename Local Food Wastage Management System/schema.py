@@ -0,0 +1,136 @@
+import pandas as pd
+
+# Relational schema for the four tables.
+# columns: SQL type per column. DATE columns are stored as ISO 'YYYY-MM-DD'
+# text and TIMESTAMP columns as 'YYYY-MM-DD HH:MM:SS', so SQLite's date()
+# functions and plain string comparisons order them correctly.
+# indexes: secondary indexes (foreign keys and range-filtered columns).
+# categorical: low-cardinality TEXT columns, held in memory as categoricals
+# (see data_loader.compact_table).
+SCHEMA = {
+    'providers': {
+        'columns': {
+            'Provider_ID': 'INTEGER',
+            'Name': 'TEXT',
+            'Type': 'TEXT',
+            'Address': 'TEXT',
+            'City': 'TEXT',
+            'Contact': 'TEXT'
+        },
+        'primary_key': 'Provider_ID',
+        'foreign_keys': {},
+        'indexes': [],
+        'categorical': ['Type', 'City']
+    },
+    'receivers': {
+        'columns': {
+            'Receiver_ID': 'INTEGER',
+            'Name': 'TEXT',
+            'Type': 'TEXT',
+            'City': 'TEXT',
+            'Contact': 'TEXT'
+        },
+        'primary_key': 'Receiver_ID',
+        'foreign_keys': {},
+        'indexes': [],
+        'categorical': ['Type', 'City']
+    },
+    'food': {
+        'columns': {
+            'Food_ID': 'INTEGER',
+            'Food_Name': 'TEXT',
+            'Quantity': 'INTEGER',
+            'Expiry_Date': 'DATE',
+            'Provider_ID': 'INTEGER',
+            'Provider_Type': 'TEXT',
+            'Location': 'TEXT',
+            'Food_Type': 'TEXT',
+            'Meal_Type': 'TEXT'
+        },
+        'primary_key': 'Food_ID',
+        'foreign_keys': {'Provider_ID': ('providers', 'Provider_ID')},
+        'indexes': ['Provider_ID', 'Expiry_Date'],
+        'categorical': ['Food_Name', 'Provider_Type', 'Location', 'Food_Type', 'Meal_Type']
+    },
+    'claims': {
+        'columns': {
+            'Claim_ID': 'INTEGER',
+            'Food_ID': 'INTEGER',
+            'Receiver_ID': 'INTEGER',
+            'Status': 'TEXT',
+            'Timestamp': 'TIMESTAMP'
+        },
+        'primary_key': 'Claim_ID',
+        'foreign_keys': {
+            'Food_ID': ('food', 'Food_ID'),
+            'Receiver_ID': ('receivers', 'Receiver_ID')
+        },
+        'indexes': ['Food_ID', 'Receiver_ID'],
+        'categorical': ['Status']
+    }
+}
+
+# Views created on top of the tables. claims_enriched mirrors the columns of
+# enriched_claims.py; as a view it stays current while rows are appended.
+VIEWS = {
+    'claims_enriched': """
+        CREATE VIEW claims_enriched AS
+        SELECT c.Claim_ID, c.Food_ID, c.Receiver_ID, c.Status, c.Timestamp,
+               f.Food_Name, f.Quantity, f.Expiry_Date, f.Provider_ID, f.Provider_Type,
+               f.Location, f.Food_Type, f.Meal_Type,
+               p.Name AS Provider_Name, p.City AS Provider_City,
+               r.Name AS Receiver_Name, r.Type AS Receiver_Type, r.City AS Receiver_City
+        FROM claims c
+        LEFT JOIN food f ON f.Food_ID = c.Food_ID
+        LEFT JOIN providers p ON p.Provider_ID = f.Provider_ID
+        LEFT JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+    """
+}
+
+DATE_FORMATS = {
+    'DATE': "%Y-%m-%d",
+    'TIMESTAMP': "%Y-%m-%d %H:%M:%S"
+}
+
+
+# CREATE TABLE / CREATE INDEX statements for a table.
+# Columns present in the DataFrame but not in the schema are kept untyped,
+# and declared columns missing from the DataFrame are left out.
+def table_ddl(name, columns):
+    spec = SCHEMA.get(name, {'columns': {}, 'primary_key': None, 'foreign_keys': {}, 'indexes': []})
+    definitions = []
+    for column in columns:
+        column_type = spec['columns'].get(column, '')
+        definition = f'"{column}" {column_type}'.rstrip()
+        if column == spec['primary_key']:
+            # NOT NULL: an INTEGER PRIMARY KEY is the rowid, so SQLite would
+            # otherwise give a row without a key a new one instead of
+            # rejecting it
+            definition += " PRIMARY KEY NOT NULL"
+        definitions.append(definition)
+    for column, (ref_table, ref_column) in spec['foreign_keys'].items():
+        if column in columns:
+            definitions.append(f'FOREIGN KEY ("{column}") REFERENCES {ref_table} ("{ref_column}")')
+
+    statements = [f'CREATE TABLE {name} (\n    ' + ",\n    ".join(definitions) + "\n)"]
+    for column in spec['indexes']:
+        if column in columns:
+            statements.append(f'CREATE INDEX idx_{name}_{column.lower()} ON {name} ("{column}")')
+    return statements
+
+
+# Convert a DataFrame to rows of plain Python values matching the schema
+# types (ISO strings for date columns, None for missing values).
+def to_rows(name, df):
+    column_types = SCHEMA.get(name, {'columns': {}})['columns']
+    values = []
+    for column in df.columns:
+        series = df[column]
+        date_format = DATE_FORMATS.get(column_types.get(column))
+        if date_format is None and pd.api.types.is_datetime64_any_dtype(series):
+            date_format = DATE_FORMATS['TIMESTAMP']
+        if date_format:
+            series = pd.to_datetime(series, errors='coerce').dt.strftime(date_format)
+        series = series.astype(object)
+        values.append(series.where(series.notna(), None).tolist())
+    return zip(*values)
@@ -0,0 +1,6 @@
+# Nearest-rank percentile of a list of numbers
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
@@ -0,0 +1,27 @@
+# Every chart must render, or report that there is nothing to draw, when
+# the sidebar filters match no rows.
+#
+#   python -m pytest tests
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, "benchmarks"))
+
+from charts import CHARTS, chart_options, render_chart
+from live_data import LiveDataset
+from synthetic_data import make_tables
+
+
+def test_every_chart_renders_with_no_matching_rows():
+    dataset = LiveDataset(make_tables(200))
+    view = dataset.filtered({'City': ["Nowhere"]})
+    assert view is not dataset
+    assert all(table.empty for table in view.tables().values())
+
+    def run(fn, **kwargs):
+        return fn(view.tables(), **kwargs)
+
+    for name in CHARTS:
+        assert render_chart(name, view, run, chart_options(name)) is None, name
@@ -0,0 +1,130 @@
+# Appended rows must reach the pandas tables and the SQL engine alike: the
+# charts and cube read the former, the SQL tab the latter.
+#
+#   python -m pytest tests
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, "benchmarks"))
+
+from ingest import EventIngestor
+from live_data import LiveDataset
+from synthetic_data import make_tables
+
+
+def sql_count(dataset, name):
+    return int(dataset.engine().query(f"SELECT COUNT(*) AS n FROM {name}")['n'].iloc[0])
+
+
+def test_append_skips_missing_and_taken_keys():
+    dataset = LiveDataset(make_tables(200))
+    dataset.engine()
+    new = {'Food_ID': 1000, 'Food_Name': "Bread", 'Quantity': 5, 'Expiry_Date': "2030-01-01",
+           'Provider_ID': 1, 'Provider_Type': "Restaurant", 'Location': "City 1",
+           'Food_Type': "Vegan", 'Meal_Type': "Lunch"}
+    records = [
+        dict(new, table='food', Food_ID=None),
+        dict(new, table='food', Food_ID=1),
+        dict(new, table='food'),
+        dict(new, table='food'),
+    ]
+
+    assert dataset.append_records(records) == 1
+    assert len(dataset.table('food')) == sql_count(dataset, 'food') == 201
+    # Retrying the batch adds nothing
+    assert dataset.append_records(records) == 0
+    assert len(dataset.table('food')) == sql_count(dataset, 'food') == 201
+
+
+def test_append_before_engine_is_built():
+    dataset = LiveDataset(make_tables(200))
+    claim = {'table': 'claims', 'Claim_ID': 7, 'Food_ID': 1, 'Receiver_ID': 1,
+             'Status': "Completed", 'Timestamp': "2030-01-01 10:00:00"}
+
+    assert dataset.append_records([claim, dict(claim, Claim_ID=None)]) == 0
+    assert len(dataset.table('claims')) == sql_count(dataset, 'claims') == 200
+
+
+def test_failed_insert_can_be_retried(monkeypatch):
+    dataset = LiveDataset(make_tables(200))
+    engine = dataset.engine()
+    record = {'table': 'receivers', 'Receiver_ID': 500, 'Name': "New Shelter", 'Type': "Shelter", 'City': "City 1"}
+
+    def broken_insert(name, rows):
+        raise OSError("disk full")
+    monkeypatch.setattr(engine, 'insert', broken_insert)
+    with pytest.raises(OSError):
+        dataset.append_records([record])
+    monkeypatch.undo()
+
+    assert dataset.append_records([record]) == 1
+    assert len(dataset.table('receivers')) == sql_count(dataset, 'receivers') == 201
+
+
+def test_claims_before_their_listing_match_a_rebuild():
+    dataset = LiveDataset(make_tables(200))
+    # Build the structures that are updated incrementally
+    dataset.engine(), dataset.cube(), dataset.ranking(), dataset.insight_summary()
+    listing = {'table': 'food', 'Food_ID': 1000, 'Food_Name': "Bread", 'Quantity': 40, 'Expiry_Date': "2030-01-01",
+               'Provider_ID': 1, 'Provider_Type': "Restaurant", 'Location': "New Town",
+               'Food_Type': "Vegan", 'Meal_Type': "Lunch"}
+    claims = [{'table': 'claims', 'Claim_ID': 1000 + i, 'Food_ID': 1000, 'Receiver_ID': 1,
+               'Status': status, 'Timestamp': "2030-01-01 10:00:00"}
+              for i, status in enumerate(["Completed", "Pending"])]
+
+    # Held until the listing arrives: in neither copy
+    assert dataset.append_records(claims) == 0
+    assert dataset.held_claims() == 2
+    assert len(dataset.table('claims')) == sql_count(dataset, 'claims') == 200
+    assert dataset.append_records([listing]) == 3
+    assert dataset.held_claims() == 0
+    assert len(dataset.table('claims')) == sql_count(dataset, 'claims') == 202
+
+    rebuilt = LiveDataset(dataset.tables())
+    for dimension in ['Food_Type', 'Meal_Type', 'Location']:
+        incremental = dataset.cube().rollup(dimension, statuses='Completed').set_index(dimension)
+        expected = rebuilt.cube().rollup(dimension, statuses='Completed').set_index(dimension)
+        assert incremental['Claimed_Quantity'].to_dict() == expected['Claimed_Quantity'].to_dict()
+    for bottom in [False, True]:
+        assert dataset.ranking().top('claim_rate', bottom=bottom).equals(rebuilt.ranking().top('claim_rate', bottom=bottom))
+    assert dataset.insight_summary() == rebuilt.insight_summary()
+
+
+def test_malformed_records_are_rejected_alone():
+    ingestor = EventIngestor()
+    try:
+        good = {'Receiver_ID': 500, 'Name': "New Shelter", 'Type': "Shelter", 'City': "City 1"}
+        records = [good, ["not", "a", "record"], dict(good, table='suppliers'), dict(good, Receiver_ID="abc"),
+                   {'table': 'claims', 'Claim_ID': 9, 'Food_ID': 1, 'Timestamp': "yesterday-ish"}]
+        accepted, rejected = ingestor.submit(records, table='receivers')
+        assert accepted == 1
+        assert [r['index'] for r in rejected] == [1, 2, 3, 4]
+        assert ingestor.stats['rejected'] == 4
+    finally:
+        ingestor.stop()
+
+
+def test_failed_batch_is_appended_per_submission(monkeypatch):
+    dataset = LiveDataset(make_tables(200))
+    dataset.engine()
+    ingestor = EventIngestor()
+    ingestor.stop()
+    ingestor.attach(dataset)
+    append_records = dataset.append_records
+
+    # One submission the dataset cannot take, merged with a good one
+    def fussy(records):
+        if any(r.get('Name') == "Broken" for r in records):
+            raise ValueError("cannot append")
+        return append_records(records)
+    monkeypatch.setattr(dataset, 'append_records', fussy)
+    receiver = {'table': 'receivers', 'Receiver_ID': 500, 'Name': "New Shelter", 'Type': "Shelter", 'City': "City 1"}
+    ingestor._append([[receiver], [dict(receiver, Receiver_ID=501, Name="Broken")]])
+
+    assert ingestor.stats['appended'] == 1
+    assert ingestor.stats['errors'] == 1
+    assert len(dataset.table('receivers')) == sql_count(dataset, 'receivers') == 201
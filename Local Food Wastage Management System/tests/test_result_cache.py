@@ -0,0 +1,28 @@
+# Queries share a cache entry only when they are the same query.
+#
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import normalize_sql
+
+
+def test_layout_does_not_matter():
+    assert normalize_sql("SELECT a,\n   b\nFROM t;") == normalize_sql("  SELECT a, b FROM t  ") == "SELECT a, b FROM t"
+
+
+def test_line_comment_ends_at_newline():
+    assert normalize_sql("SELECT a -- x\nFROM t") == "SELECT a FROM t"
+    assert normalize_sql("SELECT a -- x FROM t") == "SELECT a"
+
+
+def test_block_comments_are_dropped():
+    assert normalize_sql("SELECT /* all */ a FROM t") == normalize_sql("SELECT a FROM t")
+
+
+def test_quoted_text_is_kept():
+    assert normalize_sql("SELECT 'a  --  b' FROM t") == "SELECT 'a  --  b' FROM t"
+    assert normalize_sql('SELECT "my  col" FROM t') != normalize_sql('SELECT "my col" FROM t')
+    assert normalize_sql("SELECT 'it''s  ok'") == "SELECT 'it''s  ok'"
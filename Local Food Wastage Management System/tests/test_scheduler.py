@@ -0,0 +1,46 @@
+# The Next to Expire queue and the wastage tracker must agree on which
+# listings are unclaimed, including those whose only claim was cancelled.
+#
+#   python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from scheduler import ExpiryScheduler
+from wastage import WastageTracker
+
+NOW = pd.Timestamp("2030-01-10")
+
+
+def listings():
+    return pd.DataFrame({
+        'Food_ID': [1, 2, 3],
+        'Quantity': [10, 20, 30],
+        'Expiry_Date': pd.to_datetime(["2030-01-12", "2030-01-12", "2030-01-12"])
+    })
+
+
+def claims(food_ids, statuses):
+    return pd.DataFrame({'Claim_ID': range(1, len(food_ids) + 1), 'Food_ID': food_ids, 'Status': statuses})
+
+
+def test_cancelled_only_listing_counts_as_claimed():
+    loaded = claims([1, 2], ["Cancelled", "Completed"])
+    scheduler = ExpiryScheduler(listings(), loaded, now=NOW)
+    wastage = WastageTracker(listings(), loaded, now=NOW)
+
+    assert scheduler.upcoming(10)['Food_ID'].tolist() == [3]
+    scheduler.advance(pd.Timestamp("2030-01-14"))
+    wastage.advance(pd.Timestamp("2030-01-14"))
+    assert scheduler.stats()['expired_items'] == wastage.wasted_items == 1
+    assert scheduler.stats()['expired_quantity'] == wastage.wasted_quantity == 30
+
+
+def test_appended_cancelled_claim_leaves_the_queue():
+    scheduler = ExpiryScheduler(listings(), claims([], []), now=NOW)
+    scheduler.add_claims(claims([3], ["Cancelled"]))
+
+    assert scheduler.upcoming(10)['Food_ID'].tolist() == [2, 1]
@@ -0,0 +1,32 @@
+# Chart jobs on the worker pool read only the columns listed for them in
+# chart_data.TABLE_COLUMNS; the results must match the same functions run
+# on the full tables in this process.
+#
+#   python -m pytest tests
+import os
+import sys
+
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, "benchmarks"))
+
+import chart_data
+from live_data import LiveDataset
+from synthetic_data import make_tables
+from worker_pool import WorkerPool
+
+
+def test_chart_jobs_match_in_process_results():
+    dataset = LiveDataset(make_tables(500))
+    pool = WorkerPool(dataset, workers=2)
+    try:
+        for name in chart_data.TABLE_COLUMNS:
+            fn = getattr(chart_data, name)
+            expected = fn(dataset.tables())
+            result = pool.run(fn)
+            pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+        assert pool.stats()['failed'] == 0
+    finally:
+        pool.close()
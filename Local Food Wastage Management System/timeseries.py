@@ -0,0 +1,146 @@
+import threading
+import pandas as pd
+
+# Granularity label -> code used by the rollups
+GRANULARITIES = {'Daily': 'D', 'Weekly': 'W', 'Monthly': 'M'}
+
+# pandas frequency of each granularity's period labels
+FREQUENCIES = {'D': 'D', 'W': 'W-SUN', 'M': 'MS'}
+
+# Columns the claim counts are split by (each on its own, plus the total)
+SPLITS = ['Status', 'Food_Type', 'Location']
+
+
+# Label of the period each date falls in: the day itself, the Sunday ending
+# its week (as resample('W') labels weeks) or the first of its month
+def period_label(dates, granularity):
+    days = dates.dt.normalize()
+    if granularity == 'D':
+        return days
+    if granularity == 'W':
+        return days + pd.to_timedelta(6 - days.dt.weekday, unit='D')
+    return days - pd.to_timedelta(days.dt.day - 1, unit='D')
+
+
+# Claim counts per day, week and month, in total and split by claim status,
+# food type and location, kept up to date as claims are appended.
+#
+# Timestamps are parsed once, when claims arrive; each appended batch is
+# rolled up on its own and added to the stored counts, so a chart over
+# years of claims reads a few thousand pre-aggregated rows instead of
+# parsing and resampling the claims table. Claims without a valid timestamp
+# are left out, and claims whose listing is unknown are only counted in the
+# totals and the status split.
+class ClaimTimeSeries:
+    def __init__(self, claims_df, food_df):
+        self._lock = threading.Lock()
+        # Food_Type and Location per Food_ID (first listing wins)
+        self._listings = pd.DataFrame(columns=['Food_Type', 'Location'])
+        # (granularity, split column or None) -> claim counts indexed by
+        # period label (and split value). Each appended batch adds a part;
+        # parts are summed into one the next time the rollup is read.
+        self._counts = {}
+        # Split column -> values in code order
+        self._values = {}
+        self.add_listings(food_df)
+        self.add_claims(claims_df)
+
+    def add_listings(self, rows):
+        if 'Food_ID' not in rows:
+            return
+        new = rows.drop_duplicates(subset=['Food_ID']).set_index('Food_ID')
+        new = new[[c for c in ['Food_Type', 'Location'] if c in new]].reindex(columns=['Food_Type', 'Location'])
+        with self._lock:
+            new = new[~new.index.isin(self._listings.index)]
+            if not new.empty:
+                self._listings = pd.concat([self._listings, new]) if len(self._listings) else new
+
+    def add_claims(self, rows):
+        if 'Timestamp' not in rows or rows.empty:
+            return
+        claims = pd.DataFrame({'Date': pd.to_datetime(rows['Timestamp'], errors='coerce')}, index=rows.index)
+        if 'Status' in rows:
+            claims['Status'] = rows['Status']
+        if 'Food_ID' in rows:
+            with self._lock:
+                listings = self._listings.reindex(rows['Food_ID'].to_numpy())
+            claims['Food_Type'] = listings['Food_Type'].to_numpy()
+            claims['Location'] = listings['Location'].to_numpy()
+        claims = claims.dropna(subset=['Date'])
+        if claims.empty:
+            return
+        with self._lock:
+            splits = [s for s in SPLITS if s in claims]
+            for split in splits:
+                claims[split] = self._encode(split, claims[split])
+            for granularity in GRANULARITIES.values():
+                claims['Period'] = period_label(claims['Date'], granularity)
+                self._counts.setdefault((granularity, None), []).append(claims.groupby('Period').size())
+                for split in splits:
+                    known = claims[claims[split] >= 0]
+                    self._counts.setdefault((granularity, split), []).append(known.groupby(['Period', split], observed=True).size())
+
+    # Integer codes for split values, stable across batches, so the stored
+    # counts are indexed by (period, code) and summing parts never compares
+    # strings. Missing values get -1.
+    def _encode(self, split, values):
+        known = self._values.get(split, pd.Index([], dtype=object))
+        codes = known.get_indexer(values)
+        new = pd.unique(values[(codes < 0) & values.notna().to_numpy()])
+        if len(new):
+            known = known.append(pd.Index(new, dtype=object))
+            self._values[split] = known
+            codes = known.get_indexer(values)
+        return codes
+
+    def _rollup(self, granularity, split):
+        with self._lock:
+            parts = self._counts.get((granularity, split))
+            if not parts:
+                return None
+            if len(parts) > 1:
+                parts[:] = [pd.concat(parts).groupby(level=list(range(parts[0].index.nlevels))).sum()]
+            return parts[0]
+
+    # First and last day with claims, or None without any
+    def date_range(self):
+        days = self._rollup('D', None)
+        if days is None or days.empty:
+            return None
+        return days.index.min(), days.index.max()
+
+    # Claims per period between `start` and `end` (inclusive; periods that
+    # overlap the range are kept), with periods without claims as zeros.
+    # Returns Date and Claims columns, plus the split column when `split` is
+    # given; `top` keeps only the split values with the most claims.
+    def series(self, granularity='W', split=None, start=None, end=None, top=None):
+        columns = ['Date', split, 'Claims'] if split else ['Date', 'Claims']
+        counts = self._rollup(granularity, split)
+        if counts is None or counts.empty:
+            return pd.DataFrame(columns=columns)
+
+        periods = counts.index.get_level_values(0)
+        first = period_label(pd.Series([pd.Timestamp(start)]), granularity)[0] if start is not None else periods.min()
+        last = period_label(pd.Series([pd.Timestamp(end)]), granularity)[0] if end is not None else periods.max()
+        counts = counts[(periods >= first) & (periods <= last)]
+        if counts.empty:
+            return pd.DataFrame(columns=columns)
+
+        if split:
+            if top is not None:
+                # Pick the top values before widening: there may be
+                # thousands of locations
+                totals = counts.groupby(level=1).sum()
+                keep = totals.sort_values(ascending=False).index[:top]
+                counts = counts[counts.index.get_level_values(1).isin(keep)]
+            counts = counts.unstack(fill_value=0)
+            with self._lock:
+                counts.columns = self._values[split][counts.columns]
+        full_range = pd.date_range(counts.index.min(), counts.index.max(), freq=FREQUENCIES[granularity])
+        counts = counts.reindex(full_range, fill_value=0)
+
+        if not split:
+            result = counts.rename_axis('Date').reset_index(name='Claims')
+            return result[columns]
+        result = counts.rename_axis('Date').reset_index().melt(id_vars='Date', var_name=split, value_name='Claims')
+        return result[columns]
@@ -0,0 +1,132 @@
+import bisect
+import threading
+from collections import defaultdict
+import pandas as pd
+
+# Columns the wasted quantity is broken down by
+WASTAGE_DIMENSIONS = ['Food_Type', 'Meal_Type', 'Provider_Type', 'Location']
+
+
+def to_ns(value):
+    return pd.Timestamp(value).as_unit('ns').value
+
+
+# Food_IDs of the listings that count as claimed: those with any claim,
+# whatever its status, as in the Food Wastage charts. The Next to Expire
+# queue (scheduler.ExpiryScheduler) uses the same rule.
+def claimed_food_ids(claims_df):
+    return set(claims_df['Food_ID'].tolist()) if 'Food_ID' in claims_df.columns else set()
+
+
+# Food wastage (expired listings that were never claimed) kept up to date
+# incrementally.
+#
+# Listings are kept sorted by expiry with a cursor at the first one that has
+# not expired yet. Moving the clock forward only walks past the listings that
+# expired since the last refresh, and a new claim or listing adjusts the
+# totals for that one item, so a refresh costs O(changes) instead of a full
+# copy and scan of the food table.
+class WastageTracker:
+    def __init__(self, food_df, claims_df, now=None, dimensions=None):
+        self.dimensions = [d for d in (dimensions or WASTAGE_DIMENSIONS) if d in food_df.columns]
+        self._lock = threading.Lock()
+        self._claimed = claimed_food_ids(claims_df)
+        # Food_ID -> (quantity, expiry in ns or None, dimension values)
+        self._listings = {}
+        # (expiry in ns, Food_ID) sorted by expiry; entries before the cursor
+        # have expired. Listings without a valid expiry never expire.
+        self._queue = []
+        self._cursor = 0
+        self.now = to_ns(now if now is not None else pd.Timestamp.now())
+        # Wasted quantity per dimension value, plus overall totals
+        self._wasted = {d: defaultdict(int) for d in self.dimensions}
+        self.wasted_quantity = 0
+        self.wasted_items = 0
+        self.expired_quantity = 0
+        # Dimension -> callbacks told of every change to its totals
+        self._watchers = defaultdict(list)
+
+        if food_df.empty or any(c not in food_df.columns for c in ['Food_ID', 'Quantity', 'Expiry_Date']):
+            return
+        food = food_df.drop_duplicates(subset=['Food_ID'])
+        expiry = pd.to_datetime(food['Expiry_Date'], errors='coerce')
+        expiry_ns = [None if missing else value for value, missing in
+                     zip(expiry.to_numpy(dtype='datetime64[ns]').astype('int64').tolist(), expiry.isna().tolist())]
+        quantities = food['Quantity'].fillna(0).astype('int64').tolist()
+        dims = list(zip(*(food[d].tolist() for d in self.dimensions))) if self.dimensions else [()] * len(food)
+        for food_id, quantity, expires, values in zip(food['Food_ID'].tolist(), quantities, expiry_ns, dims):
+            self._listings[food_id] = (quantity, expires, values)
+            if expires is not None:
+                self._queue.append((expires, food_id))
+        self._queue.sort()
+        self._advance(self.now)
+
+    def _add_waste(self, food_id, sign):
+        quantity, _, values = self._listings[food_id]
+        self.wasted_quantity += sign * quantity
+        self.wasted_items += sign
+        for dimension, value in zip(self.dimensions, values):
+            totals = self._wasted[dimension]
+            totals[value] += sign * quantity
+            for callback in self._watchers.get(dimension, []):
+                callback(value, totals[value])
+            if totals[value] == 0:
+                del totals[value]
+
+    # Count a listing that just expired, if nobody claimed it
+    def _expire(self, food_id):
+        self.expired_quantity += self._listings[food_id][0]
+        if food_id not in self._claimed:
+            self._add_waste(food_id, 1)
+
+    def _advance(self, now):
+        self.now = max(self.now, now)
+        while self._cursor < len(self._queue) and self._queue[self._cursor][0] < self.now:
+            self._expire(self._queue[self._cursor][1])
+            self._cursor += 1
+
+    # Move the clock forward (it never moves back) and expire what is due
+    def advance(self, now=None):
+        with self._lock:
+            self._advance(to_ns(now if now is not None else pd.Timestamp.now()))
+
+    # A claim on an expired, previously unclaimed listing removes it from waste
+    def add_claim(self, food_id):
+        with self._lock:
+            if food_id in self._claimed:
+                return
+            self._claimed.add(food_id)
+            listing = self._listings.get(food_id)
+            if listing is not None and listing[1] is not None and listing[1] < self.now:
+                self._add_waste(food_id, -1)
+
+    def add_listing(self, food_id, quantity, expiry_date, **dims):
+        with self._lock:
+            if food_id in self._listings:
+                return
+            expires = None if pd.isna(expiry_date) else to_ns(expiry_date)
+            self._listings[food_id] = (int(quantity), expires, tuple(dims.get(d) for d in self.dimensions))
+            if expires is None:
+                return
+            bisect.insort(self._queue, (expires, food_id))
+            if expires < self.now:
+                # Already past its expiry, so it was inserted before the cursor
+                self._cursor += 1
+                self._expire(food_id)
+
+    # Call callback(value, wasted quantity) with the current totals of
+    # `dimension` and then whenever one changes (0 once nothing is wasted)
+    def watch(self, dimension, callback):
+        with self._lock:
+            if dimension not in self._wasted:
+                return
+            self._watchers[dimension].append(callback)
+            for value, quantity in self._wasted[dimension].items():
+                callback(value, quantity)
+
+    # Wasted quantity per value of `dimension`, largest first
+    def wastage_by(self, dimension):
+        with self._lock:
+            totals = dict(self._wasted.get(dimension, {}))
+        result = pd.DataFrame({dimension: list(totals.keys()), 'Quantity': list(totals.values())})
+        return result.sort_values('Quantity', ascending=False).reset_index(drop=True)
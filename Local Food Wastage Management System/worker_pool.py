@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from chart_data import TABLE_COLUMNS
+from data_loader import TABLE_FILES, compact_table
+from stats import percentile
+
+# Latencies kept per job kind for the percentiles
+LATENCY_WINDOW = 1000
+
+
+# Raised by submit() when the pool already has `max_pending` jobs
+class PoolBusy(Exception):
+    pass
+
+
+# Worker process state: a read-only connection to the snapshot
+_worker = {}
+
+
+def _init_worker(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True)
+    # Read pages through a shared memory map, so every worker uses the same
+    # physical pages of the snapshot instead of its own page cache
+    conn.execute(f"PRAGMA mmap_size = {os.path.getsize(path)}")
+    _worker['conn'] = conn
+    _worker['columns'] = {
+        name: [row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')] for name in TABLE_FILES
+    }
+
+
+# The columns `fn` reads (TABLE_COLUMNS, or every column of every table for
+# functions not listed there) as DataFrames read from the snapshot for this
+# task only: workers keep no copies of the tables between tasks
+def _task_tables(fn):
+    conn = _worker['conn']
+    needed = TABLE_COLUMNS.get(fn.__name__, dict.fromkeys(TABLE_FILES))
+    tables = {}
+    for name, columns in needed.items():
+        existing = _worker['columns'].get(name, [])
+        columns = [column for column in columns or existing if column in existing]
+        if not columns:
+            tables[name] = pd.DataFrame()
+            continue
+        select = ", ".join(f'"{column}"' for column in columns)
+        # Same types as data_loader.read_table
+        tables[name] = compact_table(name, pd.read_sql_query(f'SELECT {select} FROM "{name}"', conn))
+    return tables
+
+
+def _run_query(query, params):
+    start = time.perf_counter()
+    result = pd.read_sql_query(query, _worker['conn'], params=params)
+    return result, time.perf_counter() - start
+
+
+def _run_task(fn, kwargs):
+    start = time.perf_counter()
+    result = fn(_task_tables(fn), **kwargs)
+    return result, time.perf_counter() - start
+
+
+# Local pool of worker processes for SQL queries and chart computations.
+#
+# The dataset's SQLite database is saved once to a snapshot file (in
+# /dev/shm where available, i.e. in shared memory) that every worker opens
+# read-only and memory-maps, and heavy jobs run outside the Streamlit
+# process and its GIL. SQL queries read the shared pages directly; a chart
+# job reads only the columns it uses into DataFrames of its own, which are
+# freed when it finishes, so an idle worker holds no table data.
+#
+# At most `max_pending` jobs may be queued or running; submit() waits up to
+# `admission_timeout` seconds for a slot and then raises PoolBusy, so a
+# burst of heavy requests is turned away instead of queueing without bound.
+#
+# The snapshot is taken at the dataset's current revision. Callers check
+# is_current() and run jobs themselves once live rows have been appended.
+class WorkerPool:
+    def __init__(self, dataset, workers=None, max_pending=None, admission_timeout=2.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.admission_timeout = admission_timeout
+        self.version = dataset.version
+        self.revision = dataset.revision
+        shm = "/dev/shm"
+        self._dir = tempfile.mkdtemp(prefix="fms-pool-", dir=shm if os.path.isdir(shm) else None)
+        path = os.path.join(self._dir, "snapshot.sqlite")
+        dataset.engine().save(path)
+        # Workers are started with spawn: forking the multi-threaded
+        # Streamlit server is not safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(path,)
+        )
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def is_current(self, dataset):
+        return dataset.version == self.version and dataset.revision == self.revision
+
+    def _record(self, kind, latency, run_time):
+        with self._lock:
+            if kind not in self._latencies:
+                self._latencies[kind] = (deque(maxlen=LATENCY_WINDOW), deque(maxlen=LATENCY_WINDOW))
+            self._latencies[kind][0].append(latency)
+            self._latencies[kind][1].append(run_time)
+
+    # Run fn(*args) in a worker and wait for its result
+    def _submit(self, kind, fn, *args):
+        if not self._slots.acquire(timeout=self.admission_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise PoolBusy(f"{self.max_pending} jobs already queued")
+        start = time.perf_counter()
+        with self._lock:
+            self.pending += 1
+        try:
+            result, run_time = self._executor.submit(fn, *args).result()
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+        with self._lock:
+            self.completed += 1
+        self._record(kind, time.perf_counter() - start, run_time)
+        return result
+
+    def query(self, query, params=None):
+        return self._submit('query', _run_query, query, params)
+
+    # Run fn(tables, **kwargs) in a worker, with the columns listed for fn
+    # in chart_data.TABLE_COLUMNS. fn must be a module-level function (it
+    # is pickled by reference) and its result picklable.
+    def run(self, fn, **kwargs):
+        return self._submit(fn.__name__, _run_task, fn, kwargs)
+
+    # Latency percentiles in seconds per job kind: end to end (queueing,
+    # transfer and run) and run time inside the worker
+    def stats(self):
+        with self._lock:
+            kinds = {}
+            for kind, (latencies, run_times) in self._latencies.items():
+                kinds[kind] = {
+                    'jobs': len(latencies),
+                    'p50': percentile(list(latencies), 50),
+                    'p95': percentile(list(latencies), 95),
+                    'p99': percentile(list(latencies), 99),
+                    'run_p50': percentile(list(run_times), 50)
+                }
+            all_latencies = [value for latencies, _ in self._latencies.values() for value in latencies]
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'failed': self.failed,
+                'p50': percentile(all_latencies, 50),
+                'p95': percentile(all_latencies, 95),
+                'p99': percentile(all_latencies, 99),
+                'kinds': kinds
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(self._dir, ignore_errors=True)